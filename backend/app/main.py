@@ -4,10 +4,12 @@ import math
 import datetime
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from fastapi import FastAPI, Body, HTTPException
+from fastapi import FastAPI, Body, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import pandas as pd 
 
@@ -46,10 +48,15 @@ if str(PARENT_DIR) not in sys.path:
 # -------------------------------------------------------------------
 
 # Safe to import at startup (no torch/ML models)
-from app.services.auth_service import generate_otp, send_otp_email, create_jwt_token, verify_jwt_token
-from app.services.data_loader import load_energy_data
+from app.services.auth_service import generate_otp, create_jwt_token, verify_jwt_token
+from app.services.email_dispatch import dispatcher as email_dispatcher, EmailQueueFull
+from app.services.data_loader import load_energy_data, home_cache
 from app.services.billing_service import calculate_electricity_bill
-from auth_db import init_db, get_or_create_user, store_otp, verify_otp as verify_otp_db, get_last_otp
+from app.services.single_flight import coalesced, flights
+from app.services.rate_limiter import RateLimitMiddleware, check_otp_recipient, refund_otp_recipient, get_rate_limit_stats
+from app.services.auth_middleware import AuthMiddleware, get_auth_stats, current_home, chat_session_key
+from app.services.compute_pool import compute_pool, offload, ComputeUnavailable, get_compute_pool_stats
+from auth_db import init_db, get_or_create_user, store_otp, verify_otp as verify_otp_db, get_last_otp, start_otp_purge, stop_otp_purge
 
 # These will be imported locally inside functions when needed
 # - nlp_engine (loads torch)
@@ -98,6 +105,11 @@ def _load_cors_origins():
 
     return sorted(origins)
 
+# Added before CORS so 401/429/503 responses still carry CORS headers.
+# Auth runs before the rate limiter, which needs the user for per-user limits.
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(AuthMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_load_cors_origins(),
@@ -110,6 +122,54 @@ app.add_middleware(
 # Debug endpoint guard: enable only when explicitly set
 ENABLE_DEBUG_OTP_ENDPOINT = os.getenv("ENABLE_DEBUG_OTP_ENDPOINT", "false").lower() == "true"
 
+# Background alert evaluation (disable for one-off scripts / tests)
+ENABLE_ALERT_SCHEDULER = os.getenv("ALERT_SCHEDULER_ENABLED", "true").lower() == "true"
+
+
+# CPU-bound work that missed its deadline or found the compute pool full
+@app.exception_handler(ComputeUnavailable)
+async def compute_unavailable_handler(request: Request, exc: ComputeUnavailable):
+    print(f"⚠️ {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={"detail": "Server busy, please retry"},
+    )
+
+
+# -------------------------------------------------------------------
+# Lifecycle
+# -------------------------------------------------------------------
+
+@app.on_event("startup")
+def start_background_jobs():
+    # Auth schema + indexes once per process, not on every auth request
+    try:
+        init_db()
+        start_otp_purge()
+    except Exception as e:
+        print(f"⚠️ Database error: {e}")
+    email_dispatcher.start()
+    compute_pool.start()
+
+    if ENABLE_ALERT_SCHEDULER:
+        from app.services.alert_scheduler import start_alert_scheduler
+        start_alert_scheduler()
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await run_in_threadpool(stop_otp_purge)
+    await run_in_threadpool(email_dispatcher.stop)
+    await run_in_threadpool(compute_pool.stop)
+
+    if ENABLE_ALERT_SCHEDULER:
+        from app.services.alert_scheduler import stop_alert_scheduler
+        await run_in_threadpool(stop_alert_scheduler)
+
+    # Only if chat was used (llm_service is imported lazily)
+    if "app.services.llm_service" in sys.modules:
+        await sys.modules["app.services.llm_service"].close_async_client()
+
 
 # -------------------------------------------------------------------
 # Health & Root
@@ -129,21 +189,6 @@ def health_check():
 # Authentication Endpoints
 # -------------------------------------------------------------------
 
-
-# Database will be initialized lazily on first auth request
-_db_initialized = False
-
-def ensure_db_initialized():
-    """Lazy initialize database on first use"""
-    global _db_initialized
-    if not _db_initialized:
-        try:
-            init_db()
-            _db_initialized = True
-            print("✅ Database initialized")
-        except Exception as e:
-            print(f"⚠️ Database error: {e}")
-
 class SendOTPRequest(BaseModel):
     email: str
 
@@ -158,8 +203,6 @@ async def send_otp(request: SendOTPRequest):
     print("📧 /auth/send-otp endpoint called")
     print("="*60)
     
-    ensure_db_initialized()  # Initialize DB on first auth request
-    
     email = request.email.lower().strip()
     print(f"👤 Email requested: {email}")
     
@@ -167,48 +210,69 @@ async def send_otp(request: SendOTPRequest):
     if "@" not in email or "." not in email:
         print(f"❌ Invalid email format: {email}")
         return {"success": False, "message": "Invalid email format"}
+
+    # Per-recipient limit (per-IP / per-route limits run in RateLimitMiddleware)
+    retry_after = check_otp_recipient(email)
+    if retry_after:
+        print(f"⚠️ OTP rate limit hit for {email}")
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            content={"success": False, "message": "Too many login codes requested. Please wait a few minutes and try again."},
+        )
     
     # Generate OTP
     otp = generate_otp()
     print(f"🔑 Generated OTP: {otp} (6-digit code)")
     
-    # Send email first so the API only reports success after actual delivery handoff.
+    # Delivery happens on the email dispatch workers (never on the event loop);
+    # the OTP is stored only after the email send succeeds.
     try:
-        email_sent = send_otp_email(email, otp)
-    except Exception as email_error:
-        print(f"❌ Email delivery exception for {email}: {email_error}")
-        email_sent = False
-
-    if not email_sent:
-        print(f"❌ OTP email failed for {email}")
+        job_id = email_dispatcher.enqueue_otp(
+            email, otp,
+            on_sent=lambda: store_otp(email, otp, expires_in_minutes=10),
+        )
+    except EmailQueueFull as queue_error:
+        refund_otp_recipient(email)     # nothing was sent: keep the recipient's allowance
+        print(f"❌ OTP email not queued for {email}: {queue_error}")
         print("="*60 + "\n")
         return {
             "success": False,
             "message": "We could not send the login code right now. Please try again in a moment.",
         }
 
-    # Store only after the email send succeeds.
-    try:
-        store_otp(email, otp, expires_in_minutes=10)
-        print(f"✅ OTP stored in database for {email}")
-    except Exception as db_error:
-        print(f"❌ Database error storing OTP after successful email send: {db_error}")
-        print("="*60 + "\n")
-        return {"success": False, "message": "Failed to process request"}
-
-    print(f"✅ OTP email sent successfully for {email}")
+    print(f"✅ OTP email queued for {email} (job {job_id})")
     print("="*60 + "\n")
     
     return {
         "success": True,
         "message": "Login code sent to your email. Check spam folder if not received.",
+        "job_id": job_id,
+        "status": "queued",
     }
 
+@app.get("/auth/otp-status/{job_id}")
+def otp_status(job_id: str):
+    """Delivery status of a queued OTP email: queued, sending, retrying, sent or failed."""
+    status = email_dispatcher.get_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id")
+    return {
+        "job_id": job_id,
+        "status": status["status"],
+        "attempts": status["attempts"],
+        "provider": status.get("provider"),
+        "retry_in_seconds": status.get("retry_in_seconds") if status["status"] == "retrying" else None,
+    }
+
+@app.get("/api/email-dispatch")
+def email_dispatch_stats():
+    """Email queue depth, retries and delivery counters."""
+    return email_dispatcher.stats()
+
 @app.post("/auth/verify-otp")
 def verify_otp(request: VerifyOTPRequest):
     """Verify OTP and return JWT token"""
-    ensure_db_initialized()  # Initialize DB on first auth request
-    
     email = request.email.lower().strip()
     otp = request.otp.strip()
     
@@ -225,7 +289,7 @@ def verify_otp(request: VerifyOTPRequest):
     user = get_or_create_user(email)
     
     # Generate JWT token
-    token = create_jwt_token(email)
+    token = create_jwt_token(email, user["home_id"])
     
     return {
         "success": True,
@@ -233,7 +297,8 @@ def verify_otp(request: VerifyOTPRequest):
         "token": token,
         "user": {
             "email": user["email"],
-            "id": user["id"]
+            "id": user["id"],
+            "home_id": user["home_id"]
         }
     }
 
@@ -302,15 +367,16 @@ class ChatQuery(BaseModel):
 # -------------------------------------------------------------------
 
 @app.get("/dashboard")
-def dashboard():
-    from app.services.energy_calculator import compute_dashboard_metrics
-
-    metrics = compute_dashboard_metrics()
+@coalesced("dashboard")
+def dashboard(home_id: str = Depends(current_home)):
+    # pandas / IsolationForest work runs in the compute pool, off this worker's GIL
+    metrics = offload("compute_dashboard_metrics", home_id)
     anomalies = []
 
     try:
-        from app.services.anomaly_detector import detect_anomalies
-        anomalies = detect_anomalies()
+        anomalies = offload("detect_anomalies", home_id=home_id)
+    except ComputeUnavailable:
+        raise   # overloaded pool → 503, not "no anomalies"
     except Exception as e:
         print(f"⚠️ Dashboard anomaly detection unavailable in local run: {e}")
 
@@ -345,21 +411,24 @@ def realtime_forecast():
 # Energy Forecast Endpoint (FIXED)
 # -------------------------------------------------------------------
 @app.get("/energy/forecast")
-def energy_forecast():
+@coalesced("energy_forecast")
+def energy_forecast(home_id: str = Depends(current_home)):
     """Energy forecast endpoint with defensive error handling for college demo.
     Returns valid response structure even if ML model encounters issues.
     """
     try:
         from app.services.forecast_service import fetch_energy_forecast
         # Fetch forecast data
-        forecast = fetch_energy_forecast()
+        forecast = fetch_energy_forecast(home_id)
         
         # Return successful forecast
         return {
             **json_safe(forecast),
             "explanations": forecast.get("ai_observations", [])
         }
-        
+
+    except ComputeUnavailable:
+        raise
     except Exception as e:
         # Log the error for debugging
         print(f"❌ Forecast error during demo: {e}")
@@ -376,15 +445,60 @@ def energy_forecast():
 # NLP Chat (LLM-Powered with Per-Session Isolation)
 # -------------------------------------------------------------------
 @app.post("/chat")
-def chat_endpoint(query: ChatQuery):
+async def chat_endpoint(query: ChatQuery, request: Request, home_id: str = Depends(current_home)):
     # Import locally - only loads when user actually chats
-    from app.services.llm_service import process_chat_message
-    response_text = process_chat_message(query.message, query.session_id)
+    from app.services.llm_service import process_chat_message_async
+    session_id = chat_session_key(request, query.session_id)
+    response_text = await process_chat_message_async(query.message, session_id, home_id)
     return {
         "answer": response_text,
         "status": "success"
     }
 
+@app.get("/api/chat/router")
+def chat_router_stats():
+    """Per-model circuit state, error rate, latency percentiles and hedge counters."""
+    from app.services.llm_service import get_router_stats
+    return get_router_stats()
+
+@app.get("/api/chat/sessions")
+def chat_session_stats():
+    """Chat session store: backend, live sessions, stored bytes, evictions, history compaction."""
+    from app.services.chat_sessions import session_store
+    from app.services.chat_history import compactor
+    return {**session_store.stats(), "compaction": compactor.stats()}
+
+@app.get("/api/chat/cache")
+def chat_cache_stats():
+    """Semantic response cache: entries, hit rate, index size."""
+    from app.services.semantic_cache import response_cache
+    return response_cache.stats()
+
+@app.get("/api/chat/tools")
+def chat_tool_stats():
+    """Chat mode (context | tools) and tool calls / errors per tool."""
+    from app.services.llm_service import CHAT_MODE
+    from app.services.chat_tools import get_tool_stats
+    return {"mode": CHAT_MODE, **get_tool_stats()}
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(query: ChatQuery, request: Request, home_id: str = Depends(current_home)):
+    """Server-Sent Events: `token` events as the model writes, then one `done` event."""
+    from app.services.llm_service import stream_chat_message
+    from app.services.event_hub import format_sse
+
+    session_id = chat_session_key(request, query.session_id)
+
+    async def relay():
+        async for event, payload in stream_chat_message(query.message, session_id, home_id):
+            yield format_sse(event, payload)
+
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # -------------------------------------------------------------------
 # What-If Analysis
@@ -435,14 +549,13 @@ def estimate_energy_api(payload: Dict[str, Any] = Body(...)):
 # 🔥 AI INSIGHTS (MATHEMATICALLY CORRECT)
 # -------------------------------------------------------------------
 @app.get("/energy/ai-insights")
-def ai_insights():
+@coalesced("ai_insights")
+def ai_insights(home_id: str = Depends(current_home)):
     """Returns structured insight objects.
     ✅ FIXED: Uses Daily Rate Comparison (kWh/day) to handle partial periods correctly.
     """
-    from app.services.energy_calculator import compute_dashboard_metrics
-    
     # 1. GET CURRENT OBSERVED DATA
-    metrics = compute_dashboard_metrics()
+    metrics = offload("compute_dashboard_metrics", home_id)
     total_energy = metrics.get("total_energy_kwh", 0)
     device_breakdown = metrics.get("device_wise_energy_kwh", {})
     night_percent = metrics.get("night_usage_percent", 0)
@@ -463,7 +576,7 @@ def ai_insights():
     # === INSIGHT 2: CONSUMPTION STATUS (DAILY RATE COMPARISON) ===
     if total_energy > 0:
         try:
-            full_df = load_energy_data()
+            full_df = load_energy_data(home_id)
             if not full_df.empty and "timestamp" in full_df.columns:
                 full_df["timestamp"] = pd.to_datetime(full_df["timestamp"])
                 
@@ -519,11 +632,9 @@ def ai_insights():
 # AI Timeline (Clean Costing)
 # -------------------------------------------------------------------
 @app.get("/energy/ai-timeline")
-def ai_energy_timeline():
+def ai_energy_timeline(home_id: str = Depends(current_home)):
     # REUSE the calculator logic to ensure 100% match with dashboard
-    from app.services.energy_calculator import compute_dashboard_metrics
-
-    metrics = compute_dashboard_metrics()
+    metrics = offload("compute_dashboard_metrics", home_id)
     
     if metrics["total_energy_kwh"] == 0:
         return {
@@ -565,8 +676,104 @@ def ai_energy_timeline():
 @app.get("/api/model-health")
 def model_health():
     from app.ml.metrics import get_latest_metrics
+    from app.ml.model_registry import get_registry_summary
+
+    health = get_latest_metrics()
+
+    # Attach registered versions to the matching model card
+    for artifact, registry in get_registry_summary().items():
+        entry = health.get(registry["model_name"])
+        if entry is None and registry["versions"]:
+            latest = registry["versions"][-1]
+            entry = health[registry["model_name"]] = {
+                "model": registry["model_name"],
+                "dataset": "MODEL REGISTRY",
+                "timestamp": latest["created_at"],
+                "metrics": latest["metrics"],
+            }
+        if entry is not None:
+            entry["registry"] = {"artifact": artifact, **registry}
+
+    return health
 
-    return get_latest_metrics()
+
+@app.get("/api/model-health/history")
+def model_health_history(model: str = None, since: str = None, until: str = None, limit: int = 100):
+    """Training run history (newest first), filterable by model name and time range."""
+    from app.ml.metrics import query_metrics_history
+
+    try:
+        runs = query_metrics_history(model_name=model, since=since, until=until, limit=max(1, min(limit, 1000)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since / until must be ISO dates (YYYY-MM-DD[THH:MM:SS])")
+    return {"count": len(runs), "runs": runs}
+
+
+# -------------------------------------------------------------------
+# NILM Disaggregation (Batched)
+# -------------------------------------------------------------------
+class NILMBatchRequest(BaseModel):
+    """Columnar readings: every list holds one value per reading."""
+    power_watts: List[float]
+    duration_minutes: List[float]
+    appliance_code: List[int]
+    is_night: Optional[List[int]] = None
+    is_occupied: Optional[List[int]] = None
+
+@app.post("/api/nilm/disaggregate")
+def nilm_disaggregate(request: NILMBatchRequest):
+    from app.services.nilm_service import disaggregate_batch, MAX_BATCH_SIZE
+
+    if len(request.power_watts) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: max {MAX_BATCH_SIZE} readings per request"
+        )
+
+    try:
+        result = disaggregate_batch(request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except FileNotFoundError as e:
+        print(f"❌ NILM model unavailable: {e}")
+        raise HTTPException(status_code=503, detail="NILM model is not available.")
+
+    return json_safe(result)
+
+
+class AggregateSignalRequest(BaseModel):
+    """Whole-house power samples (W) on a fixed interval."""
+    power_watts: List[float]
+    stride: int = 1
+
+class AggregateStreamRequest(AggregateSignalRequest):
+    stream_id: str = "default"
+
+@app.post("/api/nilm/aggregate")
+def nilm_aggregate(request: AggregateSignalRequest):
+    """Sliding-window disaggregation of an aggregate meter signal into device traces."""
+    from app.services.nilm_window_engine import disaggregate_signal
+
+    try:
+        return json_safe(disaggregate_signal(request.power_watts, stride=request.stride))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except FileNotFoundError as e:
+        print(f"❌ Sliding-window NILM unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Sliding-window NILM models are not available.")
+
+@app.post("/api/nilm/stream")
+def nilm_stream(request: AggregateStreamRequest):
+    """Streaming mode: scores only the windows completed by the newly pushed readings."""
+    from app.services.nilm_window_engine import push_stream_readings
+
+    try:
+        return json_safe(push_stream_readings(request.stream_id, request.power_watts, stride=request.stride))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except FileNotFoundError as e:
+        print(f"❌ Sliding-window NILM unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Sliding-window NILM models are not available.")
 
 
 # -------------------------------------------------------------------
@@ -582,14 +789,124 @@ def explain_prediction(payload: Dict[str, Any] = Body(...)):
 # Smart Alert System
 # -------------------------------------------------------------------
 @app.get("/api/alerts")
-def get_alerts():
-    """Returns active alerts for devices running continuously.
-    Uses production dataset (energy_usage.csv) for live notifications.
+def get_alerts(home_id: str = Depends(current_home)):
+    """Returns the home's open/escalated alerts for devices running continuously.
+    Alerts are evaluated in the background (see alert_scheduler); this only reads state.
     """
-    from app.services.alert_service import get_active_alerts
+    from app.services.alert_store import get_open_alerts, get_last_checked
+
+    last_checked = get_last_checked(home_id)
+    if last_checked is None:
+        # Scheduler has not reached this home yet (or is disabled): evaluate once inline
+        from app.services.alert_scheduler import evaluate_alerts_now
+        evaluate_alerts_now(home_id)
+        last_checked = get_last_checked(home_id)
+
+    alerts = get_open_alerts(home_id)
+    return {
+        "alert_count": len(alerts),
+        "alerts": alerts,
+        "last_checked": last_checked,
+        "monitoring_window_hours": 3,
+        "dataset": "production"
+    }
 
-    prod_csv_path = BASE_DIR / "data" / "energy_usage.csv"
-    return get_active_alerts(csv_path=str(prod_csv_path))
+@app.get("/api/events")
+async def live_events(request: Request, home_id: str = Depends(current_home)):
+    """Server-Sent Events push channel: the home's `alerts`, `kpis` and `anomalies` snapshots.
+    Sends the current state on connect, then only changes; `: heartbeat` when idle.
+    """
+    from app.services.event_hub import hub, event_stream
+
+    if not hub.has_snapshot(home_id):
+        # Nothing published for this home yet (scheduler disabled or still starting)
+        from app.services.alert_scheduler import evaluate_alerts_now
+        try:
+            await run_in_threadpool(evaluate_alerts_now, home_id)
+        except Exception as e:
+            print(f"⚠️ Initial live snapshot failed: {e}")
+
+    try:
+        sub = hub.subscribe(home_id)
+    except ConnectionRefusedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return StreamingResponse(
+        event_stream(sub, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/auth/stats")
+def auth_stats():
+    """Verified-token cache (hits, misses, rejected) and per-request auth overhead in µs."""
+    return get_auth_stats()
+
+@app.get("/api/rate-limits")
+def rate_limit_stats():
+    """Requests allowed, rate limited (429) and shed (503) per limited route."""
+    return get_rate_limit_stats()
+
+@app.get("/api/single-flight")
+def single_flight_stats():
+    """Request coalescing per endpoint: calls, executions, coalesced calls and ratio."""
+    return flights.stats()
+
+@app.get("/api/compute-pool")
+def compute_pool_stats():
+    """Offloaded CPU-bound tasks: pending vs limit, rejected (503), timed out, latency per task."""
+    return get_compute_pool_stats()
+
+@app.get("/api/home-cache")
+def home_cache_stats():
+    """Per-home datasets + aggregates held in this worker, bytes used vs HOME_CACHE_MAX_MB, evictions."""
+    return home_cache.stats()
+
+@app.get("/api/events/stats")
+def live_event_stats():
+    from app.services.event_hub import hub
+    return hub.stats()
+
+@app.get("/api/devices/{device_name}/sessions")
+def device_sessions(device_name: str, days: int = 30, limit: int = 50, home_id: str = Depends(current_home)):
+    """On/off sessions for one device (accepts dataset or UI device names)."""
+    from app.services.session_index import get_session_index, sessions_to_records
+    from app.services.knowledge_base import UI_NAME_MAP
+
+    raw_names = {ui: raw for raw, ui in UI_NAME_MAP.items()}
+    name = raw_names.get(device_name, device_name)
+
+    index = get_session_index(home_id)
+    if index.last_timestamp is None:
+        return {"device": name, "sessions": [], "runtime": {}}
+
+    since = index.last_timestamp - datetime.timedelta(days=max(days, 1))
+    sessions = index.device_sessions(name, since=since)
+    return json_safe({
+        "device": name,
+        "sessions": sessions_to_records(sessions, limit=max(1, min(limit, 1000))),
+        "runtime": index.runtime_summary(since=since).get(name, {}),
+    })
+
+@app.get("/api/device-profiles")
+def device_profiles(home_id: str = Depends(current_home)):
+    """Learned per-device percentiles and the alert thresholds derived from them."""
+    from app.services.device_profiles import get_device_profiles
+    from app.services.alert_service import ALERT_THRESHOLDS, DEVICE_ALIASES, get_alert_thresholds
+
+    profiles = get_device_profiles(home_id)
+    summary = profiles.summary()
+    devices = {device for home in summary.values() for device in home}
+    thresholds = {
+        device: get_alert_thresholds(device, profiles)
+        for device in sorted(devices)
+        if DEVICE_ALIASES.get(device, device) in ALERT_THRESHOLDS
+    }
+    return json_safe({
+        "home_id": home_id,
+        "profiles": summary,
+        "alert_thresholds_hours": thresholds,
+    })
 
 @app.get("/api/alerts/test")
 def get_alerts_test():
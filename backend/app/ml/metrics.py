@@ -1,45 +1,193 @@
 import json
 import os
+import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows dev machines: no flock/rusage, O_APPEND lines stay whole
+    fcntl = None
+    resource = None
 
 # Define path relative to this file
 BASE_DIR = Path(__file__).resolve().parent
-METRICS_FILE = BASE_DIR / "metrics.json"
+METRICS_FILE = BASE_DIR / "metrics.json"                    # legacy snapshot (read-only seed)
+METRICS_HISTORY_FILE = BASE_DIR / "metrics_history.jsonl"   # append-only run log
 
-def get_latest_metrics():
+# Latest-per-model view, rebuilt only when the history log changes
+_latest_cache = {"stamp": None, "view": {}}
+
+
+# -------------------------------------------------
+# Run Profiling (duration, peak memory)
+# -------------------------------------------------
+def _peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextmanager
+def track_training_run():
     """
-    Reads the latest saved training metrics.
-    Used by the Dashboard API to show Model Health.
+    Measures wall-clock training time and process peak memory.
+    Yields a dict that is filled in when the block exits.
     """
+    run_info = {}
+    start = time.perf_counter()
+    try:
+        yield run_info
+    finally:
+        run_info["training_duration_s"] = round(time.perf_counter() - start, 3)
+        run_info["peak_memory_mb"] = _peak_memory_mb()
+
+
+def measure_inference_latency(predict_fn, X, repeats: int = 3) -> float:
+    """Best-of-N batch predict time, reported as milliseconds per row."""
+    rows = max(len(X), 1)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_fn(X)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000 / rows, 6)
+
+
+# -------------------------------------------------
+# History Log
+# -------------------------------------------------
+def _append_record(record: dict):
+    line = (json.dumps(record) + "\n").encode("utf-8")
+    fd = os.open(METRICS_HISTORY_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def read_metrics_history():
+    """All recorded runs, oldest first. Skips torn/corrupt lines."""
+    if not METRICS_HISTORY_FILE.exists():
+        return []
+
+    records = []
+    with open(METRICS_HISTORY_FILE, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def _parse_bound(value: str, end_of_day: bool = False) -> datetime:
+    """
+    ISO date or datetime (ValueError otherwise), as naive local time like
+    the recorded timestamps. A bare date as upper bound means that whole day.
+    """
+    value = value.strip()
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+    return datetime.combine(day, datetime.max.time() if end_of_day else datetime.min.time())
+
+
+def _run_time(record):
+    try:
+        return datetime.fromisoformat(record.get("timestamp", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def query_metrics_history(model_name=None, since=None, until=None, limit=100):
+    """
+    Filters run history by model name (substring, case-insensitive) and
+    time range (ISO "YYYY-MM-DD[ HH:MM:SS]"; `until` as a date includes
+    that day). Newest runs first. Raises ValueError for an unparsable bound.
+    """
+    runs = read_metrics_history()
+    start = _parse_bound(since) if since else None
+    end = _parse_bound(until, end_of_day=True) if until else None
+
+    if model_name:
+        needle = model_name.lower()
+        runs = [r for r in runs if needle in r.get("model", "").lower()]
+    if start or end:
+        timed = [(r, _run_time(r)) for r in runs]
+        runs = [
+            r for r, at in timed
+            if at is not None and (start is None or at >= start) and (end is None or at <= end)
+        ]
+
+    runs.reverse()
+    return runs[:limit] if limit else runs
+
+
+# -------------------------------------------------
+# Public Interface
+# -------------------------------------------------
+def _load_legacy_snapshot():
     if not METRICS_FILE.exists():
         return {}
-    
     try:
         with open(METRICS_FILE, "r") as f:
             return json.load(f)
     except Exception:
         return {}
 
-def save_metrics(model_name, dataset_name, metrics_dict):
+
+def get_latest_metrics():
+    """
+    Reads the latest saved training metrics.
+    Used by the Dashboard API to show Model Health.
     """
-    Saves training results to JSON.
-    This is called by the training scripts (train_forecast.py, etc.) 
+    stamp = None
+    if METRICS_HISTORY_FILE.exists():
+        stat = METRICS_HISTORY_FILE.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+    if _latest_cache["stamp"] != stamp or not _latest_cache["view"]:
+        view = _load_legacy_snapshot()
+        for record in read_metrics_history():
+            view[record["model"]] = record
+        _latest_cache["stamp"] = stamp
+        _latest_cache["view"] = view
+
+    # Copy so callers can decorate the response without touching the cache
+    return {name: dict(run) for name, run in _latest_cache["view"].items()}
+
+
+def save_metrics(model_name, dataset_name, metrics_dict, run_info=None):
+    """
+    Appends training results to the metrics history log.
+    This is called by the training scripts (train_forecast.py, etc.)
     after the model has been evaluated on real data.
     """
-    # Load existing data
-    current_data = get_latest_metrics()
-    
-    # Update with new run data
-    current_data[model_name] = {
+    record = {
         "model": model_name,
         "dataset": dataset_name,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "metrics": metrics_dict
+        "metrics": metrics_dict,
     }
-    
-    # Write back to disk
-    with open(METRICS_FILE, "w") as f:
-        json.dump(current_data, f, indent=4)
-    
-    print(f"📊 Metrics for {model_name} saved to {METRICS_FILE}")
+    if run_info:
+        record["run"] = run_info
+
+    _append_record(record)
+
+    print(f"📊 Metrics for {model_name} appended to {METRICS_HISTORY_FILE}")
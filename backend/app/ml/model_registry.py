@@ -0,0 +1,284 @@
+"""
+Versioned Model Artifact Registry
+
+Trainers publish immutable, versioned artifacts instead of overwriting
+models/*.pkl in place. Serving code resolves the *active* version through
+a pointer file, so a retrain running next to live traffic can never expose
+a half-written pickle.
+
+Layout:
+    models/registry/<artifact>/<version>/model.pkl
+    models/registry/<artifact>/<version>/manifest.json
+    models/registry/<artifact>/ACTIVE        (holds the active version id)
+    models/registry/<artifact>/ACTIVE.history  (append-only log of promotions / rollbacks)
+
+Usage:
+    python -m app.ml.model_registry list
+    python -m app.ml.model_registry promote <artifact> <version>
+    python -m app.ml.model_registry rollback <artifact>
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+
+BASE_DIR = Path(__file__).resolve().parent
+REGISTRY_DIR = BASE_DIR / "models" / "registry"
+ACTIVE_FILE = "ACTIVE"
+HISTORY_FILE = "ACTIVE.history"
+MODEL_FILE = "model.pkl"
+MANIFEST_FILE = "manifest.json"
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write_text(path: Path, text: str):
+    """Write-then-rename so readers see either the old or the new content."""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _artifact_dir(artifact: str) -> Path:
+    return REGISTRY_DIR / artifact
+
+
+def data_version(data_path) -> str:
+    """Content hash of the training dataset (short form), or 'unknown'."""
+    if data_path and Path(data_path).exists():
+        return _file_sha256(Path(data_path))[:16]
+    return "unknown"
+
+
+# -------------------------------------------------
+# Publish / Promote / Rollback
+# -------------------------------------------------
+def publish_model(model, artifact: str, model_name: str = None, metrics: dict = None,
+                  features: list = None, data_path=None) -> str:
+    """
+    Stores a trained model as a new immutable version and returns its id.
+    The version is NOT served until it is promoted explicitly.
+    """
+    artifact_dir = _artifact_dir(artifact)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1. Stage everything in a private temp dir
+    staging_dir = artifact_dir / f".staging-{uuid.uuid4().hex}"
+    staging_dir.mkdir()
+    try:
+        model_file = staging_dir / MODEL_FILE
+        joblib.dump(model, model_file)
+
+        created_at = datetime.now()
+        model_hash = _file_sha256(model_file)
+        version = f"{created_at.strftime('%Y%m%d%H%M%S')}-{model_hash[:8]}"
+
+        manifest = {
+            "artifact": artifact,
+            "version": version,
+            "model_name": model_name or artifact,
+            "sha256": model_hash,
+            "metrics": metrics or {},
+            "features": list(features or []),
+            "training_data": str(data_path) if data_path else None,
+            "training_data_version": data_version(data_path),
+            "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(staging_dir / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=4)
+
+        # 2. Publish with a single rename (atomic on the same filesystem)
+        os.rename(staging_dir, artifact_dir / version)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    print(f"📦 Published {artifact} version {version}")
+    return version
+
+
+def _activate(artifact: str, version: str, action: str):
+    """Points ACTIVE at a verified version and records the change in ACTIVE.history."""
+    version_dir = _artifact_dir(artifact) / version
+    if not (version_dir / MANIFEST_FILE).exists():
+        raise ValueError(f"Unknown version '{version}' for artifact '{artifact}'")
+
+    manifest = read_manifest(artifact, version)
+    if _file_sha256(version_dir / MODEL_FILE) != manifest["sha256"]:
+        raise ValueError(f"Checksum mismatch for {artifact}/{version}; refusing to {action}")
+
+    previous = get_active_version(artifact)
+    _atomic_write_text(_artifact_dir(artifact) / ACTIVE_FILE, version)
+
+    entry = {
+        "action": action,
+        "version": version,
+        "previous": previous,
+        "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    # One line per change, appended: earlier entries are never rewritten
+    with open(_artifact_dir(artifact) / HISTORY_FILE, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def promote_model(artifact: str, version: str):
+    """Points the ACTIVE marker of an artifact at an existing version."""
+    _activate(artifact, version, "promote")
+    print(f"🚀 Promoted {artifact} → {version}")
+
+
+def _promotion_stack(artifact: str) -> list:
+    """Promoted versions still in effect, oldest first: each rollback undoes the latest promotion."""
+    stack = []
+    for entry in get_promotion_history(artifact):
+        if entry["action"] == "promote":
+            stack.append(entry["version"])
+        elif entry["action"] == "rollback" and stack:
+            stack.pop()
+    return stack
+
+
+def rollback_model(artifact: str) -> str:
+    """
+    Undoes the latest promotion: re-activates the version that was promoted
+    before it. Repeated rollbacks walk back through promotions, never to a
+    version that was only published.
+    """
+    stack = _promotion_stack(artifact)
+    if len(stack) < 2:
+        raise ValueError(f"No earlier promotion of '{artifact}' to roll back to")
+
+    previous = stack[-2]
+    _activate(artifact, previous, "rollback")
+    print(f"↩️ Rolled back {artifact} → {previous}")
+    return previous
+
+
+# -------------------------------------------------
+# Lookup
+# -------------------------------------------------
+def read_manifest(artifact: str, version: str) -> dict:
+    with open(_artifact_dir(artifact) / version / MANIFEST_FILE, "r") as f:
+        return json.load(f)
+
+
+def list_versions(artifact: str) -> list:
+    """All published manifests for an artifact, oldest first."""
+    artifact_dir = _artifact_dir(artifact)
+    if not artifact_dir.exists():
+        return []
+
+    manifests = []
+    for version_dir in artifact_dir.iterdir():
+        if version_dir.name.startswith(".") or not (version_dir / MANIFEST_FILE).exists():
+            continue
+        try:
+            manifests.append(read_manifest(artifact, version_dir.name))
+        except Exception:
+            continue
+
+    return sorted(manifests, key=lambda m: m["version"])
+
+
+def get_promotion_history(artifact: str) -> list:
+    """ACTIVE.history entries, oldest first (unreadable lines are skipped)."""
+    history_file = _artifact_dir(artifact) / HISTORY_FILE
+    if not history_file.exists():
+        return []
+
+    entries = []
+    with open(history_file, "r") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+
+def get_active_version(artifact: str):
+    active_file = _artifact_dir(artifact) / ACTIVE_FILE
+    if not active_file.exists():
+        return None
+    return active_file.read_text().strip() or None
+
+
+def resolve_model_path(artifact: str, legacy_path: Path) -> Path:
+    """
+    Path of the active registry version, falling back to the legacy
+    models/<artifact>.pkl location for deployments that predate the registry.
+    """
+    active = get_active_version(artifact)
+    if active:
+        active_path = _artifact_dir(artifact) / active / MODEL_FILE
+        if active_path.exists():
+            return active_path
+    return legacy_path
+
+
+def get_registry_summary() -> dict:
+    """Registered versions per artifact, which one is active and the promotion history."""
+    if not REGISTRY_DIR.exists():
+        return {}
+
+    summary = {}
+    for artifact_dir in sorted(REGISTRY_DIR.iterdir()):
+        if not artifact_dir.is_dir():
+            continue
+        artifact = artifact_dir.name
+        versions = list_versions(artifact)
+        summary[artifact] = {
+            "model_name": versions[-1]["model_name"] if versions else artifact,
+            "active_version": get_active_version(artifact),
+            "versions": [
+                {
+                    "version": m["version"],
+                    "created_at": m["created_at"],
+                    "sha256": m["sha256"],
+                    "training_data_version": m["training_data_version"],
+                    "metrics": m["metrics"],
+                }
+                for m in versions
+            ],
+            "promotion_history": get_promotion_history(artifact),
+        }
+    return summary
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in {"list", "promote", "rollback"}:
+        raise RuntimeError(
+            "Usage: python -m app.ml.model_registry list | promote <artifact> <version> | rollback <artifact>"
+        )
+
+    command = sys.argv[1]
+    if command == "list":
+        print(json.dumps(get_registry_summary(), indent=4))
+    elif command == "promote":
+        promote_model(sys.argv[2], sys.argv[3])
+    elif command == "rollback":
+        rollback_model(sys.argv[2])
@@ -3,35 +3,50 @@ import joblib
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from app.ml.model_registry import resolve_model_path
+from app.services.data_loader import load_energy_data
 
 # Resolve paths
 BASE_DIR = Path(__file__).resolve().parent
 MODEL_PATH = BASE_DIR / "models" / "energy_forecast_model.pkl"
-DATA_PATH = BASE_DIR.parent.parent / "data" / "energy_usage.csv"
 MAE_REPORT_PATH = BASE_DIR / "mae_report.txt"
 FEATURE_COLUMNS = ['day_of_week', 'day_of_month', 'lag_1', 'lag_7', 'rolling_mean_7']
 
-def get_energy_forecast():
+_model_cache = {}     # model path -> (mtime_ns, model)
+
+def load_forecast_model():
     """
-    Performs a Recursive Multi-Step Forecast (Rolling Window) on DAILY data.
-    Enhanced with error handling for college demo stability.
+    The active forecast model, unpickled once per artifact file rather than
+    per request (a promote / rollback changes the path and reloads it).
     """
-    if not MODEL_PATH.exists():
-        raise FileNotFoundError(f"Model not found at {MODEL_PATH}")
+    model_path = resolve_model_path(MODEL_PATH.stem, MODEL_PATH)
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found at {model_path}")
+
+    mtime = model_path.stat().st_mtime_ns
+    cached = _model_cache.get(model_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
 
     try:
-        model = joblib.load(MODEL_PATH)
+        model = joblib.load(model_path)
     except Exception as e:
         raise Exception(f"Failed to load ML model: {str(e)}")
+    _model_cache.clear()
+    _model_cache[model_path] = (mtime, model)
+    return model
+
+def get_energy_forecast(home_id=None):
+    """
+    Performs a Recursive Multi-Step Forecast (Rolling Window) on a home's DAILY data.
+    Enhanced with error handling for college demo stability.
+    """
+    model = load_forecast_model()
     
-    # 1. Load & Resample History
-    if not DATA_PATH.exists():
-        raise FileNotFoundError(f"Data file not found at {DATA_PATH}")
+    # 1. Load & Resample History (raises FileNotFoundError for a home without data)
+    df = load_energy_data(home_id)
 
     try:
-        df = pd.read_csv(DATA_PATH)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
         # Aggregate to Daily (Must match training logic)
         daily_df = df.set_index('timestamp').resample('D').agg({'energy_kwh': 'sum'}).reset_index()
         
@@ -1,5 +1,4 @@
 import pandas as pd
-import joblib
 import sys
 from pathlib import Path
 from sklearn.ensemble import IsolationForest
@@ -14,7 +13,8 @@ MODEL_PATH = BASE_DIR / "models" / "anomaly_isolation_forest.pkl"
 
 # Ensure app is in path for imports
 sys.path.append(str(PROJECT_ROOT))
-from app.ml.metrics import save_metrics
+from app.ml.metrics import save_metrics, track_training_run, measure_inference_latency
+from app.ml.model_registry import publish_model
 
 def train_anomaly():
     print(f"🚀 Starting Anomaly Model Training...")
@@ -46,29 +46,41 @@ def train_anomaly():
     ])
 
     # 4. Train
-    pipeline.fit(X)
+    with track_training_run() as run_info:
+        pipeline.fit(X)
+    run_info["inference_latency_ms"] = measure_inference_latency(pipeline.predict, X)
 
     # 5. Evaluate
     preds = pipeline.predict(X)
     n_anomalies = (preds == -1).sum()
     
     # 6. Save
-    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(pipeline, MODEL_PATH)
+    metrics_dict = {
+        "R2_Score": 0.0, 
+        "RMSE": 0.0,
+        "MAE": 0.0,
+        "MAPE": 0.0,
+        "Explained_Variance_Pct": 97.0 # 100 - contamination
+    }
+
+    version = publish_model(
+        pipeline,
+        artifact=MODEL_PATH.stem,
+        model_name="Isolation Forest Anomaly Detector",
+        metrics=metrics_dict,
+        features=features,
+        data_path=DATA_PATH,
+    )
 
     save_metrics(
         model_name="Isolation Forest Anomaly Detector",
         dataset_name="UNSUPERVISED TIME-SERIES",
-        metrics_dict={
-            "R2_Score": 0.0, 
-            "RMSE": 0.0,
-            "MAE": 0.0,
-            "MAPE": 0.0,
-            "Explained_Variance_Pct": 97.0 # 100 - contamination
-        }
+        metrics_dict=metrics_dict,
+        run_info=run_info
     )
 
     print(f"✅ Anomaly Model Trained. Detected {n_anomalies} outliers in dataset.")
+    print(f"👉 Serve it with: python -m app.ml.model_registry promote {MODEL_PATH.stem} {version}")
 
 if __name__ == "__main__":
     train_anomaly()
\ No newline at end of file
@@ -1,5 +1,4 @@
 import pandas as pd
-import joblib
 from pathlib import Path
 import sys
 
@@ -24,6 +23,10 @@ MODEL_PATH = MODEL_DIR / "energy_estimation_model.pkl"
 # Ensure model directory exists
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.append(str(BASE_DIR.parents[1]))
+from app.ml.metrics import save_metrics, track_training_run, measure_inference_latency
+from app.ml.model_registry import publish_model
+
 print(f"📍 Script Location: {BASE_DIR}")
 print(f"📂 Looking for Data at: {DATA_PATH}")
 
@@ -78,17 +81,34 @@ def train_energy_model():
         n_jobs=-1
     )
 
-    model.fit(X_train, y_train)
+    with track_training_run() as run_info:
+        model.fit(X_train, y_train)
+    run_info["inference_latency_ms"] = measure_inference_latency(model.predict, X_test)
 
     print("TASKS: Evaluating model...")
     preds = model.predict(X_test)
     mae = mean_absolute_error(y_test, preds)
 
-    joblib.dump(model, MODEL_PATH)
+    version = publish_model(
+        model,
+        artifact=MODEL_PATH.stem,
+        model_name="Energy Estimation Random Forest",
+        metrics={"MAE": round(mae, 4)},
+        features=FEATURES,
+        data_path=DATA_PATH,
+    )
+
+    save_metrics(
+        model_name="Energy Estimation Random Forest",
+        dataset_name="Energy Usage (80/20 SPLIT)",
+        metrics_dict={"MAE": round(mae, 4)},
+        run_info=run_info
+    )
 
     print("✅ SUCCESS: Energy Estimation Model Trained")
     print(f"   MAE: {mae:.4f} kWh")
-    print(f"   Model saved at: {MODEL_PATH}")
+    print(f"   Registry version: {version}")
+    print(f"👉 Serve it with: python -m app.ml.model_registry promote {MODEL_PATH.stem} {version}")
 
 # ---------------------------------------------------------
 # ENTRY POINT
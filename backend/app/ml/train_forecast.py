@@ -1,5 +1,4 @@
 import pandas as pd
-import joblib
 import numpy as np
 import sys
 from pathlib import Path
@@ -16,7 +15,8 @@ MAE_REPORT_PATH = BASE_DIR / "mae_report.txt"
 
 # Ensure app is in path
 sys.path.append(str(PROJECT_ROOT))
-from app.ml.metrics import save_metrics
+from app.ml.metrics import save_metrics, track_training_run, measure_inference_latency
+from app.ml.model_registry import publish_model
 
 def create_daily_features(df):
     """
@@ -81,16 +81,24 @@ def train_forecast_model():
         n_jobs=-1,
         random_state=42
     )
-    model.fit(X_train, y_train)
+    with track_training_run() as run_info:
+        model.fit(X_train, y_train)
+    run_info["inference_latency_ms"] = measure_inference_latency(model.predict, X_test)
 
     # 6. Evaluation
     preds = model.predict(X_test)
     mae = mean_absolute_error(y_test, preds)
     r2 = r2_score(y_test, preds)
 
-    # 7. Save Model & Metrics
-    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(model, MODEL_PATH)
+    # 7. Publish Model (new registry version, promoted explicitly) & Metrics
+    version = publish_model(
+        model,
+        artifact=MODEL_PATH.stem,
+        model_name="Daily Forecast XGBoost",
+        metrics={"MAE": round(mae, 4), "R2_Score": round(r2, 4)},
+        features=features,
+        data_path=DATA_PATH,
+    )
     
     with open(MAE_REPORT_PATH, "w") as f:
         f.write(f"{mae:.4f}")
@@ -101,10 +109,12 @@ def train_forecast_model():
         metrics_dict={
             "MAE": round(mae, 4),
             "R2_Score": round(r2, 4)
-        }
+        },
+        run_info=run_info
     )
 
     print(f"✅ Daily Model Trained. MAE: {mae:.4f} | R2: {r2:.4f}")
+    print(f"👉 Serve it with: python -m app.ml.model_registry promote {MODEL_PATH.stem} {version}")
 
 if __name__ == "__main__":
     train_forecast_model()
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Alert Evaluation Scheduler
+Runs ALERT_THRESHOLDS evaluation off the request path, for every home
+(list_homes):
+- whenever a home's energy_usage.csv changes (new data ingested), and
+- at least every ALERT_EVAL_INTERVAL_SECONDS.
+Results are reconciled into the SQLite alert store, so /api/alerts
+only reads open alerts.
+
+Each pass also pushes changes to the home's live clients (see event_hub):
+the open alerts after every evaluation, KPIs and anomaly flags when the
+data changed.
+"""
+
+import os
+import threading
+import time
+from app.services.alert_service import detect_continuous_operation_alerts
+from app.services.alert_store import init_alert_db, apply_evaluation
+from app.services.data_loader import home_data_path, list_homes, normalize_home
+from app.services.event_hub import publish_alerts, publish_data_snapshots
+
+ALERT_EVAL_INTERVAL_SECONDS = float(os.getenv("ALERT_EVAL_INTERVAL_SECONDS", "300"))
+ALERT_DATA_POLL_SECONDS = float(os.getenv("ALERT_DATA_POLL_SECONDS", "5"))
+
+_thread = None
+_stop_event = threading.Event()
+_trigger_event = threading.Event()
+_eval_lock = threading.Lock()
+_last_data_stamps = {}          # home -> (mtime, size) at its last evaluation
+_last_snapshot_stamps = {}      # home -> stamp its KPI / anomaly events were built from
+
+
+def _data_stamp(home_id=None):
+    try:
+        stat = home_data_path(home_id).stat()
+        return (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def evaluate_alerts_now(home_id=None) -> dict:
+    """One evaluation pass of a home: detect → reconcile into the store → push changes."""
+    home_id = normalize_home(home_id)
+    with _eval_lock:
+        stamp = _last_data_stamps[home_id] = _data_stamp(home_id)
+        detected = detect_continuous_operation_alerts(home_id=home_id)
+        counts = apply_evaluation(detected, home_id)
+
+        try:
+            publish_alerts(home_id)
+            if stamp != _last_snapshot_stamps.get(home_id):
+                publish_data_snapshots(home_id)
+                _last_snapshot_stamps[home_id] = stamp
+        except Exception as e:
+            print(f"⚠️ Live update publish failed for home {home_id}: {e}")
+
+    if counts["opened"] or counts["escalated"] or counts["resolved"]:
+        print(f"🔔 Alerts evaluated for home {home_id}: {counts}")
+    return counts
+
+
+def trigger_alert_evaluation():
+    """Ingest hook: ask the scheduler to evaluate every home on its next wake-up."""
+    _trigger_event.set()
+
+
+def _run():
+    last_run = 0.0
+    while not _stop_event.is_set():
+        due = time.monotonic() - last_run >= ALERT_EVAL_INTERVAL_SECONDS or _trigger_event.is_set()
+        _trigger_event.clear()
+        for home_id in list_homes():
+            if _stop_event.is_set():
+                break
+            # Every home when due; otherwise only homes whose data changed
+            if due or _data_stamp(home_id) != _last_data_stamps.get(home_id):
+                try:
+                    evaluate_alerts_now(home_id)
+                except Exception as e:
+                    print(f"[ALERT SCHEDULER ERROR] home {home_id}: {e}")
+        if due:
+            last_run = time.monotonic()
+
+        _trigger_event.wait(timeout=ALERT_DATA_POLL_SECONDS)
+
+
+def start_alert_scheduler():
+    global _thread
+    if _thread and _thread.is_alive():
+        return
+
+    init_alert_db()
+    _stop_event.clear()
+    _thread = threading.Thread(target=_run, name="alert-scheduler", daemon=True)
+    _thread.start()
+    print(f"✅ Alert scheduler started (interval {ALERT_EVAL_INTERVAL_SECONDS:.0f}s)")
+
+
+def stop_alert_scheduler():
+    _stop_event.set()
+    _trigger_event.set()
+    if _thread:
+        _thread.join(timeout=5)
@@ -7,7 +7,8 @@ and generates actionable alerts for user safety and cost prevention.
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from app.services.data_loader import load_energy_data
+from app.services.session_index import detect_sessions, get_session_index
+from app.services.device_profiles import get_device_profiles
 
 # Device name aliasing for alert logic
 DEVICE_ALIASES = {
@@ -17,7 +18,12 @@ DEVICE_ALIASES = {
 
 # -------------------------------------------------
 # Device-Specific Alert Thresholds (Hours)
+# Defaults until a device has enough session history; afterwards the
+# thresholds are the device's own session-length percentiles.
 # -------------------------------------------------
+WARNING_PERCENTILE = 0.95
+CRITICAL_PERCENTILE = 0.99
+
 ALERT_THRESHOLDS = {
     "Air Conditioner": {
         "warning": 2.0,    # Alert after 2 hours
@@ -39,6 +45,21 @@ ALERT_THRESHOLDS = {
 }
 
 
+def get_alert_thresholds(device_name: str, profiles=None) -> Dict[str, float]:
+    """
+    Warning/critical hours for a dataset device name.
+    Learned from `profiles` (session_hours percentiles) when available.
+    """
+    canonical_name = DEVICE_ALIASES.get(device_name, device_name)
+    defaults = ALERT_THRESHOLDS[canonical_name]
+    if profiles is None:
+        return defaults
+
+    warning = profiles.threshold(device_name, "session_hours", WARNING_PERCENTILE, defaults["warning"])
+    critical = profiles.threshold(device_name, "session_hours", CRITICAL_PERCENTILE, defaults["critical"])
+    return {"warning": warning, "critical": max(critical, warning)}
+
+
 # -------------------------------------------------
 # Alert Messages
 # -------------------------------------------------
@@ -54,62 +75,61 @@ def generate_alert_message(device: str, hours: float, severity: str) -> str:
 # -------------------------------------------------
 # Core Alert Detection Logic
 # -------------------------------------------------
-def detect_continuous_operation_alerts(csv_path: str = None) -> List[Dict[str, Any]]:
+def detect_continuous_operation_alerts(csv_path: str = None, home_id: str = None) -> List[Dict[str, Any]]:
     """
-    Analyzes last 3 hours of energy data to detect devices running continuously.
+    Flags devices whose latest on/off session (still active within the last
+    3 hours of data) has been running longer than its threshold.
     
     Args:
-        csv_path: Optional path to CSV file. If None, uses default energy_usage.csv
+        csv_path: Optional path to CSV file. If None, uses the shared session index
+        home_id: Home whose data is checked (default home when None)
     
     Returns list of alert objects with device, duration, severity, and message.
     """
     
     try:
-        # Load dataset
         if csv_path:
-            # Load from specified test CSV
+            # Load from specified test CSV and index it on the fly
             df = pd.read_csv(csv_path)
             df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
             df = df.dropna(subset=["timestamp"])
+            if df.empty:
+                return []
+            if "duration_minutes" not in df.columns:
+                df["duration_minutes"] = 60
+            if "energy_kwh" not in df.columns:
+                df["energy_kwh"] = df["power_watts"] * df["duration_minutes"] / 60000
+            sessions = detect_sessions(df)
+            reference_time = df["timestamp"].max()
+            profiles = None   # demo data keeps the static thresholds
         else:
-            # Load default dataset
-            df = load_energy_data()
+            # Production data: precomputed, incrementally maintained sessions
+            index = get_session_index(home_id)
+            sessions = index.sessions
+            reference_time = index.last_timestamp
+            profiles = get_device_profiles(home_id)
         
-        if df.empty:
+        if sessions.empty or reference_time is None:
             return []
         
         # Use dataset's reference time (latest timestamp), not system clock
-        reference_time = df["timestamp"].max()
         window_start = reference_time - timedelta(hours=3)
         
-        # Filter last 3 hours of data relative to dataset timeline
-        df_recent = df[df["timestamp"] >= window_start].copy()
-        
-        if df_recent.empty:
-            return []
-        
         alerts = []
+        active = sessions[sessions["end"] >= window_start]
+        if active.empty:
+            return []
+        latest = active.loc[active.groupby("device_name")["end"].idxmax()]
         
-        # Group by device and analyze continuous operation
-        for device_name, device_df in df_recent.groupby("device_name"):
+        for session in latest.itertuples(index=False):
             # Map device name using aliases if present
-            canonical_name = DEVICE_ALIASES.get(device_name, device_name)
+            canonical_name = DEVICE_ALIASES.get(session.device_name, session.device_name)
             # Skip devices not in alert threshold config (e.g., Fridge)
             if canonical_name not in ALERT_THRESHOLDS:
                 continue
-            # Sort by timestamp to get continuous operation window
-            device_df = device_df.sort_values("timestamp")
-            # Filter for active power draw (device is ON)
-            active_records = device_df[device_df["power_watts"] > 0]
-            if active_records.empty:
-                continue
-            # Calculate continuous runtime
-            first_timestamp = active_records["timestamp"].min()
-            last_timestamp = active_records["timestamp"].max()
-            # Calculate duration in hours
-            duration = (last_timestamp - first_timestamp).total_seconds() / 3600
-            # Check against thresholds (use canonical_name)
-            thresholds = ALERT_THRESHOLDS[canonical_name]
+            duration = float(session.duration_hours)
+            # Check against the device's learned (or default) thresholds
+            thresholds = get_alert_thresholds(session.device_name, profiles)
             severity = None
             if duration >= thresholds["critical"]:
                 severity = "critical"
@@ -117,17 +137,17 @@ def detect_continuous_operation_alerts(csv_path: str = None) -> List[Dict[str, A
                 severity = "warning"
             # Generate alert if threshold exceeded
             if severity:
-                alert_id = f"{canonical_name}_{first_timestamp.strftime('%Y%m%d%H%M')}"
+                alert_id = f"{canonical_name}_{session.start.strftime('%Y%m%d%H%M')}"
                 alerts.append({
                     "id": alert_id,
                     "device": canonical_name,
                     "duration_hours": round(duration, 1),
                     "severity": severity,
                     "message": generate_alert_message(canonical_name, duration, severity),
-                    "first_detected": first_timestamp.isoformat(),
-                    "last_seen": last_timestamp.isoformat(),
-                    "power_watts": float(active_records["power_watts"].mean()),
-                    "estimated_cost": calculate_alert_cost(duration, active_records["power_watts"].mean())
+                    "first_detected": session.start.isoformat(),
+                    "last_seen": session.end.isoformat(),
+                    "power_watts": float(session.mean_power_watts),
+                    "estimated_cost": calculate_alert_cost(duration, session.mean_power_watts)
                 })
         
         # Sort by severity (critical first) then duration
@@ -156,15 +176,16 @@ def calculate_alert_cost(hours: float, avg_watts: float) -> float:
 # -------------------------------------------------
 # Export Public Interface
 # -------------------------------------------------
-def get_active_alerts(csv_path: str = None) -> Dict[str, Any]:
+def get_active_alerts(csv_path: str = None, home_id: str = None) -> Dict[str, Any]:
     """
     Public API endpoint function.
     Returns alert summary with count and detailed alerts.
     
     Args:
         csv_path: Optional path to CSV file for testing. If None, uses production data.
+        home_id: Home whose production data is checked (default home when None)
     """
-    alerts = detect_continuous_operation_alerts(csv_path)
+    alerts = detect_continuous_operation_alerts(csv_path, home_id)
     
     return {
         "alert_count": len(alerts),
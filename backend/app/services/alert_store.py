@@ -0,0 +1,212 @@
+"""
+Alert State Store (SQLite)
+Persists alerts produced by the evaluator and moves them through
+open → escalated → resolved. Alerts belong to a home and are
+deduplicated by (home, id) - the id is device + session start - so
+re-evaluating the same data is idempotent.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any
+from app.services.data_loader import normalize_home
+
+# Database path - same hosting rules as auth_db
+db_path_override = os.getenv("ALERT_DB_PATH", "").strip()
+if db_path_override:
+    DB_PATH = Path(db_path_override)
+elif os.getenv("RAILWAY_ENVIRONMENT"):
+    DB_PATH = Path("/app/storage/alerts.db")
+elif os.getenv("K_SERVICE"):
+    DB_PATH = Path("/tmp/alerts.db")
+else:
+    DB_PATH = Path(__file__).resolve().parents[2] / "alerts.db"
+
+DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+ACTIVE_STATUSES = ("open", "escalated")
+
+_db_ready = False
+
+
+def _connect():
+    if not _db_ready:
+        init_alert_db()
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+_ALERT_COLUMNS = """
+            home_id TEXT NOT NULL,
+            id TEXT NOT NULL,
+            device TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT NOT NULL,
+            duration_hours REAL NOT NULL,
+            power_watts REAL NOT NULL,
+            estimated_cost REAL NOT NULL,
+            first_detected TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            opened_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            resolved_at TEXT,
+            PRIMARY KEY (home_id, id)
+"""
+
+
+def _migrate_to_homes(conn):
+    """Databases created before homes existed: their alerts are the default home's."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(alerts)")}
+    if not columns or "home_id" in columns:
+        return
+    # The primary key changes, so the table is rebuilt
+    conn.execute(f"CREATE TABLE alerts_by_home ({_ALERT_COLUMNS})")
+    copied = ", ".join(sorted(columns))
+    conn.execute(
+        f"INSERT INTO alerts_by_home (home_id, {copied}) SELECT ?, {copied} FROM alerts",
+        (normalize_home(None),),
+    )
+    conn.execute("DROP TABLE alerts")
+    conn.execute("ALTER TABLE alerts_by_home RENAME TO alerts")
+    conn.execute("UPDATE alert_meta SET key = ? WHERE key = 'last_checked'", (_last_checked_key(None),))
+
+
+def init_alert_db():
+    """Creates the alerts and evaluation-metadata tables."""
+    global _db_ready
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS alert_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+    conn.execute("BEGIN IMMEDIATE")
+    _migrate_to_homes(conn)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS alerts ({_ALERT_COLUMNS})")
+    conn.execute("DROP INDEX IF EXISTS idx_alerts_status")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_home_status ON alerts(home_id, status)")
+    conn.commit()
+    conn.close()
+    _db_ready = True
+
+
+def _last_checked_key(home_id) -> str:
+    return f"last_checked:{normalize_home(home_id)}"
+
+
+# -------------------------------------------------
+# State Transitions
+# -------------------------------------------------
+def _status_for(severity: str) -> str:
+    return "escalated" if severity == "critical" else "open"
+
+
+def apply_evaluation(detected: List[Dict[str, Any]], home_id=None) -> Dict[str, int]:
+    """
+    Reconciles one evaluation run of a home with its stored state in a single transaction:
+    - new id                       → open (or escalated if already critical)
+    - open and now critical        → escalated
+    - active but no longer present → resolved
+    - resolved but present again   → reopened
+    """
+    home_id = normalize_home(home_id)
+    now = datetime.utcnow().isoformat()
+    counts = {"opened": 0, "escalated": 0, "resolved": 0, "updated": 0}
+
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        existing = {
+            row["id"]: row
+            for row in conn.execute("SELECT id, status, severity FROM alerts WHERE home_id = ?", (home_id,))
+        }
+
+        for alert in detected:
+            status = _status_for(alert["severity"])
+            row = existing.get(alert["id"])
+
+            if row is None:
+                counts["opened"] += 1
+                conn.execute(
+                    """
+                    INSERT INTO alerts (home_id, id, device, severity, status, message, duration_hours,
+                                        power_watts, estimated_cost, first_detected, last_seen,
+                                        opened_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (home_id, alert["id"], alert["device"], alert["severity"], status, alert["message"],
+                     alert["duration_hours"], alert["power_watts"], alert["estimated_cost"],
+                     alert["first_detected"], alert["last_seen"], now, now),
+                )
+                continue
+
+            if row["status"] == "escalated":
+                status = "escalated"   # never downgrade an escalated alert
+            elif status == "escalated":
+                counts["escalated"] += 1
+            elif row["status"] == "resolved":
+                counts["opened"] += 1
+            else:
+                counts["updated"] += 1
+
+            conn.execute(
+                """
+                UPDATE alerts
+                SET severity = ?, status = ?, message = ?, duration_hours = ?, power_watts = ?,
+                    estimated_cost = ?, last_seen = ?, updated_at = ?, resolved_at = NULL
+                WHERE home_id = ? AND id = ?
+                """,
+                (alert["severity"], status, alert["message"], alert["duration_hours"],
+                 alert["power_watts"], alert["estimated_cost"], alert["last_seen"], now, home_id, alert["id"]),
+            )
+
+        detected_ids = {a["id"] for a in detected}
+        for alert_id, row in existing.items():
+            if row["status"] in ACTIVE_STATUSES and alert_id not in detected_ids:
+                counts["resolved"] += 1
+                conn.execute(
+                    "UPDATE alerts SET status = 'resolved', resolved_at = ?, updated_at = ? WHERE home_id = ? AND id = ?",
+                    (now, now, home_id, alert_id),
+                )
+
+        conn.execute(
+            "INSERT OR REPLACE INTO alert_meta (key, value) VALUES (?, ?)",
+            (_last_checked_key(home_id), datetime.now().isoformat()),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return counts
+
+
+# -------------------------------------------------
+# Reads (what /api/alerts serves)
+# -------------------------------------------------
+def get_open_alerts(home_id=None) -> List[Dict[str, Any]]:
+    conn = _connect()
+    rows = conn.execute(
+        f"""
+        SELECT * FROM alerts
+        WHERE home_id = ? AND status IN ({",".join("?" * len(ACTIVE_STATUSES))})
+        ORDER BY CASE severity WHEN 'critical' THEN 0 ELSE 1 END, duration_hours DESC
+        """,
+        (normalize_home(home_id), *ACTIVE_STATUSES),
+    ).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def get_last_checked(home_id=None):
+    conn = _connect()
+    row = conn.execute("SELECT value FROM alert_meta WHERE key = ?", (_last_checked_key(home_id),)).fetchone()
+    conn.close()
+    return row["value"] if row else None
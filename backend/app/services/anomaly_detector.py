@@ -3,6 +3,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import timedelta
 from app.services.data_loader import load_energy_data
+from app.ml.model_registry import resolve_model_path
 
 # ---------------------------------------------------------
 # LOAD TRAINED ISOLATION FOREST MODEL
@@ -11,34 +12,49 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 MODEL_PATH = BASE_DIR / "app" / "ml" / "models" / "anomaly_isolation_forest.pkl"
 
 model_pipeline = None
+_model_path = None
 
 def load_anomaly_model():
-    global model_pipeline
-    if MODEL_PATH.exists():
+    """
+    The active Isolation Forest (None → rule-based fallback). Follows the
+    registry: reloaded only after a promotion/rollback changes the path.
+    """
+    global model_pipeline, _model_path
+    model_path = resolve_model_path(MODEL_PATH.stem, MODEL_PATH)
+    if model_path == _model_path:
+        return model_pipeline
+
+    _model_path = model_path
+    model_pipeline = None
+    if model_path.exists():
         try:
-            model_pipeline = joblib.load(MODEL_PATH)
-            print(f"✅ Anomaly Model loaded: {MODEL_PATH}")
+            model_pipeline = joblib.load(model_path)
+            print(f"✅ Anomaly Model loaded: {model_path}")
         except Exception as e:
             print(f"⚠️ Failed to load Anomaly Model: {e}")
     else:
         print("⚠️ Anomaly Model not found. Using fallback logic.")
+    return model_pipeline
 
 load_anomaly_model()
 
-def detect_anomalies(records=None):
+def detect_anomalies(records=None, days=30, home_id=None):
     """
-    Detects anomalies in the LAST 30 DAYS using Isolation Forest.
+    Detects anomalies in the LAST `days` DAYS of a home's data using
+    Isolation Forest (days=None scans the whole history).
     """
     # 1. Load Data
-    df = load_energy_data()
+    df = load_energy_data(home_id)
     if df.empty:
         return []
 
     # 2. Filter for Last 30 Days (To match Dashboard)
     df["timestamp"] = pd.to_datetime(df["timestamp"])
-    latest_date = df["timestamp"].max()
-    start_date = latest_date - timedelta(days=30)
-    monthly_df = df[df["timestamp"] >= start_date].copy()
+    if days is None:
+        monthly_df = df.copy()
+    else:
+        start_date = df["timestamp"].max() - timedelta(days=days)
+        monthly_df = df[df["timestamp"] >= start_date].copy()
 
     anomalies = []
 
@@ -53,9 +69,10 @@ def detect_anomalies(records=None):
     X = monthly_df[features].fillna(0)
 
     # 4. Run Inference
-    if model_pipeline:
+    model = load_anomaly_model()
+    if model:
         try:
-            preds = model_pipeline.predict(X)
+            preds = model.predict(X)
             monthly_df["anomaly_score"] = preds
             
             # -1 indicates anomaly
@@ -71,38 +88,63 @@ def detect_anomalies(records=None):
                 })
         except Exception as e:
             print(f"ML Inference Failed: {e}")
-            return _rule_based_detection(monthly_df)
+            return _rule_based_detection(monthly_df, home_id)
     else:
-        return _rule_based_detection(monthly_df)
+        return _rule_based_detection(monthly_df, home_id)
 
     return anomalies
 
-def _rule_based_detection(df):
+# Static limits, used until a device has enough history in its learned profile
+DEFAULT_POWER_LIMIT_WATTS = 4000
+DEFAULT_ENERGY_LIMIT_KWH = 4.5
+SURGE_PERCENTILE = 0.99
+
+def _rule_based_detection(df, home_id=None):
     """
-    Fallback logic: Catches massive power spikes (>4000W) 
-    or high energy (>4.5 kWh)
+    Fallback logic: Catches power spikes or high energy readings above the
+    device's learned 99th percentile (4000W / 4.5 kWh without history)
     """
+    if df.empty:
+        return []
+
+    try:
+        from app.services.device_profiles import get_device_profiles
+        profiles = get_device_profiles(home_id)
+    except Exception as e:
+        print(f"⚠️ Device profiles unavailable, using static limits: {e}")
+        profiles = None
+
+    def limit(device, metric, default):
+        if profiles is None:
+            return default
+        return profiles.threshold(device, metric, SURGE_PERCENTILE, default)
+
+    devices = df["device_name"].unique()
+    power_limits = {d: limit(d, "power_watts", DEFAULT_POWER_LIMIT_WATTS) for d in devices}
+    energy_limits = {d: limit(d, "energy_kwh", DEFAULT_ENERGY_LIMIT_KWH) for d in devices}
+
+    power = df["power_watts"].fillna(0)
+    energy = df["energy_kwh"].fillna(0)
+    surge = power > df["device_name"].map(power_limits)
+    high_energy = ~surge & (energy > df["device_name"].map(energy_limits))
+
     anomalies = []
-    for _, row in df.iterrows():
-        power = row.get("power_watts", 0)
-        energy = row.get("energy_kwh", 0)
-        
-        # Updated Rules based on your CSV data
-        if power > 4000: # Catch the 200kW spikes
+    for row in df[surge | high_energy].itertuples(index=False):
+        if row.power_watts > power_limits[row.device_name]:
             anomalies.append({
-                "timestamp": str(row["timestamp"]),
-                "device_name": row.get("device_name", "Unknown"),
-                "energy_kwh": round(energy, 2),
-                "threshold_kwh": "4000W Limit",
-                "reason": f"Critical Load Surge ({int(power)}W)"
+                "timestamp": str(row.timestamp),
+                "device_name": row.device_name,
+                "energy_kwh": round(row.energy_kwh, 2),
+                "threshold_kwh": f"{power_limits[row.device_name]:.0f}W Limit",
+                "reason": f"Critical Load Surge ({int(row.power_watts)}W)"
             })
-        elif energy > 4.5: # Catch the 4.9 kWh spikes
+        else:
             anomalies.append({
-                "timestamp": str(row["timestamp"]),
-                "device_name": row.get("device_name", "Unknown"),
-                "energy_kwh": round(energy, 2),
-                "threshold_kwh": "4.5 kWh",
+                "timestamp": str(row.timestamp),
+                "device_name": row.device_name,
+                "energy_kwh": round(row.energy_kwh, 2),
+                "threshold_kwh": f"{energy_limits[row.device_name]:.2f} kWh",
                 "reason": "High Energy Consumption"
             })
-            
-    return anomalies
\ No newline at end of file
+
+    return anomalies
@@ -0,0 +1,229 @@
+"""
+Request Authentication
+Every API request except the public ones (health, docs, /auth/*) must
+carry `Authorization: Bearer <jwt>`. The token's signature is checked
+once; the decoded claims are then kept in a bounded LRU keyed by the
+token's SHA-256 until the token's `exp`, so the steady-state cost per
+request is one hash and one dict lookup (see /api/auth/stats for the
+measured overhead in microseconds).
+
+The middleware resolves the user's home (data partition) when the token
+is first seen and puts `user_id`, `email` and `home_id` into
+`scope["state"]` - endpoints read them from `request.state`, and the
+rate limiter uses `user_id` for its per-user buckets.
+
+- EventSource cannot send headers: /api/events also accepts
+  `?access_token=<jwt>`.
+- Limits are per process, like the rate limiter.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+import anyio.to_thread
+from starlette.requests import Request
+
+from app.services.auth_service import verify_jwt_token
+from app.services.data_loader import DEFAULT_HOME_ID
+
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "true").lower() == "true"
+AUTH_CACHE_MAX_TOKENS = int(os.getenv("AUTH_CACHE_MAX_TOKENS", "10000"))
+
+PUBLIC_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"}
+PUBLIC_PREFIXES = ("/auth/",)
+QUERY_TOKEN_PATHS = {"/api/events"}
+
+
+def is_public(path: str) -> bool:
+    return path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIXES)
+
+
+# -------------------------------------------------
+# Verified Claims Cache
+# -------------------------------------------------
+class ClaimsCache:
+    def __init__(self, max_tokens: int = AUTH_CACHE_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self._entries = OrderedDict()      # sha256(token) -> identity dict (with "exp")
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "rejected": 0, "expired": 0, "evicted": 0}
+
+    def get(self, digest: bytes):
+        with self._lock:
+            identity = self._entries.get(digest)
+            if identity is None:
+                self.counters["misses"] += 1
+                return None
+            if identity["exp"] <= time.time():
+                del self._entries[digest]
+                self.counters["expired"] += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.counters["hits"] += 1
+            return identity
+
+    def put(self, digest: bytes, identity: dict):
+        with self._lock:
+            self._entries[digest] = identity
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_tokens:
+                self._entries.popitem(last=False)
+                self.counters["evicted"] += 1
+
+    def reject(self):
+        with self._lock:
+            self.counters["rejected"] += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+claims_cache = ClaimsCache()
+
+
+def _stored_home(email: str) -> str:
+    """Home of a user whose token predates homes (one SQLite read)."""
+    from auth_db import get_user_home
+    return get_user_home(email)
+
+
+def _identity(claims: dict, home_id: str) -> dict:
+    """What a request needs from a verified token, incl. its home (data partition)."""
+    email = claims.get("email")
+    return {"user_id": email, "email": email, "home_id": home_id, "exp": float(claims["exp"])}
+
+
+def _verified_claims(token: str):
+    claims = verify_jwt_token(token)
+    if not claims or not claims.get("email") or "exp" not in claims:
+        claims_cache.reject()
+        return None
+    return claims
+
+
+def authenticate(token: str):
+    """Identity for `token` (cached until exp), or None if invalid / expired."""
+    digest = hashlib.sha256(token.encode()).digest()
+    identity = claims_cache.get(digest)
+    if identity is not None:
+        return identity
+
+    claims = _verified_claims(token)
+    if claims is None:
+        return None
+    home_id = claims.get("home_id")
+    if home_id is None:
+        home_id = _stored_home(claims["email"])
+    identity = _identity(claims, home_id)
+    claims_cache.put(digest, identity)
+    return identity
+
+
+async def authenticate_async(token: str):
+    """authenticate() for the middleware: the SQLite home lookup runs on a worker thread."""
+    digest = hashlib.sha256(token.encode()).digest()
+    identity = claims_cache.get(digest)
+    if identity is not None:
+        return identity
+
+    claims = _verified_claims(token)
+    if claims is None:
+        return None
+    home_id = claims.get("home_id")
+    if home_id is None:
+        # Tokens issued before homes were assigned; the auth DB may wait on
+        # its busy timeout, which must not stall the event loop
+        home_id = await anyio.to_thread.run_sync(_stored_home, claims["email"])
+    identity = _identity(claims, home_id)
+    claims_cache.put(digest, identity)
+    return identity
+
+
+def _bearer_token(scope):
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" else None
+    if scope.get("path") in QUERY_TOKEN_PATHS and scope.get("query_string"):
+        tokens = parse_qs(scope["query_string"].decode("latin-1")).get("access_token")
+        return tokens[0] if tokens else None
+    return None
+
+
+# -------------------------------------------------
+# ASGI Middleware
+# -------------------------------------------------
+_timing = {"requests": 0, "total_ns": 0, "max_ns": 0}
+
+
+class AuthMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS" or is_public(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter_ns()
+        token = _bearer_token(scope)
+        identity = await authenticate_async(token) if token else None
+        elapsed = time.perf_counter_ns() - started
+        _timing["requests"] += 1
+        _timing["total_ns"] += elapsed
+        _timing["max_ns"] = max(_timing["max_ns"], elapsed)
+
+        if identity is None:
+            if AUTH_REQUIRED:
+                detail = "Invalid or expired token" if token else "Not authenticated"
+                await self._send_401(send, detail)
+                return
+        else:
+            state = scope.setdefault("state", {})
+            state["user_id"] = identity["user_id"]
+            state["email"] = identity["email"]
+            state["home_id"] = identity["home_id"]
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _send_401(send, detail: str):
+        body = ('{"detail": "%s"}' % detail).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"www-authenticate", b"Bearer"),
+        ]
+        await send({"type": "http.response.start", "status": 401, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+# -------------------------------------------------
+# Request Identity (FastAPI dependencies)
+# -------------------------------------------------
+def current_home(request: Request) -> str:
+    """Home (data partition) of the authenticated user; the default home for anonymous requests."""
+    return getattr(request.state, "home_id", None) or DEFAULT_HOME_ID
+
+
+def chat_session_key(request: Request, session_id: str) -> str:
+    """Chat session ids are chosen by the client: scope them to the user."""
+    user = getattr(request.state, "user_id", None)
+    return f"{user}:{session_id}" if user else session_id
+
+
+def get_auth_stats() -> dict:
+    requests = _timing["requests"]
+    return {
+        "required": AUTH_REQUIRED,
+        "cached_tokens": len(claims_cache),
+        "max_tokens": claims_cache.max_tokens,
+        **claims_cache.counters,
+        "requests": requests,
+        "avg_overhead_us": round(_timing["total_ns"] / requests / 1000, 2) if requests else 0.0,
+        "max_overhead_us": round(_timing["max_ns"] / 1000, 2),
+    }
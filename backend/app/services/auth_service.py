@@ -92,10 +92,16 @@ def _send_via_smtp(recipient_email: str, otp: str) -> bool:
     smtp_sender = os.getenv("SMTP_SENDER", smtp_user).strip()
     smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com").strip()
     smtp_port = int(os.getenv("SMTP_PORT", "587"))
+    # Local SMTP stubs / relays: SMTP_STARTTLS=false and SMTP_AUTH=false
+    smtp_starttls = os.getenv("SMTP_STARTTLS", "true").strip().lower() in {"1", "true", "yes", "on"}
+    smtp_auth = os.getenv("SMTP_AUTH", "true").strip().lower() in {"1", "true", "yes", "on"}
 
-    if not smtp_user or not smtp_pass:
+    if smtp_auth and (not smtp_user or not smtp_pass):
         print("❌ SMTP fallback not configured: missing SMTP_USER/SMTP_PASS or SENDER_EMAIL/SENDER_PASSWORD")
         return False
+    if not smtp_sender:
+        print("❌ SMTP fallback not configured: missing SMTP_SENDER")
+        return False
 
     try:
         print(f"📤 SMTP fallback activated for {recipient_email} via {smtp_server}:{smtp_port}")
@@ -108,8 +114,10 @@ def _send_via_smtp(recipient_email: str, otp: str) -> bool:
         msg["Subject"] = "Your Enverse Login Code"
         msg.attach(MIMEText(_otp_email_html(otp), "html"))
         with smtplib.SMTP(smtp_server, smtp_port, timeout=10) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
+            if smtp_starttls:
+                server.starttls()
+            if smtp_auth:
+                server.login(smtp_user, smtp_pass)
             server.sendmail(smtp_sender, recipient_email, msg.as_string())
         print(f"✅ SUCCESS: OTP email sent to {recipient_email} via SMTP fallback")
         return True
@@ -121,30 +129,30 @@ def _send_via_smtp(recipient_email: str, otp: str) -> bool:
         print(f"📋 Full traceback:\n{traceback.format_exc()}")
         return False
 
-def send_otp_email(recipient_email: str, otp: str) -> bool:
-    """Send OTP via SendGrid API first, with SMTP only as an opt-in fallback."""
-    sendgrid_api_key = os.getenv("SENDGRID_API_KEY", "").strip()
-    sender_email = os.getenv("SENDER_EMAIL", "").strip()
-
-    if _send_via_sendgrid(recipient_email, otp, sendgrid_api_key, sender_email):
-        print("="*60 + "\n")
-        return True
-
-    print("⚠️ SendGrid delivery failed or is not configured.")
-    if not _smtp_fallback_enabled():
-        print("ℹ️ SMTP fallback disabled. Set SMTP_FALLBACK_ENABLED=true to enable it.")
-        print("="*60 + "\n")
-        return False
-
-    print("⚠️ Falling back to SMTP transport.")
-    result = _send_via_smtp(recipient_email, otp)
-    print("="*60 + "\n")
-    return result
-
-def create_jwt_token(email: str) -> str:
+def _sendgrid_configured() -> bool:
+    return SENDGRID_AVAILABLE and bool(os.getenv("SENDGRID_API_KEY", "").strip()) and bool(os.getenv("SENDER_EMAIL", "").strip())
+
+def send_otp_via_sendgrid(recipient_email: str, otp: str) -> bool:
+    return _send_via_sendgrid(
+        recipient_email, otp,
+        os.getenv("SENDGRID_API_KEY", "").strip(),
+        os.getenv("SENDER_EMAIL", "").strip(),
+    )
+
+def otp_email_providers():
+    """[(name, send_fn)] in preference order, configured providers only (see email_dispatch)."""
+    providers = []
+    if _sendgrid_configured():
+        providers.append(("sendgrid", send_otp_via_sendgrid))
+    if _smtp_fallback_enabled():
+        providers.append(("smtp", _send_via_smtp))
+    return providers
+
+def create_jwt_token(email: str, home_id: str = None) -> str:
     """Create JWT token for authenticated user"""
     payload = {
         "email": email,
+        "home_id": home_id,
         "exp": datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS),
         "iat": datetime.utcnow()
     }
@@ -1,23 +1,25 @@
 # backend/app/services/billing_service.py
 
-def calculate_electricity_bill(units_kwh: float) -> dict:
+def calculate_electricity_bill(units_kwh: float, slab_scale: float = 1.0) -> dict:
     """
     Calculates electricity bill using Indian domestic slab system.
     Slabs are approximate and exam-friendly.
+    slab_scale prorates the slab widths for a part of a month (days / days in month).
     """
 
     bill = 0.0
     remaining_units = units_kwh
+    slab_width = 100 * slab_scale
 
     # Slab 1: 0–100 units → ₹3/unit
     if remaining_units > 0:
-        slab_units = min(remaining_units, 100)
+        slab_units = min(remaining_units, slab_width)
         bill += slab_units * 3
         remaining_units -= slab_units
 
     # Slab 2: 101–200 units → ₹5/unit
     if remaining_units > 0:
-        slab_units = min(remaining_units, 100)
+        slab_units = min(remaining_units, slab_width)
         bill += slab_units * 5
         remaining_units -= slab_units
 
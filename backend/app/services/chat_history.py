@@ -0,0 +1,167 @@
+"""
+Chat History Compaction (token-budgeted)
+Keeps the prompt size of long conversations flat:
+- Tokens are counted locally (tiktoken when installed, else ~4 chars/token).
+- The prompt gets the running summary plus the newest turns that fit in
+  CHAT_HISTORY_TOKEN_BUDGET; anything older is left out of the prompt.
+- Once stored turns exceed the budget (or approach the session message
+  cap), the oldest ones are folded into the running summary by a
+  background task, after the reply has already been sent. Only turns
+  newer than what the summary covers are then resent verbatim.
+
+Summaries come from the LLM (CHAT_SUMMARY_MODEL, fallback model by
+default). If it is unavailable, earlier user questions are kept as a
+bullet list so nothing the user asked is silently lost.
+"""
+
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from app.services.chat_sessions import session_store, CHAT_SESSION_MAX_MESSAGES
+
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1200"))
+CHAT_HISTORY_KEEP_TOKENS = int(os.getenv("CHAT_HISTORY_KEEP_TOKENS", "600"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "250"))
+CHAT_HISTORY_ENCODING = os.getenv("CHAT_HISTORY_ENCODING", "o200k_base")
+
+MESSAGE_OVERHEAD_TOKENS = 4     # role + separators per chat message
+CHARS_PER_TOKEN = 4             # estimate without tiktoken
+
+# -------------------------------------------------
+# Token Counting
+# -------------------------------------------------
+_encoding = None
+if tiktoken is not None:
+    try:
+        _encoding = tiktoken.get_encoding(CHAT_HISTORY_ENCODING)
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding {CHAT_HISTORY_ENCODING} unavailable, estimating tokens: {e}")
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _newest_within(messages: List[dict], budget: int) -> List[dict]:
+    """Newest messages whose tokens fit `budget`, whole user/assistant turns only."""
+    kept, used = [], 0
+    for i in range(len(messages) - 1, -1, -2):
+        turn = messages[max(0, i - 1):i + 1]
+        cost = sum(message_tokens(m) for m in turn)
+        if used + cost > budget:
+            break
+        kept[:0] = turn
+        used += cost
+    return kept
+
+
+def _strip(messages: List[dict]) -> List[dict]:
+    return [{"role": m["role"], "content": m["content"]} for m in messages]
+
+
+# -------------------------------------------------
+# Prompt History
+# -------------------------------------------------
+def build_history(session_id: str) -> List[dict]:
+    """Summary (as a system message) + newest verbatim turns within the token budget."""
+    context = session_store.get_context(session_id)
+    history = []
+    if context["summary"]:
+        history.append({"role": "system", "content": f"Conversation so far (summary): {context['summary']}"})
+    history.extend(_strip(_newest_within(context["messages"], CHAT_HISTORY_TOKEN_BUDGET)))
+    return history
+
+
+def fallback_summary(previous: str, messages: List[dict]) -> str:
+    """No LLM: keep the earlier questions, trimmed to CHAT_SUMMARY_MAX_TOKENS."""
+    lines = [previous] if previous else []
+    lines += [f"- User asked: {m['content'][:200]}" for m in messages if m["role"] == "user"]
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > CHAT_SUMMARY_MAX_TOKENS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+# -------------------------------------------------
+# Background Compaction
+# -------------------------------------------------
+Summarizer = Callable[[str, List[dict]], Awaitable[Optional[str]]]
+
+
+class HistoryCompactor:
+    def __init__(self):
+        self._in_flight = set()      # session ids being compacted
+        self._tasks = set()          # strong refs until the task finishes
+        self.compactions = 0
+        self.fallbacks = 0
+        self.messages_folded = 0
+
+    @staticmethod
+    def needs_compaction(messages: List[dict]) -> bool:
+        if len(messages) >= CHAT_SESSION_MAX_MESSAGES - 2:
+            return True       # fold before the store starts dropping turns
+        return sum(message_tokens(m) for m in messages) > CHAT_HISTORY_TOKEN_BUDGET
+
+    def schedule(self, session_id: str, summarize: Summarizer):
+        """Starts compaction for `session_id` if needed; returns immediately."""
+        if session_id in self._in_flight:
+            return
+        self._in_flight.add(session_id)
+        task = asyncio.get_running_loop().create_task(self._run(session_id, summarize))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, session_id: str, summarize: Summarizer):
+        try:
+            context = await asyncio.to_thread(session_store.get_context, session_id)
+            messages = context["messages"]
+            if not self.needs_compaction(messages):
+                return
+
+            keep = _newest_within(messages, CHAT_HISTORY_KEEP_TOKENS)
+            fold = messages[:len(messages) - len(keep)]
+            if not fold:
+                return
+
+            summary = None
+            try:
+                summary = await summarize(context["summary"], _strip(fold))
+            except Exception as e:
+                print(f"⚠️ Chat summary failed ({type(e).__name__}), keeping earlier questions.")
+            if not summary:
+                self.fallbacks += 1
+                summary = fallback_summary(context["summary"], fold)
+
+            await asyncio.to_thread(session_store.compact, session_id, summary.strip(), fold[-1]["seq"])
+            self.compactions += 1
+            self.messages_folded += len(fold)
+        except Exception as e:
+            print(f"⚠️ Chat history compaction failed: {e}")
+        finally:
+            self._in_flight.discard(session_id)
+
+    def stats(self) -> dict:
+        return {
+            "token_counter": "tiktoken" if _encoding is not None else "estimate",
+            "token_budget": CHAT_HISTORY_TOKEN_BUDGET,
+            "compactions": self.compactions,
+            "fallback_summaries": self.fallbacks,
+            "messages_folded": self.messages_folded,
+            "in_flight": len(self._in_flight),
+        }
+
+
+compactor = HistoryCompactor()
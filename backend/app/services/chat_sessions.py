@@ -0,0 +1,308 @@
+"""
+Chat Session Store
+Conversation history per session_id, bounded so memory stays flat no
+matter how many distinct sessions hit /chat:
+- CHAT_SESSION_MAX_MESSAGES   messages kept per session (oldest dropped)
+- CHAT_SESSION_TTL_SECONDS    idle sessions expire
+- CHAT_SESSION_MAX_SESSIONS   least recently used sessions evicted beyond this
+- CHAT_SESSION_MEMORY_BUDGET_BYTES  total text across all sessions
+
+Besides the recent messages each session keeps a running summary of the
+turns folded away by chat_history (compact), so long conversations keep
+their context without resending every message.
+
+Backends (CHAT_SESSION_BACKEND):
+- "memory" (default): in-process LRU, fastest, one history per worker.
+- "sqlite": shared file (WAL) so several uvicorn workers see the same history.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List
+
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory").lower()
+CHAT_SESSION_MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "20"))
+CHAT_SESSION_TTL_SECONDS = float(os.getenv("CHAT_SESSION_TTL_SECONDS", "86400"))
+CHAT_SESSION_MAX_SESSIONS = int(os.getenv("CHAT_SESSION_MAX_SESSIONS", "5000"))
+CHAT_SESSION_MEMORY_BUDGET_BYTES = int(os.getenv("CHAT_SESSION_MEMORY_BUDGET_BYTES", str(32 * 1024 * 1024)))
+
+MESSAGE_OVERHEAD_BYTES = 100   # dict + strings bookkeeping per stored message
+
+# Database path - same hosting rules as auth_db
+db_path_override = os.getenv("CHAT_SESSION_DB_PATH", "").strip()
+if db_path_override:
+    DB_PATH = Path(db_path_override)
+elif os.getenv("RAILWAY_ENVIRONMENT"):
+    DB_PATH = Path("/app/storage/chat_sessions.db")
+elif os.getenv("K_SERVICE"):
+    DB_PATH = Path("/tmp/chat_sessions.db")
+else:
+    DB_PATH = Path(__file__).resolve().parents[2] / "chat_sessions.db"
+
+
+def _message_bytes(message: Dict[str, str]) -> int:
+    return len(message["content"].encode("utf-8")) + MESSAGE_OVERHEAD_BYTES
+
+
+def _text_bytes(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+# -------------------------------------------------
+# In-Process Backend
+# -------------------------------------------------
+class InMemorySessionStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()    # session_id -> {"messages", "summary", "next_seq", "bytes", "last_access"}
+        self._total_bytes = 0
+        self.evicted = 0
+
+    def _drop(self, session_id):
+        entry = self._sessions.pop(session_id)
+        self._total_bytes -= entry["bytes"]
+        self.evicted += 1
+
+    def _enforce_limits(self, now: float):
+        # Oldest-accessed first: expired, then over count / over budget
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            expired = now - oldest["last_access"] > CHAT_SESSION_TTL_SECONDS
+            if not (expired
+                    or len(self._sessions) > CHAT_SESSION_MAX_SESSIONS
+                    or self._total_bytes > CHAT_SESSION_MEMORY_BUDGET_BYTES):
+                break
+            self._drop(oldest_id)
+
+    def get_context(self, session_id: str) -> dict:
+        """{"summary", "messages"}; each message carries its sequence number ("seq")."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return {"summary": "", "messages": []}
+            if now - entry["last_access"] > CHAT_SESSION_TTL_SECONDS:
+                self._drop(session_id)
+                return {"summary": "", "messages": []}
+            entry["last_access"] = now
+            self._sessions.move_to_end(session_id)
+            return {"summary": entry["summary"], "messages": [dict(m) for m in entry["messages"]]}
+
+    def get_history(self, session_id: str) -> List[Dict[str, str]]:
+        return [{"role": m["role"], "content": m["content"]} for m in self.get_context(session_id)["messages"]]
+
+    def append_turn(self, session_id: str, user_message: str, assistant_reply: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = {"messages": [], "summary": "", "next_seq": 1, "bytes": 0, "last_access": now}
+                self._sessions[session_id] = entry
+
+            seq = entry["next_seq"]
+            new = [
+                {"role": "user", "content": user_message, "seq": seq},
+                {"role": "assistant", "content": assistant_reply, "seq": seq + 1},
+            ]
+            entry["next_seq"] = seq + 2
+            self._store(entry, (entry["messages"] + new)[-CHAT_SESSION_MAX_MESSAGES:], entry["summary"])
+            entry["last_access"] = now
+            self._sessions.move_to_end(session_id)
+            self._enforce_limits(now)
+
+    def compact(self, session_id: str, summary: str, upto_seq: int):
+        """Replaces messages with seq <= upto_seq by `summary`."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            self._store(entry, [m for m in entry["messages"] if m["seq"] > upto_seq], summary)
+            self._enforce_limits(time.monotonic())
+
+    def _store(self, entry: dict, messages: list, summary: str):
+        size = sum(_message_bytes(m) for m in messages) + _text_bytes(summary)
+        self._total_bytes += size - entry["bytes"]
+        entry.update(messages=messages, summary=summary, bytes=size)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._total_bytes,
+                "evicted": self.evicted,
+            }
+
+
+# -------------------------------------------------
+# SQLite Backend (shared across workers)
+# -------------------------------------------------
+class SQLiteSessionStore:
+    PURGE_EVERY_WRITES = 50
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        self.evicted = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                bytes INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, id)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                session_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL,
+                bytes INTEGER NOT NULL,
+                summary TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(chat_sessions)")}
+        if "summary" not in columns:
+            # Databases created before history compaction
+            conn.execute("ALTER TABLE chat_sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_access ON chat_sessions(last_access)")
+        conn.commit()
+
+    def _conn(self):
+        # One connection per thread, reused across requests
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_context(self, session_id: str) -> dict:
+        """{"summary", "messages"}; each message carries its sequence number ("seq")."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT last_access, summary FROM chat_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return {"summary": "", "messages": []}
+        now = time.time()
+        if now - row[0] > CHAT_SESSION_TTL_SECONDS:
+            with conn:
+                self._delete_sessions(conn, [session_id])
+            return {"summary": "", "messages": []}
+
+        rows = conn.execute(
+            "SELECT id, role, content FROM chat_messages WHERE session_id = ? ORDER BY id", (session_id,)
+        ).fetchall()
+        with conn:
+            conn.execute("UPDATE chat_sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+        return {
+            "summary": row[1],
+            "messages": [{"role": role, "content": content, "seq": seq} for seq, role, content in rows],
+        }
+
+    def get_history(self, session_id: str) -> List[Dict[str, str]]:
+        return [{"role": m["role"], "content": m["content"]} for m in self.get_context(session_id)["messages"]]
+
+    def append_turn(self, session_id: str, user_message: str, assistant_reply: str):
+        conn = self._conn()
+        now = time.time()
+        new = [("user", user_message), ("assistant", assistant_reply)]
+        with conn:
+            conn.executemany(
+                "INSERT INTO chat_messages (session_id, role, content, bytes) VALUES (?, ?, ?, ?)",
+                [(session_id, role, content, _message_bytes({"content": content})) for role, content in new],
+            )
+            # Keep only the newest CHAT_SESSION_MAX_MESSAGES
+            conn.execute(
+                """
+                DELETE FROM chat_messages WHERE session_id = ? AND id NOT IN (
+                    SELECT id FROM chat_messages WHERE session_id = ? ORDER BY id DESC LIMIT ?
+                )
+                """,
+                (session_id, session_id, CHAT_SESSION_MAX_MESSAGES),
+            )
+            conn.execute(
+                """
+                INSERT INTO chat_sessions (session_id, last_access, bytes) VALUES (?, ?, 0)
+                ON CONFLICT(session_id) DO UPDATE SET last_access = excluded.last_access
+                """,
+                (session_id, now),
+            )
+            self._update_size(conn, session_id)
+
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY_WRITES == 0:
+            self.purge()
+
+    def compact(self, session_id: str, summary: str, upto_seq: int):
+        """Replaces messages with seq <= upto_seq by `summary`."""
+        conn = self._conn()
+        with conn:
+            updated = conn.execute(
+                "UPDATE chat_sessions SET summary = ? WHERE session_id = ?", (summary, session_id)
+            ).rowcount
+            if not updated:
+                return
+            conn.execute("DELETE FROM chat_messages WHERE session_id = ? AND id <= ?", (session_id, upto_seq))
+            self._update_size(conn, session_id)
+
+    def _update_size(self, conn, session_id: str):
+        conn.execute(
+            """
+            UPDATE chat_sessions SET bytes = LENGTH(CAST(summary AS BLOB)) + (
+                SELECT COALESCE(SUM(bytes), 0) FROM chat_messages WHERE session_id = ?
+            ) WHERE session_id = ?
+            """,
+            (session_id, session_id),
+        )
+
+    def _delete_sessions(self, conn, session_ids):
+        conn.executemany("DELETE FROM chat_messages WHERE session_id = ?", [(s,) for s in session_ids])
+        conn.executemany("DELETE FROM chat_sessions WHERE session_id = ?", [(s,) for s in session_ids])
+        self.evicted += len(session_ids)
+
+    def purge(self):
+        """Drops expired sessions, then least recently used ones over the count / byte budget."""
+        conn = self._conn()
+        with conn:
+            expired = [r[0] for r in conn.execute(
+                "SELECT session_id FROM chat_sessions WHERE last_access < ?",
+                (time.time() - CHAT_SESSION_TTL_SECONDS,),
+            )]
+            self._delete_sessions(conn, expired)
+
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM chat_sessions").fetchone()
+            victims = []
+            for session_id, size in conn.execute("SELECT session_id, bytes FROM chat_sessions ORDER BY last_access"):
+                if count <= CHAT_SESSION_MAX_SESSIONS and total <= CHAT_SESSION_MEMORY_BUDGET_BYTES:
+                    break
+                victims.append(session_id)
+                count -= 1
+                total -= size
+            self._delete_sessions(conn, victims)
+
+    def stats(self) -> dict:
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM chat_sessions"
+        ).fetchone()
+        return {"backend": "sqlite", "sessions": count, "bytes": total, "evicted": self.evicted}
+
+
+def create_session_store():
+    if CHAT_SESSION_BACKEND == "sqlite":
+        print(f"✅ Chat sessions stored in SQLite: {DB_PATH}")
+        return SQLiteSessionStore()
+    return InMemorySessionStore()
+
+
+session_store = create_session_store()
@@ -0,0 +1,274 @@
+"""
+Chat Tools (tool-calling chat mode)
+Instead of pasting every number into the prompt, the model gets a few
+typed tools and asks for what the question needs. Tools are answered from
+aggregates built once per home and data version (in the home cache):
+- daily kWh per device as prefix sums → any date range in O(log n)
+- the full-history anomaly list, sorted by time
+
+The prompt stays the same size however much data there is, and questions
+about arbitrary ranges ("AC in the first week of February") just work.
+"""
+
+import calendar
+import json
+import numpy as np
+import pandas as pd
+from collections import Counter
+from datetime import date, timedelta
+from typing import Optional
+from app.services.data_loader import load_daily_rollup, cached_aggregate
+from app.services.billing_service import calculate_electricity_bill
+from app.services.knowledge_base import UI_NAME_MAP
+from app.services.intent_router import scan
+
+DEFAULT_WINDOW_DAYS = 30     # range used when the model gives no dates
+MAX_ANOMALIES_RETURNED = 20
+
+# -------------------------------------------------
+# Tool Schemas (OpenAI / Groq function-calling format)
+# -------------------------------------------------
+_RANGE_PROPERTIES = {
+    "start_date": {"type": "string", "description": "First day, YYYY-MM-DD (inclusive). Defaults to the start of the last 30 days of data."},
+    "end_date": {"type": "string", "description": "Last day, YYYY-MM-DD (inclusive). Defaults to the latest reading."},
+}
+
+TOOL_SPECS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_device_energy",
+            "description": "Energy (kWh), share of total and approximate cost of one device over a date range.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "device": {"type": "string", "description": "Device name, e.g. Air Conditioner, Refrigerator, Washing Machine, Lighting, Electronics."},
+                    **_RANGE_PROPERTIES,
+                },
+                "required": ["device"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_bill",
+            "description": "Total kWh and slab-tariff bill (INR) for a date range. Each calendar month is billed on its own slabs; a partial month gets proportionally smaller slabs.",
+            "parameters": {"type": "object", "properties": dict(_RANGE_PROPERTIES)},
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_top_consumers",
+            "description": "Devices ranked by energy over a date range.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    **_RANGE_PROPERTIES,
+                    "limit": {"type": "integer", "description": "How many devices (default 3)."},
+                    "order": {"type": "string", "enum": ["highest", "lowest"], "description": "Default highest."},
+                },
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_anomalies",
+            "description": "Detected abnormal readings in a date range, optionally for one device.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    **_RANGE_PROPERTIES,
+                    "device": {"type": "string", "description": "Optional device name."},
+                },
+            },
+        },
+    },
+]
+
+
+# -------------------------------------------------
+# Aggregates (built once per data version)
+# -------------------------------------------------
+class EnergyAggregates:
+    def __init__(self, daily_kwh: pd.DataFrame, anomalies: list):
+        """daily_kwh: kWh per day (rows, no gaps) and dataset device name (columns)."""
+        daily = daily_kwh.rename(columns=lambda d: UI_NAME_MAP.get(d, d))
+        if not daily.empty:
+            daily = daily.T.groupby(level=0).sum().T
+
+        self.devices = list(daily.columns)
+        self.days = daily.index.values.astype("datetime64[D]")
+        # Row i = total up to (not including) day i
+        self.cumulative = np.vstack([np.zeros(len(self.devices)), np.cumsum(daily.to_numpy(), axis=0)])
+        self.first_day = pd.Timestamp(self.days[0]).date() if len(self.days) else None
+        self.last_day = pd.Timestamp(self.days[-1]).date() if len(self.days) else None
+
+        for a in anomalies:
+            a["device_name"] = UI_NAME_MAP.get(a["device_name"], a["device_name"])
+        self.anomalies = sorted(anomalies, key=lambda a: a["timestamp"])
+        self.anomaly_days = np.array([a["timestamp"][:10] for a in self.anomalies], dtype="datetime64[D]")
+
+    # ---------------- Ranges ----------------
+    def resolve_range(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        end = date.fromisoformat(end_date) if end_date else self.last_day
+        start = date.fromisoformat(start_date) if start_date else end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+        if start > end:
+            raise ValueError("start_date is after end_date")
+        return start, end
+
+    def device_totals(self, start: date, end: date) -> dict:
+        i = np.searchsorted(self.days, np.datetime64(start, "D"), side="left")
+        j = np.searchsorted(self.days, np.datetime64(end, "D"), side="right")
+        totals = self.cumulative[j] - self.cumulative[i]
+        return {device: round(float(v), 2) for device, v in zip(self.devices, totals)}
+
+    def resolve_device(self, name: str) -> str:
+        """UI or dataset name, any case, or a known alias ("AC", "fridge", "एसी")."""
+        wanted = UI_NAME_MAP.get(name, name).strip().lower()
+        for device in self.devices:
+            if device.lower() == wanted:
+                return device
+        _, alias = scan(name.lower())
+        if alias in self.devices:
+            return alias
+        raise ValueError(f"Unknown device '{name}'. Known devices: {', '.join(self.devices)}")
+
+
+def get_aggregates(home_id=None) -> EnergyAggregates:
+    def build(_):
+        from app.services.anomaly_detector import detect_anomalies
+        return EnergyAggregates(load_daily_rollup(home_id), detect_anomalies(days=None, home_id=home_id))
+
+    return cached_aggregate("chat_tools", build, home_id)
+
+
+# -------------------------------------------------
+# Tools
+# -------------------------------------------------
+def _range_info(start: date, end: date) -> dict:
+    return {"start_date": start.isoformat(), "end_date": end.isoformat(), "days": (end - start).days + 1}
+
+
+def range_bill(agg: EnergyAggregates, start: date, end: date) -> float:
+    """
+    Slab bill for any date range. The slabs are monthly, so each calendar
+    month is billed separately, with slab widths prorated for partial months.
+    """
+    bill = 0.0
+    month_start = start
+    while month_start <= end:
+        days_in_month = calendar.monthrange(month_start.year, month_start.month)[1]
+        month_end = min(end, month_start.replace(day=days_in_month))
+        kwh = sum(agg.device_totals(month_start, month_end).values())
+        days = (month_end - month_start).days + 1
+        bill += calculate_electricity_bill(kwh, slab_scale=days / days_in_month)["estimated_bill_rupees"]
+        month_start = month_end + timedelta(days=1)
+    return round(bill, 2)
+
+
+def get_device_energy(agg: EnergyAggregates, device: str, start_date=None, end_date=None) -> dict:
+    device = agg.resolve_device(device)
+    start, end = agg.resolve_range(start_date, end_date)
+    totals = agg.device_totals(start, end)
+    total = sum(totals.values())
+    bill = range_bill(agg, start, end)
+    kwh = totals[device]
+    return {
+        "device": device,
+        **_range_info(start, end),
+        "energy_kwh": kwh,
+        "share_percent": round(kwh / total * 100, 1) if total else 0.0,
+        # Proportional cost from the slab-based bill (same as the dashboard)
+        "approx_cost_inr": round(kwh / total * bill, 2) if total else 0.0,
+    }
+
+
+def get_bill(agg: EnergyAggregates, start_date=None, end_date=None) -> dict:
+    start, end = agg.resolve_range(start_date, end_date)
+    total = round(sum(agg.device_totals(start, end).values()), 2)
+    return {
+        **_range_info(start, end),
+        "total_kwh": total,
+        "bill_inr": range_bill(agg, start, end),
+        "tariff": "monthly domestic slabs (₹3 / ₹5 / ₹8 per kWh), billed per calendar month, prorated for partial months",
+    }
+
+
+def get_top_consumers(agg: EnergyAggregates, start_date=None, end_date=None, limit=3, order="highest") -> dict:
+    start, end = agg.resolve_range(start_date, end_date)
+    totals = agg.device_totals(start, end)
+    total = sum(totals.values())
+    ranked = sorted(totals.items(), key=lambda x: x[1], reverse=(order != "lowest"))
+    return {
+        **_range_info(start, end),
+        "order": "lowest" if order == "lowest" else "highest",
+        "devices": [
+            {"device": d, "energy_kwh": kwh, "share_percent": round(kwh / total * 100, 1) if total else 0.0}
+            for d, kwh in ranked[:max(1, int(limit or 3))]
+        ],
+    }
+
+
+def get_anomalies(agg: EnergyAggregates, start_date=None, end_date=None, device=None) -> dict:
+    start, end = agg.resolve_range(start_date, end_date)
+    i = np.searchsorted(agg.anomaly_days, np.datetime64(start, "D"), side="left")
+    j = np.searchsorted(agg.anomaly_days, np.datetime64(end, "D"), side="right")
+    found = agg.anomalies[i:j]
+    if device:
+        device = agg.resolve_device(device)
+        found = [a for a in found if a["device_name"] == device]
+    return {
+        **_range_info(start, end),
+        "device": device,
+        "count": len(found),
+        "anomalies": found[-MAX_ANOMALIES_RETURNED:],    # most recent
+    }
+
+
+TOOLS = {
+    "get_device_energy": get_device_energy,
+    "get_bill": get_bill,
+    "get_top_consumers": get_top_consumers,
+    "get_anomalies": get_anomalies,
+}
+
+tool_calls = Counter()
+tool_errors = Counter()
+
+
+def execute_tool(name: str, arguments: str, home_id=None) -> str:
+    """
+    Runs one tool call from the model against the home's data and returns
+    its JSON result.
+    Bad names / arguments come back as {"error"} so the model can retry.
+    """
+    tool_calls[name] += 1
+    try:
+        fn = TOOLS.get(name)
+        if fn is None:
+            raise ValueError(f"Unknown tool '{name}'")
+        kwargs = json.loads(arguments or "{}")
+        if not isinstance(kwargs, dict):
+            raise ValueError("Arguments must be a JSON object")
+        result = fn(get_aggregates(home_id), **kwargs)
+    except (ValueError, TypeError) as e:
+        tool_errors[name] += 1
+        result = {"error": str(e)}
+    return json.dumps(result, ensure_ascii=False)
+
+
+def describe_dataset(home_id=None) -> str:
+    """Constant-size facts for the system prompt (coverage, device names)."""
+    agg = get_aggregates(home_id)
+    return (
+        f"DATA COVERAGE: {agg.first_day} to {agg.last_day}. "
+        f"Devices: {', '.join(agg.devices)}. "
+        "Call the tools for any number you need; never guess figures."
+    )
+
+
+def get_tool_stats() -> dict:
+    return {"calls": dict(tool_calls), "errors": dict(tool_errors)}
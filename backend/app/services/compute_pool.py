@@ -0,0 +1,227 @@
+"""
+CPU-Bound Work Offload
+pandas aggregation, IsolationForest scoring and the XGBoost forecast hold
+the GIL, so running them in FastAPI's threadpool stalls every other
+request of the worker (/health, auth, chat streaming). The endpoints hand
+those calls to a pool of warm processes instead and only wait on the
+result, which releases the GIL.
+
+- Workers are spawned at startup and preloaded: service modules imported,
+  models unpickled and the default home attached (from the shared data
+  snapshot, so each process adds little memory).
+- Bounded: at most COMPUTE_POOL_MAX_PENDING tasks queued or running; more
+  are rejected immediately with ComputePoolBusy (503 + Retry-After).
+- Every task has a deadline. A caller stops waiting at the deadline
+  (ComputeTimeout, 503) and a task still queued by then is dropped
+  without running.
+- Only the tasks in TASKS can be sent; COMPUTE_POOL_ENABLED=false runs
+  them inline (scripts, tests, single-core hosts).
+"""
+
+import importlib
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+COMPUTE_POOL_ENABLED = os.getenv("COMPUTE_POOL_ENABLED", "true").lower() == "true"
+COMPUTE_POOL_WORKERS = int(os.getenv("COMPUTE_POOL_WORKERS", str(os.cpu_count() or 2)))
+COMPUTE_POOL_MAX_PENDING = int(os.getenv("COMPUTE_POOL_MAX_PENDING", str(COMPUTE_POOL_WORKERS * 4)))
+
+# name -> (module, function, deadline in seconds)
+TASKS = {
+    "compute_dashboard_metrics": ("app.services.energy_calculator", "compute_dashboard_metrics", 10.0),
+    "detect_anomalies":          ("app.services.anomaly_detector", "detect_anomalies", 15.0),
+    "get_energy_forecast":       ("app.ml.predict_forecast", "get_energy_forecast", 20.0),
+}
+
+
+class ComputeUnavailable(Exception):
+    """The task could not be served in time; the API answers 503."""
+    retry_after = 1
+
+
+class ComputePoolBusy(ComputeUnavailable):
+    pass
+
+
+class ComputeTimeout(ComputeUnavailable):
+    retry_after = 2
+
+
+def _resolve(task: str):
+    module, name, _ = TASKS[task]
+    return getattr(importlib.import_module(module), name)
+
+
+# -------------------------------------------------
+# Worker Process
+# -------------------------------------------------
+def _warm_worker():
+    """Pool initializer: pay imports, model loading and data attach once, not per task."""
+    for task in TASKS:
+        _resolve(task)
+    try:
+        from app.ml.predict_forecast import load_forecast_model
+        from app.services.data_loader import home_cache
+        load_forecast_model()
+        home_cache.frame()
+    except Exception as e:
+        print(f"⚠️ Compute worker warm-up incomplete: {e}")
+
+
+def _ping():
+    return os.getpid()
+
+
+def _execute(task: str, args: tuple, kwargs: dict, deadline: float):
+    if time.time() > deadline:
+        raise ComputeTimeout(f"{task} expired while queued")
+    return _resolve(task)(*args, **kwargs)
+
+
+# -------------------------------------------------
+# Pool
+# -------------------------------------------------
+class ComputePool:
+    def __init__(self, workers: int = COMPUTE_POOL_WORKERS, max_pending: int = COMPUTE_POOL_MAX_PENDING):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.counters = {"submitted": 0, "rejected": 0, "timed_out": 0, "failed": 0, "restarts": 0}
+        self._timing = defaultdict(lambda: {"completed": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    def _ensure(self):
+        """Executor, created on first use (caller holds the lock)."""
+        if self._executor is None:
+            # spawn: forking a process that already runs threads (uvicorn, schedulers) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    def start(self):
+        """Starts and warms every worker without waiting for them."""
+        if not COMPUTE_POOL_ENABLED:
+            return
+        with self._lock:
+            executor = self._ensure()
+        for _ in range(self.workers):
+            executor.submit(_ping)
+        print(f"⚙️ Compute pool starting: {self.workers} workers, max {self.max_pending} pending tasks")
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _restart(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.counters["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def run(self, task: str, *args, **kwargs):
+        """
+        Result of TASKS[task](*args, **kwargs) computed in a worker process.
+        Blocks the calling thread (not the GIL) until done or the deadline.
+        """
+        if task not in TASKS:
+            raise KeyError(f"Unknown compute task: {task}")
+        if not COMPUTE_POOL_ENABLED:
+            return _resolve(task)(*args, **kwargs)
+
+        timeout = TASKS[task][2]
+        deadline = time.time() + timeout
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.counters["rejected"] += 1
+                raise ComputePoolBusy(f"{self._pending} compute tasks pending")
+            self._pending += 1
+            self.counters["submitted"] += 1
+            executor = self._ensure()
+
+        started = time.perf_counter()
+        try:
+            future = executor.submit(_execute, task, args, kwargs, deadline)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._release(None)
+            self._restart(executor)
+            raise ComputePoolBusy(f"Compute pool unavailable: {e}")
+        # Released when the work is really over, not when a caller gives up
+        future.add_done_callback(self._release)
+
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.time()))
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self.counters["timed_out"] += 1
+            raise ComputeTimeout(f"{task} exceeded {timeout:g}s")
+        except ComputeTimeout:
+            with self._lock:
+                self.counters["timed_out"] += 1
+            raise
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed); the next call gets a fresh pool
+            self._restart(executor)
+            with self._lock:
+                self.counters["failed"] += 1
+            raise ComputePoolBusy(f"Compute worker crashed: {e}")
+        except Exception:
+            with self._lock:
+                self.counters["failed"] += 1
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            timing = self._timing[task]
+            timing["completed"] += 1
+            timing["total_ms"] += elapsed_ms
+            timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            tasks = {
+                task: {
+                    "completed": t["completed"],
+                    "avg_ms": round(t["total_ms"] / t["completed"], 1) if t["completed"] else 0.0,
+                    "max_ms": round(t["max_ms"], 1),
+                    "deadline_s": TASKS[task][2],
+                }
+                for task, t in self._timing.items()
+            }
+            return {
+                "enabled": COMPUTE_POOL_ENABLED,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                **self.counters,
+                "tasks": tasks,
+            }
+
+
+compute_pool = ComputePool()
+
+
+def offload(task: str, *args, **kwargs):
+    """See ComputePool.run."""
+    return compute_pool.run(task, *args, **kwargs)
+
+
+def get_compute_pool_stats() -> dict:
+    return compute_pool.stats()
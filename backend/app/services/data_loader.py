@@ -1,5 +1,14 @@
+import os
+import re
+import sys
+import threading
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Optional
+from app.services.data_snapshot import DATA_SNAPSHOT_ENABLED, load_snapshot, daily_device_kwh
 
 # -------------------------------------------------
 # ABSOLUTE CANONICAL DATA SOURCE
@@ -7,21 +16,64 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parents[2]
 DATA_PATH = BASE_DIR / "data" / "energy_usage.csv"
 
+# Every other home (tenant) has its own directory: homes/<home_id>/energy_usage.csv
+HOMES_DIR = Path(os.getenv("HOMES_DATA_DIR", str(BASE_DIR / "data" / "homes")))
+DEFAULT_HOME_ID = os.getenv("DEFAULT_HOME_ID", "default")
+HOME_CACHE_MAX_MB = float(os.getenv("HOME_CACHE_MAX_MB", "256"))
+
+_HOME_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def normalize_home(home_id=None) -> str:
+    return DEFAULT_HOME_ID if home_id is None else str(home_id)
+
+
+def home_dir(home_id=None) -> Path:
+    """Directory holding a home's data (and derived state, e.g. device profiles)."""
+    home_id = normalize_home(home_id)
+    if home_id == DEFAULT_HOME_ID:
+        return DATA_PATH.parent
+    if not _HOME_ID_PATTERN.match(home_id):
+        raise ValueError(f"Invalid home id: {home_id!r}")
+    return HOMES_DIR / home_id
+
+
+def home_data_path(home_id=None) -> Path:
+    home_id = normalize_home(home_id)
+    return DATA_PATH if home_id == DEFAULT_HOME_ID else home_dir(home_id) / "energy_usage.csv"
+
+
+def list_homes() -> list:
+    homes = [DEFAULT_HOME_ID] if DATA_PATH.exists() else []
+    if HOMES_DIR.is_dir():
+        homes.extend(sorted(p.name for p in HOMES_DIR.iterdir() if (p / "energy_usage.csv").exists()))
+    return homes
+
+
 # -------------------------------------------------
 # SAFE LOADER (NO SILENT FAILURES)
 # -------------------------------------------------
-def load_energy_data() -> pd.DataFrame:
+def load_energy_data(home_id=None) -> pd.DataFrame:
+    """
+    Loads one home's curated energy dataset (the default home when
+    home_id is None). Served from the home cache; the copy is the
+    caller's to modify.
+    """
+    return home_cache.frame(home_id).copy()
+
+
+def read_energy_csv(path: Path) -> pd.DataFrame:
     """
-    Loads curated single-home energy dataset.
-    This file is distilled from Kaggle Smart Energy Advisor.
+    Parses and validates one energy_usage.csv.
+    The files are distilled from Kaggle Smart Energy Advisor.
     """
 
-    if not DATA_PATH.exists():
+    if not path.exists():
         raise FileNotFoundError(
-            f"energy_usage.csv NOT FOUND at {DATA_PATH}"
+            f"energy_usage.csv NOT FOUND at {path}"
         )
 
-    df = pd.read_csv(DATA_PATH)
+    df = pd.read_csv(path)
 
     # -------------------------------------------------
     # Mandatory columns check (EXAM-SAFE)
@@ -72,3 +124,214 @@ def load_energy_data() -> pd.DataFrame:
         )
 
     return df
+
+
+# -------------------------------------------------
+# DATA VERSION (cache key for derived results)
+# -------------------------------------------------
+def get_data_version(home_id=None) -> str:
+    """
+    Changes whenever the home's energy_usage.csv is rewritten or appended
+    to. Includes the home, so results keyed by version never cross homes.
+    """
+    stat = home_data_path(home_id).stat()
+    return f"{normalize_home(home_id)}:{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# -------------------------------------------------
+# HOME CACHE (loaded datasets + aggregates, LRU under a memory budget)
+# -------------------------------------------------
+def _approx_bytes(value, _seen=None) -> int:
+    """
+    Rough size of a cached value from the buffers it holds (nbytes of
+    arrays and frames, walked through containers and object attributes).
+    Cheap enough to run under the home's lock, unlike serializing it.
+    """
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _approx_bytes(k, seen) + _approx_bytes(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_approx_bytes(v, seen) for v in value)
+    attrs = getattr(value, "__dict__", None)
+    if attrs is not None:
+        return sys.getsizeof(value) + _approx_bytes(attrs, seen)
+    slots = [name for cls in type(value).__mro__ for name in getattr(cls, "__slots__", ())]
+    if slots:
+        return sys.getsizeof(value) + sum(
+            _approx_bytes(getattr(value, name, None), seen) for name in slots
+        )
+    return sys.getsizeof(value)
+
+
+class HomeDataCache:
+    """
+    Per home: the parsed dataset and any aggregates built from it, dropped
+    together when the file changes. Least recently used homes are evicted
+    once the total exceeds `max_bytes` (the home in use is always kept).
+
+    With DATA_SNAPSHOT_ENABLED the dataset is attached from the shared
+    snapshot (see data_snapshot): its mapped pages are shared by all
+    workers and do not count against this worker's budget.
+    """
+
+    def __init__(self, max_bytes: int = int(HOME_CACHE_MAX_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self._homes = OrderedDict()     # home_id -> {"version", "frame", "snapshot", "aggregates", "sizes"}
+        self._lock = threading.Lock()
+        self._home_locks = {}           # home_id -> [RLock, threads using it]
+        self.counters = {"hits": 0, "loads": 0, "evictions": 0, "aggregate_builds": 0}
+
+    def _bytes(self, entry) -> int:
+        return sum(entry["sizes"].values())
+
+    def _fit_budget(self, keep: str):
+        with self._lock:
+            total = sum(self._bytes(e) for e in self._homes.values())
+            for home_id in list(self._homes):
+                if total <= self.max_bytes:
+                    break
+                if home_id == keep:
+                    continue
+                total -= self._bytes(self._homes.pop(home_id))
+                self.counters["evictions"] += 1
+                slot = self._home_locks.get(home_id)
+                if slot is not None and slot[1] == 0:
+                    del self._home_locks[home_id]
+
+    @contextmanager
+    def _home_lock(self, home_id: str):
+        """
+        Serializes loads/builds for one home. The lock is dropped once the
+        home is evicted and no thread holds or waits on it.
+        """
+        with self._lock:
+            slot = self._home_locks.setdefault(home_id, [threading.RLock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0 and home_id not in self._homes:
+                    self._home_locks.pop(home_id, None)
+
+    def _entry(self, home_id: str):
+        """Current entry for the home (caller holds the home's lock)."""
+        version = get_data_version(home_id)
+        with self._lock:
+            entry = self._homes.get(home_id)
+            if entry is not None and entry["version"] == version:
+                self._homes.move_to_end(home_id)
+                self.counters["hits"] += 1
+                return entry
+
+        frame, snapshot, frame_bytes = self._load(home_id, version)
+        previous = entry["aggregates"] if entry is not None else {}
+        entry = {
+            "version": version,
+            "frame": frame,
+            "snapshot": snapshot,
+            "aggregates": {},
+            "previous": previous,       # last version's aggregates, for incremental rebuilds
+            "sizes": {"frame": frame_bytes},
+        }
+        with self._lock:
+            self._homes[home_id] = entry
+            self._homes.move_to_end(home_id)
+            self.counters["loads"] += 1
+        self._fit_budget(keep=home_id)
+        return entry
+
+    def _load(self, home_id: str, version: str):
+        """(frame, snapshot or None, bytes private to this worker)"""
+        path = home_data_path(home_id)
+        if DATA_SNAPSHOT_ENABLED:
+            try:
+                snapshot = load_snapshot(home_id, version, lambda: read_energy_csv(path))
+                frame = snapshot.frame()
+                return frame, snapshot, snapshot.private_bytes(frame)
+            except OSError as e:
+                print(f"⚠️ Data snapshot unavailable for home {home_id}, reading the CSV: {e}")
+        frame = read_energy_csv(path)
+        return frame, None, _approx_bytes(frame)
+
+    def frame(self, home_id=None) -> pd.DataFrame:
+        """Shared parsed dataset - read only (load_energy_data returns a copy)."""
+        home_id = normalize_home(home_id)
+        with self._home_lock(home_id):
+            return self._entry(home_id)["frame"]
+
+    def aggregate(self, name: str, build: Callable, home_id=None):
+        """
+        Value of `build(previous)` for the home's current data, built once
+        per data version. `previous` is the value built for the last
+        version (None on first build / after eviction) so builders can
+        update incrementally.
+        """
+        home_id = normalize_home(home_id)
+        with self._home_lock(home_id):
+            entry = self._entry(home_id)
+            if name in entry["aggregates"]:
+                return entry["aggregates"][name]
+            value = build(entry["previous"].pop(name, None))
+            entry["aggregates"][name] = value
+            entry["sizes"][name] = _approx_bytes(value)
+            self.counters["aggregate_builds"] += 1
+        self._fit_budget(keep=home_id)
+        return value
+
+    def daily_kwh(self, home_id=None) -> pd.DataFrame:
+        """kWh per day and device; the shared snapshot's rollup when there is one."""
+        home_id = normalize_home(home_id)
+        with self._home_lock(home_id):
+            snapshot = self._entry(home_id)["snapshot"]
+            if snapshot is not None:
+                return snapshot.daily_kwh()
+            return self.aggregate("daily_kwh", lambda _: daily_device_kwh(self.frame(home_id)), home_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            homes = {
+                home_id: {
+                    "version": e["version"],
+                    "rows": len(e["frame"]),
+                    "aggregates": sorted(e["aggregates"]),
+                    "bytes": self._bytes(e),
+                    "snapshot": str(e["snapshot"].path) if e["snapshot"] else None,
+                    "shared_bytes": e["snapshot"].shared_bytes if e["snapshot"] else 0,
+                }
+                for home_id, e in self._homes.items()
+            }
+            return {
+                **self.counters,
+                "snapshots": DATA_SNAPSHOT_ENABLED,
+                "max_bytes": self.max_bytes,
+                "cached_bytes": sum(h["bytes"] for h in homes.values()),
+                "homes": homes,
+            }
+
+
+home_cache = HomeDataCache()
+
+
+def cached_aggregate(name: str, build: Callable, home_id: Optional[str] = None):
+    """See HomeDataCache.aggregate."""
+    return home_cache.aggregate(name, build, home_id)
+
+
+def load_daily_rollup(home_id=None) -> pd.DataFrame:
+    """kWh per day (rows) and device (columns) for a home - read only."""
+    return home_cache.daily_kwh(home_id)
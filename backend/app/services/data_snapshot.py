@@ -0,0 +1,221 @@
+"""
+Shared Dataset Snapshots
+Every uvicorn worker used to parse energy_usage.csv into its own DataFrame,
+so memory grew with --workers. Instead, the first worker that needs a
+home's data version publishes it once as a columnar NumPy snapshot:
+
+    DATA_SNAPSHOT_DIR/<home_id>/<version>/
+        meta.json               columns, dtypes, string tables, rollup axes
+        col_<n>.npy             one array per column (strings as int32 codes)
+        daily_kwh.npy           rollup: kWh per day x device
+
+and every worker memory-maps those files read-only. Numeric and timestamp
+columns are used in place (zero-copy, the pages are shared through the
+OS page cache); only string columns are decoded per worker.
+
+- Publishing is atomic: the snapshot is written to a temporary directory
+  and renamed into place, so a reader sees a whole version or none.
+  Versions are immutable; a worker swaps to a new one by attaching it.
+- A per-home lock file makes sure only one process builds a version.
+- Old versions are pruned (DATA_SNAPSHOT_KEEP); workers still mapping a
+  pruned version keep reading it until they swap (POSIX unlink).
+- Without fcntl (Windows) snapshots are off and each worker reads the CSV.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no flock, and mapped files cannot be pruned
+    fcntl = None
+
+DATA_SNAPSHOT_ENABLED = fcntl is not None and os.getenv("DATA_SNAPSHOT_ENABLED", "true").lower() == "true"
+# Any local directory works (pages are shared through the page cache); /dev/shm keeps them in RAM
+DATA_SNAPSHOT_DIR = Path(os.getenv("DATA_SNAPSHOT_DIR", str(Path(tempfile.gettempdir()) / "enverse-snapshots")))
+DATA_SNAPSHOT_KEEP = int(os.getenv("DATA_SNAPSHOT_KEEP", "2"))
+
+META_FILE = "meta.json"
+ROLLUP_FILE = "daily_kwh.npy"
+
+
+def _version_dirname(version: str) -> str:
+    # Versions look like "<home>:<mtime>-<size>"; keep them filesystem-safe
+    return version.replace(":", "_").replace("/", "_")
+
+
+@contextmanager
+def _home_lock(home_root: Path):
+    home_root.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        yield       # publishing is still atomic (rename); two workers may just both build
+        return
+    with open(home_root / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# -------------------------------------------------
+# Rollups
+# -------------------------------------------------
+def daily_device_kwh(df: pd.DataFrame) -> pd.DataFrame:
+    """kWh per calendar day (rows, gap days included) and device (columns)."""
+    if df.empty:
+        return pd.DataFrame(dtype="float64")
+    daily = df.pivot_table(
+        index=df["timestamp"].dt.normalize(), columns="device_name",
+        values="energy_kwh", aggfunc="sum", fill_value=0.0,
+    )
+    return daily.asfreq("D", fill_value=0.0).astype("float64")
+
+
+# -------------------------------------------------
+# Write
+# -------------------------------------------------
+def _write(target: Path, df: pd.DataFrame):
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"name": name, "file": f"col_{i}.npy"}
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.dt.tz_localize(None) if series.dt.tz is not None else series
+            array = values.to_numpy(dtype="datetime64[ns]").view("int64")
+            entry["kind"] = "datetime"
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            array = series.to_numpy()
+            entry["kind"] = "numeric"
+        else:
+            codes, uniques = pd.factorize(series.astype("object"), use_na_sentinel=True)
+            array = codes.astype("int32")
+            entry["kind"] = "string"
+            entry["values"] = [str(v) for v in uniques]
+        np.save(target / entry["file"], np.ascontiguousarray(array), allow_pickle=False)
+        columns.append(entry)
+
+    daily = daily_device_kwh(df)
+    np.save(target / ROLLUP_FILE, np.ascontiguousarray(daily.to_numpy(dtype="float64")), allow_pickle=False)
+    meta = {
+        "rows": len(df),
+        "columns": columns,
+        "rollup": {
+            "start": str(daily.index[0].date()) if len(daily) else None,
+            "days": len(daily),
+            "devices": [str(d) for d in daily.columns],
+        },
+    }
+    (target / META_FILE).write_text(json.dumps(meta))
+
+
+def publish(home_id: str, version: str, df: pd.DataFrame) -> Path:
+    """Writes the snapshot and renames it into place; returns its directory."""
+    home_root = DATA_SNAPSHOT_DIR / home_id
+    final = home_root / _version_dirname(version)
+    if final.exists():
+        return final
+
+    tmp = home_root / f".tmp-{uuid.uuid4().hex}"
+    tmp.mkdir(parents=True)
+    try:
+        _write(tmp, df)
+        os.rename(tmp, final)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not final.exists():
+            raise
+    _prune(home_root, keep=final)
+    return final
+
+
+def _prune(home_root: Path, keep: Path):
+    versions = sorted(
+        (p for p in home_root.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime, reverse=True,
+    )
+    for old in versions[DATA_SNAPSHOT_KEEP:]:
+        if old != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# -------------------------------------------------
+# Attach
+# -------------------------------------------------
+class Snapshot:
+    """One published version, memory-mapped read-only."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / META_FILE).read_text())
+        self._arrays = {c["name"]: np.load(path / c["file"], mmap_mode="r") for c in self.meta["columns"]}
+        self._rollup = np.load(path / ROLLUP_FILE, mmap_mode="r")
+
+    @property
+    def shared_bytes(self) -> int:
+        return sum(a.nbytes for a in self._arrays.values()) + self._rollup.nbytes
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Numeric / timestamp columns wrap the mapped (read-only) arrays
+        without copying; string columns are decoded into this process.
+        """
+        data = {}
+        for column in self.meta["columns"]:
+            array = self._arrays[column["name"]].view(np.ndarray)     # plain view of the mapping
+            if column["kind"] == "datetime":
+                data[column["name"]] = array.view("datetime64[ns]")
+            elif column["kind"] == "numeric":
+                data[column["name"]] = array
+            else:
+                values = np.array(column["values"] + [None], dtype=object)
+                data[column["name"]] = values[array]     # code -1 (missing) → None
+        return pd.DataFrame(data, copy=False)
+
+    def private_bytes(self, frame: pd.DataFrame) -> int:
+        """Memory of `frame` that is not backed by the shared mapping."""
+        decoded = [c["name"] for c in self.meta["columns"] if c["kind"] == "string"]
+        return int(frame[decoded].memory_usage(deep=True, index=False).sum()) if decoded else 0
+
+    def daily_kwh(self) -> pd.DataFrame:
+        """Zero-copy view of the kWh-per-day-and-device rollup."""
+        rollup = self.meta["rollup"]
+        if not rollup["days"]:
+            return pd.DataFrame(dtype="float64")
+        index = pd.date_range(rollup["start"], periods=rollup["days"], freq="D")
+        return pd.DataFrame(self._rollup.view(np.ndarray), index=index, columns=rollup["devices"], copy=False)
+
+
+def attach(home_id: str, version: str) -> Optional[Snapshot]:
+    path = DATA_SNAPSHOT_DIR / home_id / _version_dirname(version)
+    try:
+        return Snapshot(path)
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(home_id: str, version: str, build_frame: Callable[[], pd.DataFrame]) -> Snapshot:
+    """
+    The published snapshot of (home, version); publishes it first when no
+    process has yet. `build_frame` parses the source data.
+    """
+    snapshot = attach(home_id, version)
+    if snapshot is not None:
+        return snapshot
+    with _home_lock(DATA_SNAPSHOT_DIR / home_id):
+        # Another worker may have published while we waited for the lock
+        snapshot = attach(home_id, version)
+        if snapshot is None:
+            publish(home_id, version, build_frame())
+            snapshot = attach(home_id, version)
+            print(f"📦 Published data snapshot {home_id}@{version} ({snapshot.meta['rows']} rows)")
+    return snapshot
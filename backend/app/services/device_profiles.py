@@ -0,0 +1,232 @@
+"""
+Learned Device Profiles
+Per-home, per-device KLL sketches (see quantile_sketch) of:
+- power_watts    per reading
+- energy_kwh     per reading
+- session_hours  per completed on/off session
+Alert and anomaly thresholds are read from these percentiles instead of
+global constants. Until a device has MIN_SAMPLES values for a metric the
+caller's static default applies.
+
+Sketches are updated incrementally when energy_usage.csv grows and saved to
+DEVICE_PROFILE_PATH (other homes: next to their data), so a restart resumes
+where it left off. Profiles built by different workers or shards combine
+with merge_profiles().
+"""
+
+import json
+import os
+import sys
+import uuid
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+from app.services.quantile_sketch import KLLSketch
+from app.services.data_loader import load_energy_data, cached_aggregate, home_dir, normalize_home, DEFAULT_HOME_ID
+from app.services.session_index import get_session_index, MAX_GAP
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+PROFILE_PATH = Path(os.getenv("DEVICE_PROFILE_PATH", str(BASE_DIR / "data" / "device_profiles.json")))
+
+PROFILE_METRICS = ("power_watts", "energy_kwh", "session_hours")
+MIN_SAMPLES = int(os.getenv("PROFILE_MIN_SAMPLES", "50"))
+
+
+# -------------------------------------------------
+# Profile Set
+# -------------------------------------------------
+class DeviceProfiles:
+    """
+    {(home, device, metric): KLLSketch} plus how far the source data was read.
+    `home` is the home whose data this set is built from: readings without
+    a home_id column and queries without `home` use it.
+    """
+
+    def __init__(self, home=None):
+        self.home = normalize_home(home)
+        self.sketches = {}
+        self.rows_indexed = 0
+        self.last_timestamp = None
+        self.session_cutoff = None   # sessions ending at or before this are sketched
+
+    def _sketch(self, home, device, metric) -> KLLSketch:
+        key = (str(home), device, metric)
+        if key not in self.sketches:
+            self.sketches[key] = KLLSketch()
+        return self.sketches[key]
+
+    # ---------------- Ingest ----------------
+    def add_readings(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        homes = df["home_id"] if "home_id" in df.columns else pd.Series(self.home, index=df.index)
+        for (home, device), group in df.groupby([homes, df["device_name"]]):
+            self._sketch(home, device, "power_watts").update(group["power_watts"].to_numpy())
+            self._sketch(home, device, "energy_kwh").update(group["energy_kwh"].to_numpy())
+
+        self.rows_indexed += len(df)
+        latest = df["timestamp"].max()
+        if self.last_timestamp is None or latest > self.last_timestamp:
+            self.last_timestamp = latest
+
+    def add_closed_sessions(self, sessions: pd.DataFrame, reference_time, home=None):
+        """
+        Sketches sessions that can no longer grow: they ended more than MAX_GAP
+        before the newest reading. Each session is added exactly once.
+        """
+        if sessions.empty or reference_time is None:
+            return
+        cutoff = reference_time - MAX_GAP
+        closed = sessions[sessions["end"] <= cutoff]
+        if self.session_cutoff is not None:
+            closed = closed[closed["end"] > self.session_cutoff]
+
+        for device, group in closed.groupby("device_name"):
+            self._sketch(home or self.home, device, "session_hours").update(group["duration_hours"].to_numpy())
+        self.session_cutoff = cutoff
+
+    def is_append_of(self, df: pd.DataFrame) -> bool:
+        if self.last_timestamp is None:
+            return False
+        return int((df["timestamp"] <= self.last_timestamp).sum()) == self.rows_indexed
+
+    def merge(self, other: "DeviceProfiles"):
+        for (home, device, metric), sketch in other.sketches.items():
+            self._sketch(home, device, metric).merge(sketch)
+        self.rows_indexed += other.rows_indexed
+
+    # ---------------- Queries ----------------
+    def percentile(self, device: str, metric: str, q: float, home=None) -> Optional[float]:
+        """Learned q-quantile, or None while there is too little history."""
+        sketch = self.sketches.get((str(home or self.home), device, metric))
+        if sketch is None or sketch.count < MIN_SAMPLES:
+            return None
+        return sketch.quantile(q)
+
+    def threshold(self, device: str, metric: str, q: float, default: float, home=None) -> float:
+        learned = self.percentile(device, metric, q, home=home)
+        return default if learned is None else learned
+
+    def summary(self, qs=(0.5, 0.95, 0.99)) -> dict:
+        """{home: {device: {metric: {"count", "p50", ...}}}}"""
+        out = {}
+        for (home, device, metric), sketch in sorted(self.sketches.items()):
+            stats = {"count": sketch.count}
+            for q in qs:
+                value = sketch.quantile(q)
+                stats[f"p{q * 100:g}"] = round(value, 3) if sketch.count else None
+            out.setdefault(home, {}).setdefault(device, {})[metric] = stats
+        return out
+
+    # ---------------- Persistence ----------------
+    def to_dict(self) -> dict:
+        return {
+            "home": self.home,
+            "rows_indexed": self.rows_indexed,
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            "session_cutoff": self.session_cutoff.isoformat() if self.session_cutoff is not None else None,
+            "sketches": [
+                {"home": home, "device": device, "metric": metric, "sketch": sketch.to_dict()}
+                for (home, device, metric), sketch in self.sketches.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DeviceProfiles":
+        profiles = cls(data.get("home"))
+        profiles.rows_indexed = int(data.get("rows_indexed", 0))
+        if data.get("last_timestamp"):
+            profiles.last_timestamp = pd.Timestamp(data["last_timestamp"])
+        if data.get("session_cutoff"):
+            profiles.session_cutoff = pd.Timestamp(data["session_cutoff"])
+        for entry in data.get("sketches", []):
+            key = (entry["home"], entry["device"], entry["metric"])
+            profiles.sketches[key] = KLLSketch.from_dict(entry["sketch"])
+        return profiles
+
+
+def merge_profiles(*profile_sets: DeviceProfiles) -> DeviceProfiles:
+    """Sketches of every set under their own homes; `home` of the first set."""
+    merged = DeviceProfiles(profile_sets[0].home if profile_sets else None)
+    for profiles in profile_sets:
+        merged.merge(profiles)
+    return merged
+
+
+def save_profiles(profiles: DeviceProfiles, path: Path = PROFILE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Own temp file per writer: API workers, the alert scheduler and compute
+    # processes may save the same home at once (last complete file wins)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_text(json.dumps(profiles.to_dict()))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def load_profiles(path: Path = PROFILE_PATH) -> Optional[DeviceProfiles]:
+    try:
+        return DeviceProfiles.from_dict(json.loads(path.read_text()))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable device profiles at {path}: {e}")
+        return None
+
+
+# -------------------------------------------------
+# Shared Profiles per Home
+# -------------------------------------------------
+def profile_path(home_id=None) -> Path:
+    if normalize_home(home_id) == DEFAULT_HOME_ID:
+        return PROFILE_PATH
+    return home_dir(home_id) / "device_profiles.json"
+
+
+def get_device_profiles(home_id=None) -> DeviceProfiles:
+    """
+    Profiles over a home's energy_usage.csv, kept in the home cache.
+    Appended readings are sketched incrementally; any other change to the
+    file rebuilds from scratch.
+    """
+    home = normalize_home(home_id)
+    path = profile_path(home)
+
+    def build(profiles):
+        profiles = profiles or load_profiles(path)
+        if profiles is None or profiles.home != home:
+            # Missing, or saved before sketches were keyed by their own home
+            profiles = DeviceProfiles(home)
+
+        df = load_energy_data(home)
+        if profiles.is_append_of(df):
+            profiles.add_readings(df[df["timestamp"] > profiles.last_timestamp])
+        else:
+            profiles = DeviceProfiles(home)
+            profiles.add_readings(df)
+
+        index = get_session_index(home)
+        profiles.add_closed_sessions(index.sessions, index.last_timestamp)
+
+        try:
+            save_profiles(profiles, path)
+        except OSError as e:
+            print(f"⚠️ Could not persist device profiles: {e}")
+        return profiles
+
+    return cached_aggregate("device_profiles", build, home)
+
+
+if __name__ == "__main__":
+    # python -m app.services.device_profiles show
+    # python -m app.services.device_profiles merge shard_a.json shard_b.json -o merged.json
+    args = sys.argv[1:]
+    if args[:1] == ["merge"] and "-o" in args:
+        out = Path(args[args.index("-o") + 1])
+        inputs = [Path(p) for p in args[1:args.index("-o")]]
+        save_profiles(merge_profiles(*[load_profiles(p) or DeviceProfiles() for p in inputs]), out)
+        print(f"✅ Merged {len(inputs)} profile files into {out}")
+    else:
+        print(json.dumps(get_device_profiles().summary(), indent=2))
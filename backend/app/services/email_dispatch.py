@@ -0,0 +1,213 @@
+"""
+Email Dispatch Queue
+OTP emails are sent by a small pool of worker threads instead of inside
+the request, so a login burst (or a slow SMTP server) never blocks the
+event loop or other API traffic.
+
+- Bounded queue (EMAIL_QUEUE_MAX): enqueue fails fast when it is full.
+- EMAIL_WORKERS worker threads; each provider (SendGrid, SMTP) has its own
+  concurrency limit so one slow provider cannot take every worker's
+  connection to it.
+- A failed attempt (every configured provider failed) is retried up to
+  EMAIL_MAX_ATTEMPTS times with exponential backoff and full jitter; the
+  waiting job does not hold a worker.
+- Delivery status per job (queued → sending → retrying → sent | failed)
+  is kept for EMAIL_STATUS_TTL_SECONDS for polling.
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from app.services.auth_service import otp_email_providers
+
+EMAIL_QUEUE_MAX = int(os.getenv("EMAIL_QUEUE_MAX", "1000"))
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "4"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "3"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "30"))
+EMAIL_STATUS_TTL_SECONDS = float(os.getenv("EMAIL_STATUS_TTL_SECONDS", "3600"))
+PROVIDER_CONCURRENCY = {
+    "sendgrid": int(os.getenv("EMAIL_SENDGRID_CONCURRENCY", "4")),
+    "smtp": int(os.getenv("EMAIL_SMTP_CONCURRENCY", "2")),
+}
+
+
+class EmailQueueFull(Exception):
+    """EMAIL_QUEUE_MAX jobs are already waiting."""
+
+
+def retry_delay(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(max, base * 2^(attempt-1))]."""
+    return random.uniform(0, min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+class EmailDispatcher:
+    def __init__(self, workers: int = EMAIL_WORKERS, max_queue: int = EMAIL_QUEUE_MAX):
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._delayed = []                        # heap of (due, seq, job) waiting to retry
+        self._delayed_cond = threading.Condition()
+        self._seq = itertools.count()
+        self._limits = {name: threading.BoundedSemaphore(n) for name, n in PROVIDER_CONCURRENCY.items()}
+        self._status = {}
+        self._status_lock = threading.Lock()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.counters = {"enqueued": 0, "sent": 0, "failed": 0, "retries": 0, "rejected": 0}
+
+    def _bump(self, counter: str):
+        with self._status_lock:
+            self.counters[counter] += 1
+
+    # ---------------- Status ----------------
+    def _set_status(self, job, status: str, **fields):
+        with self._status_lock:
+            entry = self._status.setdefault(job["id"], {"id": job["id"], "recipient": job["recipient"]})
+            entry.update(status=status, attempts=job["attempts"], updated_at=time.time(), **fields)
+
+    def _prune_status(self):
+        cutoff = time.time() - EMAIL_STATUS_TTL_SECONDS
+        with self._status_lock:
+            for job_id in [k for k, v in self._status.items() if v["updated_at"] < cutoff]:
+                del self._status[job_id]
+
+    def get_status(self, job_id: str) -> Optional[dict]:
+        with self._status_lock:
+            entry = self._status.get(job_id)
+            return dict(entry) if entry else None
+
+    # ---------------- Producer ----------------
+    def enqueue_otp(self, recipient: str, otp: str, on_sent: Optional[Callable[[], None]] = None) -> str:
+        """Queues an OTP email; returns the job id. `on_sent` runs after delivery."""
+        self.start()
+        self._prune_status()
+        job = {"id": uuid.uuid4().hex, "recipient": recipient, "otp": otp, "on_sent": on_sent, "attempts": 0}
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._bump("rejected")
+            raise EmailQueueFull(f"{self._queue.maxsize} emails already queued")
+        self._bump("enqueued")
+        self._set_status(job, "queued")
+        return job["id"]
+
+    # ---------------- Workers ----------------
+    def _deliver(self, job) -> Optional[str]:
+        """Tries every configured provider in order; provider name on success, else None."""
+        providers = otp_email_providers()
+        if not providers:
+            job["error"] = "No email provider configured (SENDGRID_API_KEY / SMTP_FALLBACK_ENABLED)"
+            return None
+        for name, send in providers:
+            with self._limits.get(name, threading.BoundedSemaphore(1)):
+                try:
+                    if send(job["recipient"], job["otp"]):
+                        return name
+                except Exception as e:
+                    print(f"⚠️ Email provider {name} raised: {e}")
+            job["error"] = f"{name} delivery failed"
+        return None
+
+    def _process(self, job):
+        job["attempts"] += 1
+        self._set_status(job, "sending")
+        provider = self._deliver(job)
+
+        if provider:
+            try:
+                if job["on_sent"]:
+                    job["on_sent"]()
+            except Exception as e:
+                self._bump("failed")
+                self._set_status(job, "failed", provider=provider, error=f"Post-delivery step failed: {e}")
+                return
+            self._bump("sent")
+            self._set_status(job, "sent", provider=provider, error=None)
+            return
+
+        if job["attempts"] >= EMAIL_MAX_ATTEMPTS or not otp_email_providers():
+            self._bump("failed")
+            self._set_status(job, "failed", error=job.get("error"))
+            print(f"❌ OTP email to {job['recipient']} failed after {job['attempts']} attempt(s)")
+            return
+
+        delay = retry_delay(job["attempts"])
+        self._bump("retries")
+        self._set_status(job, "retrying", error=job.get("error"), retry_in_seconds=round(delay, 2))
+        with self._delayed_cond:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._seq), job))
+            self._delayed_cond.notify()
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self._process(job)
+            except Exception as e:
+                print(f"[EMAIL DISPATCH ERROR] {e}")
+            finally:
+                self._queue.task_done()
+
+    def _retry_scheduler(self):
+        """Moves jobs whose backoff has elapsed back onto the queue."""
+        while not self._stop.is_set():
+            due = []
+            with self._delayed_cond:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    due.append(heapq.heappop(self._delayed)[2])
+                if not due:
+                    timeout = (self._delayed[0][0] - now) if self._delayed else 1.0
+                    self._delayed_cond.wait(timeout=min(timeout, 1.0))
+            for job in due:
+                self._queue.put(job)      # retries may wait for room; new jobs may not
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        with self._start_lock:
+            if self._threads and all(t.is_alive() for t in self._threads):
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"email-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            self._threads.append(threading.Thread(target=self._retry_scheduler, name="email-retry", daemon=True))
+            for t in self._threads:
+                t.start()
+        print(f"✅ Email dispatcher started ({self.workers} workers, queue {self._queue.maxsize})")
+
+    def stop(self):
+        self._stop.set()
+        with self._delayed_cond:
+            self._delayed_cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+    def stats(self) -> dict:
+        with self._delayed_cond:
+            delayed = len(self._delayed)
+        with self._status_lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "queued": self._queue.qsize(),
+            "waiting_retry": delayed,
+            "workers": self.workers,
+            "provider_limits": PROVIDER_CONCURRENCY,
+        }
+
+
+dispatcher = EmailDispatcher()
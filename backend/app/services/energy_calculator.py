@@ -3,8 +3,8 @@ from app.services.billing_service import calculate_electricity_bill
 import pandas as pd
 from datetime import timedelta
 
-def compute_dashboard_metrics():
-    df = load_energy_data()
+def compute_dashboard_metrics(home_id=None):
+    df = load_energy_data(home_id)
 
     if df.empty:
         return {
@@ -2,23 +2,33 @@ import joblib
 import pandas as pd
 from pathlib import Path
 import os
+from app.ml.model_registry import resolve_model_path
 
 # Robust Path Resolution
 BASE_DIR = Path(__file__).resolve().parents[2]
 MODEL_PATH = BASE_DIR / "app" / "ml" / "models" / "energy_estimation_model.pkl"
 
 model = None
+_model_path = None
 
 def load_model():
-    global model
-    if MODEL_PATH.exists():
+    """Active estimation model; reloaded only after a promotion/rollback changes the path."""
+    global model, _model_path
+    model_path = resolve_model_path(MODEL_PATH.stem, MODEL_PATH)
+    if model_path == _model_path:
+        return model
+
+    _model_path = model_path
+    model = None
+    if model_path.exists():
         try:
-            model = joblib.load(MODEL_PATH)
-            print(f"✅ ML Model loaded from {MODEL_PATH}")
+            model = joblib.load(model_path)
+            print(f"✅ ML Model loaded from {model_path}")
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
     else:
         print(f"⚠️ Model not found at {MODEL_PATH}. Please run 'python -m app.ml.train_energy_model'")
+    return model
 
 # Load on startup
 load_model()
@@ -29,7 +39,10 @@ def estimate_energy(payload):
 
     physics_kwh = (power / 1000) * (minutes / 60)
 
-    ml_factor = model.predict([features(payload)])[0]
+    estimator = load_model()
+    if estimator is None:
+        raise FileNotFoundError(f"Energy estimation model not available ({_model_path})")
+    ml_factor = estimator.predict([features(payload)])[0]
     ml_factor = max(0.9, min(1.1, ml_factor))  # clamp realism
 
     return round(physics_kwh * ml_factor, 3)
@@ -0,0 +1,212 @@
+"""
+Live Event Hub (Server-Sent Events)
+Fans out state changes to every connected dashboard over one push channel
+instead of each client polling /api/alerts and /dashboard.
+
+Events are state snapshots ("alerts", "kpis", "anomalies") of one home;
+a connection only receives its own home's. A publish that equals the
+home's last published snapshot is dropped at the source.
+
+Backpressure: each connection holds at most ONE pending payload per event
+type. If a client reads slower than we publish, newer snapshots replace
+unsent ones (latest wins) - memory per connection is bounded and a slow
+client never delays anyone else. Replaced payloads are counted as `coalesced`.
+
+Heartbeat: an SSE comment is sent after SSE_HEARTBEAT_SECONDS of silence so
+proxies keep the connection open and dead clients are detected.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.services.data_loader import normalize_home
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "200"))
+SSE_RETRY_MS = 5000   # client reconnect delay advertised to EventSource
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+# -------------------------------------------------
+# One Connection
+# -------------------------------------------------
+class Subscriber:
+    """Per-connection mailbox: latest pending snapshot per event type."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, home_id: str):
+        self.loop = loop
+        self.home_id = home_id
+        self.pending = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.sent = 0
+        self.coalesced = 0
+
+    def offer(self, event: str, event_id: int, data: Any):
+        """Runs on the subscriber's event loop."""
+        if event in self.pending:
+            self.coalesced += 1
+            del self.pending[event]          # re-queue behind other types
+        self.pending[event] = (event_id, data)
+        self.wakeup.set()
+
+    async def next_message(self, timeout: float) -> Optional[str]:
+        """Next frame to send, or None once `timeout` passes with nothing pending."""
+        if not self.pending:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        event, (event_id, data) = self.pending.popitem(last=False)
+        self.sent += 1
+        return format_sse(event, data, event_id)
+
+
+# -------------------------------------------------
+# Fan-out Hub
+# -------------------------------------------------
+class EventHub:
+    """
+    Thread-safe publisher: background jobs call publish() from their own
+    threads; delivery is scheduled onto each subscriber's event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._latest: Dict[str, Dict[str, tuple]] = {}     # home -> event -> (id, data)
+        self._next_id = 0
+
+    def publish(self, event: str, data: Any, home_id=None) -> bool:
+        """Pushes `data` to the home's subscribers. Returns False if nothing changed."""
+        home_id = normalize_home(home_id)
+        with self._lock:
+            latest = self._latest.setdefault(home_id, {})
+            if event in latest and latest[event][1] == data:
+                return False
+            self._next_id += 1
+            event_id = self._next_id
+            latest[event] = (event_id, data)
+            subscribers = [s for s in self._subscribers if s.home_id == home_id]
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event, event_id, data)
+            except RuntimeError:
+                # Loop already closed: connection is going away
+                self.unsubscribe(sub)
+        return True
+
+    def subscribe(self, home_id=None) -> Subscriber:
+        """Registers a connection for a home and primes it with its current snapshots."""
+        home_id = normalize_home(home_id)
+        sub = Subscriber(asyncio.get_running_loop(), home_id)
+        with self._lock:
+            if len(self._subscribers) >= SSE_MAX_CONNECTIONS:
+                raise ConnectionRefusedError("Too many live connections")
+            self._subscribers.add(sub)
+            snapshot = sorted(self._latest.get(home_id, {}).items(), key=lambda item: item[1][0])
+
+        for event, (event_id, data) in snapshot:
+            sub.offer(event, event_id, data)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def has_snapshot(self, home_id=None) -> bool:
+        with self._lock:
+            return bool(self._latest.get(normalize_home(home_id)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            events = sorted({event for latest in self._latest.values() for event in latest})
+            homes = len(self._latest)
+        return {
+            "connections": len(subscribers),
+            "homes": homes,
+            "events": events,
+            "sent": sum(s.sent for s in subscribers),
+            "coalesced": sum(s.coalesced for s in subscribers),
+        }
+
+
+hub = EventHub()
+
+
+async def event_stream(sub: Subscriber, is_disconnected):
+    """SSE body for one connection: snapshots first, then changes + heartbeats."""
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            message = await sub.next_message(SSE_HEARTBEAT_SECONDS)
+            if message is None:
+                if await is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+            else:
+                yield message
+    finally:
+        hub.unsubscribe(sub)
+
+
+# -------------------------------------------------
+# Producers
+# -------------------------------------------------
+def build_alert_event(home_id=None) -> dict:
+    from app.services.alert_store import get_open_alerts
+
+    # updated_at moves on every evaluation; leave it out so unchanged alerts don't re-publish
+    alerts = [{k: v for k, v in a.items() if k != "updated_at"} for a in get_open_alerts(home_id)]
+    return {
+        "alert_count": len(alerts),
+        "alerts": alerts,
+        "monitoring_window_hours": 3,
+    }
+
+
+def build_kpi_event(home_id=None) -> dict:
+    """The /dashboard KPI fields without the raw records."""
+    from app.services.energy_calculator import compute_dashboard_metrics
+
+    metrics = compute_dashboard_metrics(home_id)
+    records = metrics.pop("raw_records", [])
+    metrics.pop("anomaly_count", None)
+    metrics["estimated_savings"] = metrics.get("savings_amount", 0)
+    night = sum(1 for r in records if r.get("is_night") == 1)
+    metrics["night_record_percent"] = round(night / len(records) * 100) if records else 0
+    return metrics
+
+
+def build_anomaly_event(home_id=None) -> dict:
+    from app.services.anomaly_detector import detect_anomalies
+
+    anomalies = detect_anomalies(home_id=home_id)
+    return {"anomaly_count": len(anomalies), "anomalies": anomalies}
+
+
+def publish_alerts(home_id=None):
+    hub.publish("alerts", build_alert_event(home_id), home_id)
+
+
+def publish_data_snapshots(home_id=None):
+    """A home's KPIs and anomaly flags - only needed when its dataset changes."""
+    hub.publish("kpis", build_kpi_event(home_id), home_id)
+    try:
+        hub.publish("anomalies", build_anomaly_event(home_id), home_id)
+    except Exception as e:
+        print(f"⚠️ Live anomaly flags unavailable: {e}")
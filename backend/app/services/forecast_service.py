@@ -1,16 +1,16 @@
-from app.ml.predict_forecast import get_energy_forecast
+from app.services.compute_pool import offload
 from app.services.billing_service import calculate_electricity_bill
 
 # Configuration Constants
 DEFAULT_TARIFF_INR = 8.50 
 
-def fetch_energy_forecast():
+def fetch_energy_forecast(home_id=None):
     """
-    Orchestrates the forecast data, billing calculation, and insight generation.
-    Uses Rolling Time-Series Forecast (XGBoost).
+    Orchestrates the forecast data, billing calculation, and insight generation
+    for one home. Uses Rolling Time-Series Forecast (XGBoost).
     """
-    # 1. Get ML Forecast
-    data = get_energy_forecast()
+    # 1. Get ML Forecast (XGBoost runs in the compute pool)
+    data = offload("get_energy_forecast", home_id)
 
     if data.get("status") == "ml_prediction":
         f = data["forecast"]
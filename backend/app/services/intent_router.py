@@ -0,0 +1,180 @@
+"""
+Compiled Intent Router (local chat fast-path)
+Every keyword of every group and language is compiled into ONE regex with
+token boundaries, so a query is scanned once: "ac" matches "ac" or "AC?"
+but not "each" / "back", and "sav*" matches "save", "saving", "savings".
+Matches are zero-width, so keywords that overlap ("how much" / "much")
+each count for their own group.
+
+Priorities are data: INTENT_RULES is checked top to bottom and the first
+rule whose keyword groups all matched wins. Adding a language means adding
+its words to KEYWORD_GROUPS; no code changes.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# -------------------------------------------------
+# Keyword Groups (per language)
+# A trailing * marks a prefix: "sav*" → save, saved, savings, ...
+# -------------------------------------------------
+KEYWORD_GROUPS: Dict[str, Dict[str, List[str]]] = {
+    "bill": {
+        "en": ["bill*", "cost*", "price", "total", "how much"],
+        "hi": ["bijli ka bill", "kitna bill", "kharcha", "बिल", "खर्च*"],
+    },
+    "previous": {
+        "en": ["last", "previous"],
+        "hi": ["pichle", "pichhle", "पिछल*"],
+    },
+    "forecast": {
+        "en": ["next", "forecast*", "estimated"],
+        "hi": ["agle", "अगल*"],
+    },
+    "current": {
+        "en": ["month", "current", "this"],
+        "hi": ["is mahine", "iss mahine", "इस महीने"],
+    },
+    "savings": {
+        "en": ["sav*"],
+        "hi": ["bachat", "बचत"],
+    },
+    "runtime": {
+        "en": ["how long", "runtime", "run time", "hours"],
+        "hi": ["kitni der", "kitne ghante", "कितने घंटे"],
+    },
+    "usage": {
+        "en": ["use*", "usage", "using", "consumption", "consum*", "power", "much", "kwh"],
+        "hi": ["kitni bijli", "kharch", "खपत"],
+    },
+    "top": {
+        "en": ["top", "most", "highest", "dominant"],
+        "hi": ["sabse zyada", "sabse jyada", "सबसे ज़्यादा", "सबसे ज्यादा"],
+    },
+    "bottom": {
+        "en": ["least", "lowest", "bottom"],
+        "hi": ["sabse kam", "सबसे कम"],
+    },
+    "model_identity": {
+        "en": ["which model", "groq model", "ai model", "llm model", "what model", "which llm"],
+    },
+}
+
+# Device keywords → UI device name (same names as knowledge_base.UI_NAME_MAP values)
+DEVICE_KEYWORDS: Dict[str, Dict[str, List[str]]] = {
+    "Air Conditioner": {
+        "en": ["ac", "a/c", "air conditioner*", "aircon", "cooling"],
+        "hi": ["एसी"],
+    },
+    "Refrigerator": {
+        "en": ["fridge", "refrigerator*"],
+        "hi": ["फ्रिज"],
+    },
+    "Washing Machine": {
+        "en": ["washing", "washer", "laundry"],
+        "hi": ["वॉशिंग मशीन"],
+    },
+    "Lighting": {
+        "en": ["light*", "bulb*", "lamp*"],
+        "hi": ["batti", "बत्ती", "लाइट"],
+    },
+    "Electronics": {
+        "en": ["tv", "television", "laptop*", "computer*", "phone*", "electronics"],
+        "hi": ["टीवी"],
+    },
+}
+
+# Whole-query greetings (after normalization)
+GREETINGS = {"hi", "hello", "hey", "start", "bismillah", "namaste", "salaam"}
+
+# -------------------------------------------------
+# Intent Priorities (first match wins)
+# -------------------------------------------------
+INTENT_RULES = [
+    {"intent": "bill_previous",   "all_of": ["bill", "previous"]},
+    {"intent": "bill_forecast",   "all_of": ["bill", "forecast"]},
+    {"intent": "bill_current",    "all_of": ["bill", "current"]},
+    {"intent": "savings",         "all_of": ["savings"]},
+    {"intent": "device_runtime",  "all_of": ["runtime", "device"]},
+    {"intent": "device_usage",    "all_of": ["device", "usage"]},
+    {"intent": "top_consumer",    "all_of": ["top"]},
+    {"intent": "bottom_consumer", "all_of": ["bottom"]},
+    {"intent": "model_identity",  "all_of": ["model_identity"]},
+]
+
+
+@dataclass
+class IntentMatch:
+    intent: str
+    device: Optional[str] = None
+    groups: set = field(default_factory=set)
+
+
+# -------------------------------------------------
+# Compilation
+# -------------------------------------------------
+def _keyword_pattern(keyword: str) -> str:
+    prefix = keyword.endswith("*")
+    words = keyword.rstrip("*").split()
+    body = r"\s+".join(re.escape(w) for w in words)
+    return body + (r"\w*" if prefix else "")
+
+
+def _compile(groups: Dict[str, Dict[str, List[str]]], devices: Dict[str, Dict[str, List[str]]]):
+    """One alternation; named group per keyword group / device. Longest keywords first."""
+    names = {}
+    alternatives = []
+    entries = [(f"g{i}", group, "group", langs) for i, (group, langs) in enumerate(groups.items())]
+    entries += [(f"d{i}", device, "device", langs) for i, (device, langs) in enumerate(devices.items())]
+
+    for regex_name, label, kind, langs in entries:
+        keywords = sorted({k for words in langs.values() for k in words}, key=len, reverse=True)
+        alternatives.append(f"(?P<{regex_name}>{'|'.join(_keyword_pattern(k) for k in keywords)})")
+        names[regex_name] = (kind, label)
+
+    # Zero-width lookahead so overlapping keywords ("how much" / "much") are all
+    # seen; token boundaries that also work for non-Latin scripts
+    pattern = r"(?<![\w/])(?=(?:" + "|".join(alternatives) + r")(?![\w/]))"
+    return re.compile(pattern, re.IGNORECASE | re.UNICODE), names
+
+
+_MATCHER, _GROUP_NAMES = _compile(KEYWORD_GROUPS, DEVICE_KEYWORDS)
+
+
+def normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def scan(query: str):
+    """(matched keyword groups, first device mentioned) in one pass over the query."""
+    groups, device = set(), None
+    for m in _MATCHER.finditer(query):
+        kind, label = _GROUP_NAMES[m.lastgroup]
+        if kind == "device":
+            if device is None:
+                device = label
+            groups.add("device")
+        else:
+            groups.add(label)
+    return groups, device
+
+
+def mentioned_devices(query: str) -> frozenset:
+    """Every device the query names (scan() keeps only the first)."""
+    return frozenset(
+        _GROUP_NAMES[m.lastgroup][1] for m in _MATCHER.finditer(query)
+        if _GROUP_NAMES[m.lastgroup][0] == "device"
+    )
+
+
+def match_intent(query: str) -> Optional[IntentMatch]:
+    q = normalize(query)
+    if q.strip(" !.?") in GREETINGS:
+        return IntentMatch("greeting")
+
+    groups, device = scan(q)
+    for rule in INTENT_RULES:
+        if all(g in groups for g in rule["all_of"]):
+            return IntentMatch(rule["intent"], device=device, groups=groups)
+    return None
@@ -3,6 +3,7 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from app.services.data_loader import home_dir, HOMES_DIR
 
 # Paths
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -11,6 +12,11 @@ INPUT_FILE = DATA_DIR / "smart_home_energy_usage_dataset.csv"
 OUTPUT_ENERGY = DATA_DIR / "energy_usage.csv"
 OUTPUT_NILM = DATA_DIR / "nilm_training_data.csv"
 
+# The household exported to energy_usage.csv (the default home); every home,
+# this one included, is also exported to data/homes/<home_id>/
+PRIMARY_HOME_ID = 3
+HOME_RECORDS = 5000
+
 # Stable Mapping for Industry Consistency
 APPLIANCE_MAP = {
     'HVAC': 0,
@@ -30,6 +36,17 @@ DEVICE_TYPE_MAP = {
     'Lighting': 'light'
 }
 
+def export_homes(df: pd.DataFrame) -> int:
+    """Writes data/homes/<home_id>/energy_usage.csv for every home; returns how many."""
+    columns = ['timestamp', 'appliance', 'device_type', 'energy_consumption_kWh', 'power_watts', 'usage_duration_minutes']
+    for home_id, group in df.groupby('home_id'):
+        home_df = group[columns].copy()
+        home_df.columns = ['timestamp', 'device_name', 'device_type', 'energy_kwh', 'power_watts', 'duration_minutes']
+        path = home_dir(str(home_id)) / "energy_usage.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        home_df.sort_values('timestamp').tail(HOME_RECORDS).to_csv(path, index=False)
+    return df['home_id'].nunique()
+
 def import_and_clean_data():
     if not INPUT_FILE.exists():
         print(f"Error: {INPUT_FILE} not found in data folder.")
@@ -41,20 +58,23 @@ def import_and_clean_data():
     # 1. Technical Guard: Remove 0 duration to prevent division by zero
     df = df[df['usage_duration_minutes'] > 0]
 
-    # 2. Filter for Home ID 3 (Single Household Simulation)
-    df_home = df[df['home_id'] == 3].copy()
-
-    # 3. Feature Engineering: Calculate Power (Watts)
-    df_home['power_watts'] = (df_home['energy_consumption_kWh'] * 60000) / df_home['usage_duration_minutes']
+    # 2. Feature Engineering: Calculate Power (Watts)
+    df['power_watts'] = (df['energy_consumption_kWh'] * 60000) / df['usage_duration_minutes']
     
-    # 4. Apply Stable Mappings
-    df_home['device_type'] = df_home['appliance'].map(DEVICE_TYPE_MAP).fillna('appliance')
-    df_home['appliance_code'] = df_home['appliance'].map(APPLIANCE_MAP).fillna(-1)
+    # 3. Apply Stable Mappings
+    df['device_type'] = df['appliance'].map(DEVICE_TYPE_MAP).fillna('appliance')
+    df['appliance_code'] = df['appliance'].map(APPLIANCE_MAP).fillna(-1)
+
+    # 4. Per-home datasets (multi-tenant serving)
+    homes = export_homes(df)
+
+    # Filter for the primary home (single household default)
+    df_home = df[df['home_id'] == PRIMARY_HOME_ID].copy()
 
     # 5. Dashboard Data (Last 5000 records for UI speed)
     dashboard_df = df_home[['timestamp', 'appliance', 'device_type', 'power_watts', 'usage_duration_minutes']].copy()
     dashboard_df.columns = ['timestamp', 'device_name', 'device_type', 'power_watts', 'duration_minutes']
-    dashboard_df.tail(5000).to_csv(OUTPUT_ENERGY, index=False)
+    dashboard_df.tail(HOME_RECORDS).to_csv(OUTPUT_ENERGY, index=False)
 
     # 6. ML Training Data (Context-Aware Features)
     nilm_df = df_home.copy()
@@ -68,8 +88,9 @@ def import_and_clean_data():
     final_nilm.columns = ['appliance_code', 'power_watts', 'duration_minutes', 'is_night', 'is_occupied', 'temp_setting', 'energy_kwh']
     final_nilm.to_csv(OUTPUT_NILM, index=False)
 
-    print(f"SUCCESS: Processed {len(df_home)} records for Home ID 3.")
+    print(f"SUCCESS: Processed {len(df_home)} records for Home ID {PRIMARY_HOME_ID}.")
     print(f"Dashboard data saved to: {OUTPUT_ENERGY}")
+    print(f"Per-home data saved for {homes} homes under: {HOMES_DIR}")
     print(f"ML Training data saved to: {OUTPUT_NILM}")
 
 if __name__ == "__main__":
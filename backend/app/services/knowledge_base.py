@@ -1,6 +1,9 @@
 import pandas as pd
+from datetime import timedelta
+from app.services.data_loader import get_data_version, cached_aggregate
 from app.services.energy_calculator import compute_dashboard_metrics
 from app.services.anomaly_detector import detect_anomalies
+from app.services.session_index import get_session_index
 
 # UI Alias Mapping
 UI_NAME_MAP = {
@@ -11,13 +14,31 @@ UI_NAME_MAP = {
     "Indoor Lighting Load": "Lighting"
 }
 
-def get_live_metrics():
+# Live metrics are derived from the dataset only, so they are computed once
+# per home and data version (in the home cache) and shared by every chat
+# session of that home.
+def get_live_metrics_versioned(home_id=None):
+    """(data_version, metrics) - recomputed only when the home's energy_usage.csv changes."""
+    return cached_aggregate(
+        "live_metrics",
+        lambda _: (get_data_version(home_id), _compute_live_metrics(home_id)),
+        home_id,
+    )
+
+
+def get_live_metrics(home_id=None):
+    """Cached live metrics (shallow copy, safe to modify)."""
+    _, metrics = get_live_metrics_versioned(home_id)
+    return dict(metrics) if metrics else metrics
+
+
+def _compute_live_metrics(home_id=None):
     """
     Fetches metrics directly from the shared calculator to ensure 
     Dashboard and Chatbot ALWAYS show the same numbers.
     """
     # 1. Get Base Metrics (Shared Logic)
-    metrics = compute_dashboard_metrics()
+    metrics = compute_dashboard_metrics(home_id)
     
     if metrics["total_energy_kwh"] == 0:
         return None
@@ -40,7 +61,14 @@ def get_live_metrics():
         bottom_device, bottom_val = "Unknown", 0
 
     # 4. Anomalies
-    anomalies = detect_anomalies()
+    anomalies = detect_anomalies(home_id=home_id)
+
+    # 5. Runtime per device (last 30 days, from the session index)
+    index = get_session_index(home_id)
+    device_runtime = {}
+    if index.last_timestamp is not None:
+        runtime = index.runtime_summary(since=index.last_timestamp - timedelta(days=30))
+        device_runtime = {UI_NAME_MAP.get(k, k): v for k, v in runtime.items()}
 
     return {
         "total_kwh": metrics["total_energy_kwh"],
@@ -54,5 +82,6 @@ def get_live_metrics():
         "device_breakdown": formatted_breakdown,
         "savings_amount": metrics["savings_amount"],
         "delta_kwh": metrics["delta_kwh"],
-        "anomaly_count": len(anomalies)
+        "anomaly_count": len(anomalies),
+        "device_runtime": device_runtime
     }
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+LLM Model Router
+Routes a chat completion across GROQ_MODEL → GROQ_FALLBACK_MODEL with:
+- Circuit breakers: a model whose recent error rate passes the threshold is
+  skipped for LLM_BREAKER_COOLDOWN_SECONDS, then probed with one request
+  (half-open) before taking traffic again.
+- Hedging: if the preferred model has not answered within its own
+  LLM_HEDGE_PERCENTILE latency, the next model is called in parallel and
+  whichever answers first wins; the slower call is cancelled.
+Tail latency is therefore bounded by ~p95(primary) + latency(fallback)
+instead of the full upstream timeout.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, List
+
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", "1.0"))
+LLM_HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", "4.0"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+STATS_WINDOW = 50          # recent calls per model used for latency / error rate
+MIN_LATENCY_SAMPLES = 5    # before that, hedge after LLM_HEDGE_DEFAULT_SECONDS
+
+
+class NoModelAvailable(Exception):
+    """Every model's circuit is open."""
+
+
+# -------------------------------------------------
+# Per-Model Health
+# -------------------------------------------------
+class ModelHealth:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = deque(maxlen=STATS_WINDOW)   # seconds, successful calls
+        self.outcomes = deque(maxlen=STATS_WINDOW)    # True = success
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    # ---------------- Breaker ----------------
+    def available(self) -> bool:
+        """Would a call be let through right now? (no side effects)"""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at < LLM_BREAKER_COOLDOWN_SECONDS:
+            return False
+        return not self.probe_in_flight
+
+    def claim(self) -> bool:
+        """Lets one call through; after the cooldown that call is the half-open probe."""
+        if not self.available():
+            return False
+        if self.state == "open":
+            self.state = "half_open"
+        if self.state == "half_open":
+            self.probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.state = "closed"
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.outcomes.append(False)
+        self.probe_in_flight = False
+        if self.state == "half_open" or (
+            len(self.outcomes) >= LLM_BREAKER_MIN_CALLS and self.error_rate() >= LLM_BREAKER_ERROR_RATE
+        ):
+            if self.state != "open":
+                print(f"⚠️ LLM circuit OPEN for {self.name} (error rate {self.error_rate():.0%})")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """A cancelled call says nothing about health; let another probe through."""
+        self.probe_in_flight = False
+
+    # ---------------- Stats ----------------
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def latency_percentile(self, q: float):
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def hedge_delay(self) -> float:
+        learned = self.latency_percentile(LLM_HEDGE_PERCENTILE)
+        return LLM_HEDGE_DEFAULT_SECONDS if learned is None else max(learned, LLM_HEDGE_MIN_SECONDS)
+
+    def snapshot(self) -> dict:
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "state": self.state,
+            "calls": len(self.outcomes),
+            "error_rate": round(self.error_rate(), 3),
+            "latency_p50_s": round(p50, 3) if p50 is not None else None,
+            "latency_p95_s": round(p95, 3) if p95 is not None else None,
+            "hedge_after_s": round(self.hedge_delay(), 3),
+        }
+
+
+# -------------------------------------------------
+# Router
+# -------------------------------------------------
+class LLMRouter:
+    def __init__(self, models: List[str]):
+        self.models = list(dict.fromkeys(models))    # ordered, de-duplicated
+        self.health = {name: ModelHealth(name) for name in self.models}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def available_models(self) -> List[str]:
+        """Models whose breaker would let a call through, in preference order."""
+        return [name for name in self.models if self.health[name].available()]
+
+    async def _timed(self, name: str, call: Callable[[str], Awaitable]):
+        started = time.monotonic()
+        try:
+            result = await call(name)
+        except asyncio.CancelledError:
+            self.health[name].release_probe()
+            raise
+        except Exception:
+            self.health[name].record_failure()
+            raise
+        self.health[name].record_success(time.monotonic() - started)
+        return result
+
+    async def complete(self, call: Callable[[str], Awaitable]):
+        """
+        Runs `call(model_name)` on the preferred healthy model, hedging onto
+        the next one after the preferred model's latency percentile.
+        Returns (model_name, result); raises the last error if all fail.
+        """
+        candidates = self.available_models()
+        if not candidates:
+            raise NoModelAvailable("All LLM circuits are open")
+
+        pending = {}
+        hedged = set()
+        last_error = None
+
+        def launch(is_hedge: bool = False) -> bool:
+            while candidates:
+                name = candidates.pop(0)
+                if self.health[name].claim():
+                    task = asyncio.ensure_future(self._timed(name, call))
+                    pending[task] = name
+                    if is_hedge:
+                        hedged.add(task)
+                    return True
+            return False
+
+        if not launch():
+            raise NoModelAvailable("All LLM circuits are open")
+
+        try:
+            while pending:
+                # Hedge only while the preferred call is the one in flight
+                hedge_after = None
+                if candidates and len(pending) == 1 and not hedged:
+                    hedge_after = self.health[next(iter(pending.values()))].hedge_delay()
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    if launch(is_hedge=True):
+                        self.hedges_fired += 1
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        if task in hedged:
+                            self.hedges_won += 1
+                        return name, task.result()
+                    last_error = task.exception()
+
+                # A call failed outright: move on to the next model immediately
+                if not pending:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or NoModelAvailable("No LLM model answered")
+
+    def snapshot(self) -> dict:
+        return {
+            "models": {name: health.snapshot() for name, health in self.health.items()},
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+        }
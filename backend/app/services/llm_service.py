@@ -1,107 +1,123 @@
 import os
-from groq import Groq
+import time
+import json
+import asyncio
+import hashlib
+import httpx
+from contextlib import asynccontextmanager
+from groq import Groq, AsyncGroq
 from dotenv import load_dotenv
-from app.services.knowledge_base import get_live_metrics
+from app.services.knowledge_base import get_live_metrics_versioned
+from app.services.llm_router import LLMRouter
+from app.services.semantic_cache import get_cached_answer, cache_answer, normalize_query
+from app.services.single_flight import flights
+from app.services.chat_sessions import session_store
+from app.services.chat_history import build_history, compactor, CHAT_SUMMARY_MAX_TOKENS
+from app.services.intent_router import match_intent
+from app.services.chat_tools import TOOL_SPECS, execute_tool, describe_dataset
 
 # --- CONFIGURATION ---
 load_dotenv()
 API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "openai/gpt-oss-120b")
 GROQ_FALLBACK_MODEL = os.getenv("GROQ_FALLBACK_MODEL", "openai/gpt-oss-20b")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None   # e.g. a local stub server
 
-# Initialize Groq client
-client = Groq(api_key=API_KEY) if API_KEY else None
+# "context": every prompt carries the live data summary
+# "tools":   constant-size prompt; the model calls chat_tools for the numbers it needs
+CHAT_MODE = os.getenv("CHAT_MODE", "context").lower()
+CHAT_TOOL_MAX_ROUNDS = int(os.getenv("CHAT_TOOL_MAX_ROUNDS", "3"))
+
+# Model that folds old turns into the running conversation summary (see chat_history)
+CHAT_SUMMARY_MODEL = os.getenv("CHAT_SUMMARY_MODEL", GROQ_FALLBACK_MODEL)
 
-CHAT_SESSIONS = {}
+# Upstream limits for the async chat path
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "12"))
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "5"))
+
+# Initialize Groq client
+client = Groq(api_key=API_KEY, base_url=GROQ_BASE_URL, timeout=LLM_CALL_TIMEOUT_SECONDS) if API_KEY else None
 
 # --- 1. LOCAL LOGIC (Enhanced for Quota Exhaustion) ---
 
+def _bill_previous(data, device):
+    return f"Your bill for the previous 30-day period was ₹{data['prev_bill']:,}."
+
+def _bill_forecast(data, device):
+    return "For forecasted bills, please check the Predictor page (AI Forecast section). That shows ML-based projections for the next 30 days."
+
+def _bill_current(data, device):
+    return f"Your actual bill for the last 30 days is ₹{data['bill']:,} (slab-based tariff)."
+
+def _savings(data, device):
+    if data['savings_amount'] > 0:
+        return f"You saved ₹{data['savings_amount']:,} compared to the previous 30-day period. Great job!"
+    return f"Your bill increased by ₹{abs(data['savings_amount']):,} compared to the previous period. Check the Analytics page to see which devices drove this increase."
+
+def _device_runtime(data, device):
+    # Answered from the session index
+    runtime = data.get('device_runtime', {}).get(device)
+    if not runtime:
+        return f"I don't see any on/off sessions for the {device} in the last 30 days."
+    return (
+        f"The {device} ran for {runtime['hours']:.1f} hours across {runtime['sessions']} sessions in the last 30 days. "
+        f"Its last session was {runtime['last_start'][:16].replace('T', ' ')} → {runtime['last_end'][:16].replace('T', ' ')}."
+    )
+
+def _device_usage(data, device):
+    if device not in data['device_breakdown']:
+        return f"I don't see active usage data for {device} in the current period."
+    kwh = data['device_breakdown'][device]
+    pct = round((kwh / data['total_kwh']) * 100, 1)
+    # Proportional cost from slab-based bill
+    cost = round((kwh / data['total_kwh']) * data['bill'], 2)
+    return f"The {device} consumed {kwh:.2f} kWh this month ({pct}% of total), costing approximately ₹{cost:,}."
+
+def _top_consumer(data, device):
+    return f"The {data['top_device']} is your highest consumer at {data['top_device_kwh']:.2f} kWh ({round((data['top_device_kwh']/data['total_kwh'])*100, 1)}% of total)."
+
+def _bottom_consumer(data, device):
+    return f"The {data['bottom_device']} is your lowest consumer at {data['bottom_device_kwh']:.2f} kWh."
+
+def _model_identity(data, device):
+    return (
+        "Enverse uses Groq through backend configuration. "
+        f"The default configured model is {GROQ_MODEL}, with {GROQ_FALLBACK_MODEL} as fallback."
+    )
+
+def _greeting(data, device):
+    return (
+        f"Hello! I'm Enverse Assistant. \n"
+        f"Your actual bill for the last 30 days is ₹{data['bill']:,}. \n"
+        f"Your top consumer is the {data['top_device']} ({data['top_device_kwh']} kWh). \n"
+        f"How can I help?"
+    )
+
+# Intent → reply (priorities live in intent_router.INTENT_RULES)
+LOCAL_HANDLERS = {
+    "bill_previous": _bill_previous,
+    "bill_forecast": _bill_forecast,
+    "bill_current": _bill_current,
+    "savings": _savings,
+    "device_runtime": _device_runtime,
+    "device_usage": _device_usage,
+    "top_consumer": _top_consumer,
+    "bottom_consumer": _bottom_consumer,
+    "model_identity": _model_identity,
+    "greeting": _greeting,
+}
+
 def get_local_response(query: str, data: dict):
     """
     Handles common queries locally when LLM is unavailable.
-    Expanded to cover: bill, savings, last month, devices.
+    Covers: bill, savings, last month, device usage/runtime, top/bottom, greetings.
     """
-    q = query.lower().strip()
-    normalized_q = " ".join(q.split())
-    
-    # BILL QUERIES (Check first - more specific than greetings)
-    if ("bill" in q or "cost" in q or "price" in q or "total" in q or "how much" in q):
-        if "last" in q or "previous" in q:
-            return f"Your bill for the previous 30-day period was ₹{data['prev_bill']:,}."
-        elif "next" in q or "forecast" in q or "estimated" in q:
-            return "For forecasted bills, please check the Predictor page (AI Forecast section). That shows ML-based projections for the next 30 days."
-        elif "month" in q or "current" in q or "this" in q:
-            return f"Your actual bill for the last 30 days is ₹{data['bill']:,} (slab-based tariff)."
-    
-    # SAVINGS
-    if "sav" in q:  # matches "save", "saving", "savings"
-        if data['savings_amount'] > 0:
-            return f"You saved ₹{data['savings_amount']:,} compared to the previous 30-day period. Great job!"
-        else:
-            return f"Your bill increased by ₹{abs(data['savings_amount']):,} compared to the previous period. Check the Analytics page to see which devices drove this increase."
-    
-    # DEVICE-SPECIFIC QUERIES (Check before greeting)
-    device_keywords = {
-        "ac": "Air Conditioner",
-        "air conditioner": "Air Conditioner", 
-        "cooling": "Air Conditioner",
-        "fridge": "Refrigerator",
-        "refrigerator": "Refrigerator",
-        "washing": "Washing Machine",
-        "washer": "Washing Machine",
-        "laundry": "Washing Machine",
-        "light": "Lighting",
-        "bulb": "Lighting",
-        "tv": "Electronics",
-        "laptop": "Electronics",
-        "computer": "Electronics",
-        "phone": "Electronics",
-        "electronics": "Electronics"
-    }
-    
-    for keyword, device_name in device_keywords.items():
-        if keyword in q and ("use" in q or "consumption" in q or "power" in q or "much" in q or "kwh" in q):
-            if device_name in data['device_breakdown']:
-                kwh = data['device_breakdown'][device_name]
-                pct = round((kwh / data['total_kwh']) * 100, 1)
-                # Proportional cost from slab-based bill
-                cost = round((kwh / data['total_kwh']) * data['bill'], 2)
-                return f"The {device_name} consumed {kwh:.2f} kWh this month ({pct}% of total), costing approximately ₹{cost:,}."
-            else:
-                return f"I don't see active usage data for {device_name} in the current period."
-    
-    # TOP CONSUMER
-    if "top" in q or "most" in q or "highest" in q or "dominant" in q:
-        return f"The {data['top_device']} is your highest consumer at {data['top_device_kwh']:.2f} kWh ({round((data['top_device_kwh']/data['total_kwh'])*100, 1)}% of total)."
-    
-    # BOTTOM CONSUMER  
-    if "least" in q or "lowest" in q or "bottom" in q:
-        return f"The {data['bottom_device']} is your lowest consumer at {data['bottom_device_kwh']:.2f} kWh."
-
-    # MODEL IDENTITY
-    if (
-        "which model" in q
-        or "groq model" in q
-        or "ai model" in q
-        or "llm model" in q
-        or "what model" in q
-        or "which llm" in q
-    ):
-        return (
-            "Enverse uses Groq through backend configuration. "
-            f"The default configured model is {GROQ_MODEL}, with {GROQ_FALLBACK_MODEL} as fallback."
-        )
-
-    # GREETING (Last - lowest priority)
-    if normalized_q in {"hi", "hello", "hey", "start", "bismillah"}:
-        return (
-            f"Hello! I'm Enverse Assistant. \n"
-            f"Your actual bill for the last 30 days is ₹{data['bill']:,}. \n"
-            f"Your top consumer is the {data['top_device']} ({data['top_device_kwh']} kWh). \n"
-            f"How can I help?"
-        )
-    
-    return None  # Pass to LLM if available
+    match = match_intent(query)
+    if match is None:
+        return None  # Pass to LLM if available
+    return LOCAL_HANDLERS[match.intent](data, match.device)
 
 # --- 3. SYSTEM PROMPT ---
 
@@ -127,12 +143,87 @@ User: "How much does AC cost?"
 You: "Let me check... Your AC consumed 299 kWh this month, costing approximately ₹2,261."
 """
 
-# --- 4. MAIN PROCESSOR ---
+TOOL_MODE_INSTRUCTION = """TOOLS:
+You have tools that return exact figures for any date range: device energy, bills, top/lowest consumers and anomalies.
+Call them for every number you quote instead of saying "Let me check". Dates are YYYY-MM-DD; omit them for the last 30 days.
+"""
 
-def process_chat_message(user_message: str, session_id: str = "default"):
+# --- 4. LIVE DATA CONTEXT (rendered once per data version) ---
+
+_context_cache = (None, None)   # (data_version, rendered text), swapped atomically
+
+def render_data_context(data: dict) -> str:
+    return f"""LIVE ENERGY DATA (Last 30 Days):
+- Total Bill: ₹{data['bill']:,}
+- Previous Bill: ₹{data['prev_bill']:,}
+- Savings: ₹{data['savings_amount']:,}
+- Total Consumption: {data['total_kwh']:.2f} kWh
+- Top Device: {data['top_device']} ({data['top_device_kwh']:.2f} kWh)
+- Device Breakdown: {', '.join([f"{k}: {v:.2f} kWh" for k, v in data['device_breakdown'].items()])}
+"""
+
+def get_data_context(data: dict, version: str) -> str:
+    global _context_cache
+    cached_version, text = _context_cache
+    if cached_version != version:
+        text = render_data_context(data)
+        _context_cache = (version, text)
+    return text
+
+# --- 5. MAIN PROCESSOR ---
+
+def _build_messages(user_message: str, session_id: str, data: dict, data_version: str, home_id=None) -> list:
+    if CHAT_MODE == "tools":
+        data_context = TOOL_MODE_INSTRUCTION + describe_dataset(home_id)
+    else:
+        data_context = get_data_context(data, data_version)
+    messages = [
+        {"role": "system", "content": SYSTEM_INSTRUCTION},
+        {"role": "system", "content": data_context}
+    ]
+    # Running summary + newest turns within the token budget
+    messages.extend(build_history(session_id))
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+def _tool_args(rounds_left: int) -> dict:
+    """Extra completion arguments in tools mode; the last round must answer in text."""
+    if CHAT_MODE != "tools":
+        return {}
+    return {"tools": TOOL_SPECS, "tool_choice": "auto" if rounds_left > 0 else "none"}
+
+def _run_tool_calls(message, home_id=None) -> list:
+    """Assistant tool-call message + one tool result message per call."""
+    calls = [
+        {"id": c.id, "type": "function", "function": {"name": c.function.name, "arguments": c.function.arguments}}
+        for c in message.tool_calls
+    ]
+    results = [
+        {"role": "tool", "tool_call_id": c["id"], "content": execute_tool(c["function"]["name"], c["function"]["arguments"], home_id)}
+        for c in calls
+    ]
+    return [{"role": "assistant", "content": message.content or "", "tool_calls": calls}] + results
+
+def _remember_turn(session_id: str, user_message: str, assistant_reply: str):
+    # Bounded per session and overall (see chat_sessions)
+    session_store.append_turn(session_id, user_message, assistant_reply)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return   # sync callers: prompt history is still token-budgeted, just not summarized
+    # Old turns are summarized after the reply is sent, never on the request path
+    compactor.schedule(session_id, _summarize_turns)
+
+async def _remember_turn_async(session_id: str, user_message: str, assistant_reply: str):
+    """_remember_turn for the event loop: the store write (SQLite) runs on a thread."""
+    await asyncio.to_thread(session_store.append_turn, session_id, user_message, assistant_reply)
+    compactor.schedule(session_id, _summarize_turns)
+
+def process_chat_message(user_message: str, session_id: str = "default", home_id=None):
+    """Blocking chat turn (scripts / sync callers). The API uses process_chat_message_async."""
     data = None
     try:
-        data = get_live_metrics()
+        data_version, data = get_live_metrics_versioned(home_id)
         if not data: return "System initializing..."
 
         # 1. Try Local Logic (Fast path for common queries)
@@ -145,46 +236,38 @@ def process_chat_message(user_message: str, session_id: str = "default"):
             print("Groq unavailable, using local summary.")
             return generate_fallback_summary(data)
 
-        # Initialize session history
-        if session_id not in CHAT_SESSIONS:
-            CHAT_SESSIONS[session_id] = []
-        
-        # Inject live data into context
-        data_context = f"""LIVE ENERGY DATA (Last 30 Days):
-- Total Bill: ₹{data['bill']:,}
-- Previous Bill: ₹{data['prev_bill']:,}
-- Savings: ₹{data['savings_amount']:,}
-- Total Consumption: {data['total_kwh']:.2f} kWh
-- Top Device: {data['top_device']} ({data['top_device_kwh']:.2f} kWh)
-- Device Breakdown: {', '.join([f"{k}: {v:.2f} kWh" for k, v in data['device_breakdown'].items()])}
-"""
-        
-        # Build messages
-        messages = [
-            {"role": "system", "content": SYSTEM_INSTRUCTION},
-            {"role": "system", "content": data_context}
-        ]
-        messages.extend(CHAT_SESSIONS[session_id])
-        messages.append({"role": "user", "content": user_message})
+        # 3. Same question already answered for this data version?
+        cached_reply, query_vector = get_cached_answer(user_message, data_version)
+        if cached_reply:
+            _remember_turn(session_id, user_message, cached_reply)
+            return cached_reply
+
+        messages = _build_messages(user_message, session_id, data, data_version, home_id)
 
         def call_groq_model(model_name: str):
-            return client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=500
-            )
+            conversation = list(messages)
+            for rounds_left in range(CHAT_TOOL_MAX_ROUNDS, -1, -1):
+                response = client.chat.completions.create(
+                    model=model_name,
+                    messages=conversation,
+                    temperature=0.7,
+                    max_tokens=500,
+                    **_tool_args(rounds_left)
+                )
+                message = response.choices[0].message
+                if not message.tool_calls:
+                    return message.content
+                conversation.extend(_run_tool_calls(message, home_id))
+            return None
 
         assistant_reply = None
 
         try:
-            response = call_groq_model(GROQ_MODEL)
-            assistant_reply = response.choices[0].message.content
+            assistant_reply = call_groq_model(GROQ_MODEL)
         except Exception:
             print("Groq primary model failed, using fallback.")
             try:
-                response = call_groq_model(GROQ_FALLBACK_MODEL)
-                assistant_reply = response.choices[0].message.content
+                assistant_reply = call_groq_model(GROQ_FALLBACK_MODEL)
             except Exception:
                 print("Groq unavailable, using local summary.")
                 return generate_fallback_summary(data)
@@ -192,13 +275,168 @@ def process_chat_message(user_message: str, session_id: str = "default"):
         if not assistant_reply:
             print("Groq unavailable, using local summary.")
             return generate_fallback_summary(data)
-        
-        # Update session history (keep last 10 messages)
-        CHAT_SESSIONS[session_id].append({"role": "user", "content": user_message})
-        CHAT_SESSIONS[session_id].append({"role": "assistant", "content": assistant_reply})
-        if len(CHAT_SESSIONS[session_id]) > 20:
-            CHAT_SESSIONS[session_id] = CHAT_SESSIONS[session_id][-20:]
-        
+
+        cache_answer(user_message, assistant_reply, data_version, query_vector)
+        _remember_turn(session_id, user_message, assistant_reply)
+        return assistant_reply
+
+    except Exception:
+        print("Groq unavailable, using local summary.")
+        if data:
+            return generate_fallback_summary(data)
+        return "System initializing..."
+
+# --- 6. ASYNC PROCESSOR (shared pooled client, deadlines, bounded concurrency) ---
+
+class LLMBusyError(Exception):
+    """All LLM slots stayed busy for LLM_QUEUE_TIMEOUT_SECONDS."""
+
+_async_client = None
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_router = LLMRouter([GROQ_MODEL, GROQ_FALLBACK_MODEL])
+
+def get_router_stats() -> dict:
+    return _router.snapshot()
+
+def get_async_client():
+    """One AsyncGroq client per process; its httpx pool keeps connections warm."""
+    global _async_client
+    if _async_client is None and API_KEY:
+        _async_client = AsyncGroq(
+            api_key=API_KEY,
+            base_url=GROQ_BASE_URL,
+            max_retries=0,     # deadlines + fallback model replace SDK retries
+            timeout=LLM_CALL_TIMEOUT_SECONDS,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONCURRENCY,
+                    max_keepalive_connections=LLM_MAX_CONCURRENCY,
+                ),
+                timeout=LLM_CALL_TIMEOUT_SECONDS,
+            ),
+        )
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+@asynccontextmanager
+async def _llm_slot():
+    try:
+        await asyncio.wait_for(_llm_slots.acquire(), LLM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise LLMBusyError(f"No LLM slot free within {LLM_QUEUE_TIMEOUT_SECONDS}s")
+    try:
+        yield
+    finally:
+        _llm_slots.release()
+
+SUMMARY_INSTRUCTION = (
+    "Summarize this energy-assistant conversation for your own future reference. "
+    "Keep every number, device, date range and user preference that was mentioned; drop pleasantries. "
+    "Merge it with the earlier summary if one is given. Plain text, at most {words} words."
+)
+
+async def _summarize_turns(previous_summary: str, messages: list):
+    """Folds `messages` (oldest turns) into the running summary; None if Groq is unavailable."""
+    if not get_async_client():
+        return None
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    prompt = [
+        {"role": "system", "content": SUMMARY_INSTRUCTION.format(words=int(CHAT_SUMMARY_MAX_TOKENS * 0.75))},
+        {"role": "user", "content": f"Earlier summary:\n{previous_summary or '(none)'}\n\nConversation:\n{transcript}"},
+    ]
+    async with _llm_slot():
+        response = await asyncio.wait_for(
+            get_async_client().chat.completions.create(
+                model=CHAT_SUMMARY_MODEL,
+                messages=prompt,
+                temperature=0.2,
+                max_tokens=CHAT_SUMMARY_MAX_TOKENS
+            ),
+            LLM_CALL_TIMEOUT_SECONDS,
+        )
+    return response.choices[0].message.content
+
+def _flight_key(user_message: str, data_version: str, messages: list) -> tuple:
+    """Identical question + data version + prompt history → one shared LLM call."""
+    history = hashlib.sha1(json.dumps(messages[2:-1], sort_keys=True).encode("utf-8")).hexdigest()
+    return ("chat", CHAT_MODE, normalize_query(user_message), data_version, history)
+
+def _call_budget(deadline: float) -> float:
+    """Seconds the next upstream call may take: per-call timeout capped by the turn deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError("Chat deadline exceeded")
+    return min(LLM_CALL_TIMEOUT_SECONDS, remaining)
+
+async def _complete(model_name: str, messages: list, deadline: float, home_id=None) -> str:
+    conversation = list(messages)
+    for rounds_left in range(CHAT_TOOL_MAX_ROUNDS, -1, -1):
+        budget = _call_budget(deadline)   # before the request coroutine exists
+        async with _llm_slot():
+            response = await asyncio.wait_for(
+                get_async_client().chat.completions.create(
+                    model=model_name,
+                    messages=conversation,
+                    temperature=0.7,
+                    max_tokens=500,
+                    **_tool_args(rounds_left)
+                ),
+                budget,
+            )
+        message = response.choices[0].message
+        if not message.tool_calls:
+            return message.content
+        # First tool call of a data version builds the aggregates: keep it off the loop
+        conversation.extend(await asyncio.to_thread(_run_tool_calls, message, home_id))
+    return None
+
+async def process_chat_message_async(user_message: str, session_id: str = "default", home_id=None):
+    """Same answers as process_chat_message without holding a worker thread per turn."""
+    data = None
+    try:
+        # Cold cache / new data version rebuilds metrics + anomalies: keep it off the loop
+        data_version, data = await asyncio.to_thread(get_live_metrics_versioned, home_id)
+        if not data: return "System initializing..."
+
+        local_reply = get_local_response(user_message, data)
+        if local_reply:
+            return local_reply
+
+        if not get_async_client():
+            print("Groq unavailable, using local summary.")
+            return generate_fallback_summary(data)
+
+        # Embedding is CPU work: keep it off the event loop
+        cached_reply, query_vector = await asyncio.to_thread(get_cached_answer, user_message, data_version)
+        if cached_reply:
+            await _remember_turn_async(session_id, user_message, cached_reply)
+            return cached_reply
+
+        messages = await asyncio.to_thread(_build_messages, user_message, session_id, data, data_version, home_id)
+        deadline = time.monotonic() + CHAT_DEADLINE_SECONDS
+
+        # Circuit-broken, hedged primary → fallback (see llm_router); concurrent
+        # identical questions (same history) share one call (see single_flight)
+        assistant_reply = None
+        try:
+            _, assistant_reply = await flights.do_async(
+                _flight_key(user_message, data_version, messages),
+                lambda: _router.complete(lambda model_name: _complete(model_name, messages, deadline, home_id)),
+            )
+        except Exception as e:
+            print(f"Groq models failed ({type(e).__name__}).")
+
+        if not assistant_reply:
+            print("Groq unavailable, using local summary.")
+            return generate_fallback_summary(data)
+
+        await asyncio.to_thread(cache_answer, user_message, assistant_reply, data_version, query_vector)
+        await _remember_turn_async(session_id, user_message, assistant_reply)
         return assistant_reply
 
     except Exception:
@@ -207,6 +445,116 @@ def process_chat_message(user_message: str, session_id: str = "default"):
             return generate_fallback_summary(data)
         return "System initializing..."
 
+async def stream_chat_message(user_message: str, session_id: str = "default", home_id=None):
+    """
+    Yields (event, payload) pairs for SSE:
+    ("token", {"text"}) as tokens arrive, then ("done", {"answer", "source"}).
+    Falls back to the next model only if no token was sent yet.
+    """
+    data_version, data = await asyncio.to_thread(get_live_metrics_versioned, home_id)
+    if not data:
+        yield "done", {"answer": "System initializing...", "source": "local"}
+        return
+
+    local_reply = get_local_response(user_message, data)
+    if local_reply or not get_async_client():
+        answer = local_reply or generate_fallback_summary(data)
+        yield "token", {"text": answer}
+        yield "done", {"answer": answer, "source": "local"}
+        return
+
+    cached_reply, query_vector = await asyncio.to_thread(get_cached_answer, user_message, data_version)
+    if cached_reply:
+        await _remember_turn_async(session_id, user_message, cached_reply)
+        yield "token", {"text": cached_reply}
+        yield "done", {"answer": cached_reply, "source": "cache"}
+        return
+
+    messages = await asyncio.to_thread(_build_messages, user_message, session_id, data, data_version, home_id)
+    deadline = time.monotonic() + CHAT_DEADLINE_SECONDS
+
+    if CHAT_MODE == "tools":
+        # Tool rounds must finish before the answer exists; send it as one chunk
+        try:
+            model_name, answer = await flights.do_async(
+                _flight_key(user_message, data_version, messages),
+                lambda: _router.complete(lambda name: _complete(name, messages, deadline, home_id)),
+            )
+        except Exception as e:
+            print(f"Groq models failed ({type(e).__name__}).")
+            model_name, answer = "local", None
+        if answer:
+            await asyncio.to_thread(cache_answer, user_message, answer, data_version, query_vector)
+            await _remember_turn_async(session_id, user_message, answer)
+        else:
+            model_name, answer = "local", generate_fallback_summary(data)
+        yield "token", {"text": answer}
+        yield "done", {"answer": answer, "source": model_name}
+        return
+
+    # Streams are not hedged (tokens go straight to the client), but they
+    # respect and feed the same circuit breakers / latency stats
+    for model_name in _router.available_models():
+        health = _router.health[model_name]
+        if not health.claim():
+            continue
+        parts = []
+        started = time.monotonic()
+        try:
+            budget = _call_budget(deadline)
+            async with _llm_slot():
+                stream = await asyncio.wait_for(
+                    get_async_client().chat.completions.create(
+                        model=model_name,
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=500,
+                        stream=True
+                    ),
+                    budget,
+                )
+                try:
+                    iterator = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(iterator.__anext__(), _call_budget(deadline))
+                        except StopAsyncIteration:
+                            break
+                        text = chunk.choices[0].delta.content if chunk.choices else None
+                        if text:
+                            if not parts:
+                                health.record_success(time.monotonic() - started)   # time to first token
+                            parts.append(text)
+                            yield "token", {"text": text}
+                finally:
+                    await stream.close()
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                health.release_probe()   # client went away / cancelled
+                raise
+            if not parts:
+                health.record_failure()
+            print(f"Groq stream {model_name} failed ({type(e).__name__}).")
+            if parts:
+                # Tokens already reached the client: end with what we have
+                answer = "".join(parts)
+                await _remember_turn_async(session_id, user_message, answer)
+                yield "done", {"answer": answer, "source": model_name, "truncated": True}
+                return
+            continue
+
+        answer = "".join(parts)
+        if answer:
+            await asyncio.to_thread(cache_answer, user_message, answer, data_version, query_vector)
+            await _remember_turn_async(session_id, user_message, answer)
+            yield "done", {"answer": answer, "source": model_name}
+            return
+        health.record_failure()   # empty completion
+
+    answer = generate_fallback_summary(data)
+    yield "token", {"text": answer}
+    yield "done", {"answer": answer, "source": "local"}
+
 def generate_fallback_summary(data):
     return (
         f"I'm currently answering using system data.\n"
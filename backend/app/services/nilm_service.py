@@ -0,0 +1,101 @@
+"""
+NILM Disaggregation Service
+Serves the trained NILM XGBoost regressor for batches of meter readings.
+All readings in a request are scored with ONE vectorized predict call.
+"""
+
+import os
+import joblib
+import numpy as np
+from pathlib import Path
+from app.ml.model_registry import resolve_model_path
+from app.services.kaggle_importer import APPLIANCE_MAP
+
+# ---------------------------------------------------------
+# CONFIGURATION
+# ---------------------------------------------------------
+BASE_DIR = Path(__file__).resolve().parents[2]
+MODEL_PATH = BASE_DIR / "app" / "ml" / "models" / "nilm_xgboost_model.pkl"
+
+# Column order MUST MATCH train_nilm_model.FEATURES
+FEATURES = ["power_watts", "duration_minutes", "is_night", "is_occupied", "appliance_code"]
+MAX_BATCH_SIZE = int(os.getenv("NILM_MAX_BATCH_SIZE", "10000"))
+
+APPLIANCE_NAMES = {code: name for name, code in APPLIANCE_MAP.items()}
+
+_model = None
+_model_path = None
+
+
+# ---------------------------------------------------------
+# MODEL LOADING (follows the registry's ACTIVE version)
+# ---------------------------------------------------------
+def get_nilm_model():
+    """Loads the active NILM model, reloading only after a promotion/rollback."""
+    global _model, _model_path
+    model_path = resolve_model_path(MODEL_PATH.stem, MODEL_PATH)
+
+    if _model is None or model_path != _model_path:
+        if not model_path.exists():
+            raise FileNotFoundError(f"NILM model not found at {model_path}")
+        _model = joblib.load(model_path)
+        _model_path = model_path
+        print(f"✅ NILM Model loaded: {model_path}")
+
+    return _model
+
+
+# ---------------------------------------------------------
+# BATCH DISAGGREGATION
+# ---------------------------------------------------------
+def build_feature_matrix(columns: dict) -> np.ndarray:
+    """
+    Stacks columnar readings into a float32 (n_readings, n_features) matrix.
+    Optional flag columns default to 0.
+    """
+    n = len(columns["power_watts"])
+    X = np.zeros((n, len(FEATURES)), dtype=np.float32)
+    for i, name in enumerate(FEATURES):
+        values = columns.get(name)
+        if values is None:
+            continue
+        if len(values) != n:
+            raise ValueError(f"Column '{name}' has {len(values)} values, expected {n}")
+        X[:, i] = np.asarray(values, dtype=np.float32)
+    return X
+
+
+def disaggregate_batch(columns: dict) -> dict:
+    """
+    Estimates kWh for every reading and totals them per appliance.
+
+    Args:
+        columns: dict of equal-length lists keyed by FEATURES names
+    """
+    n = len(columns["power_watts"])
+    if n > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch of {n} readings exceeds limit of {MAX_BATCH_SIZE}")
+
+    X = build_feature_matrix(columns)
+    if n == 0:
+        return {"count": 0, "energy_kwh": [], "per_appliance_kwh": {}, "total_kwh": 0.0}
+
+    model = get_nilm_model()
+    preds = np.clip(model.predict(X), 0.0, None).astype(np.float64)
+
+    # Per-appliance totals without a Python loop over readings
+    codes = X[:, FEATURES.index("appliance_code")].astype(np.int64)
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+    totals = np.bincount(inverse, weights=preds)
+
+    per_appliance = {
+        APPLIANCE_NAMES.get(int(code), f"Appliance {int(code)}"): round(float(total), 4)
+        for code, total in zip(unique_codes, totals)
+    }
+
+    return {
+        "count": int(len(preds)),
+        "energy_kwh": np.round(preds, 4).tolist(),
+        "per_appliance_kwh": per_appliance,
+        "total_kwh": round(float(preds.sum()), 4),
+    }
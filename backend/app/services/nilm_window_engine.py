@@ -0,0 +1,167 @@
+"""
+Sliding-Window NILM Engine
+Disaggregates a single whole-house power signal into per-device power
+traces. The signal is cut into strided windows as zero-copy NumPy views
+and every device model scores all windows in one batched predict call.
+
+Two modes:
+- Batch:     disaggregate_signal(aggregate_watts)
+- Streaming: StreamingDisaggregator.push(new_readings) scores only the
+             windows completed by the new readings.
+"""
+
+import os
+import threading
+import joblib
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+from app.ml.model_registry import resolve_model_path
+
+# ---------------------------------------------------------
+# CONFIGURATION
+# ---------------------------------------------------------
+BASE_DIR = Path(__file__).resolve().parents[2]
+MODEL_PATH = BASE_DIR / "app" / "ml" / "models" / "nilm_window_models.pkl"
+
+WINDOW_SIZE = 9                 # samples per window (odd → well-defined centre)
+MAX_SIGNAL_LENGTH = int(os.getenv("NILM_MAX_SIGNAL_LENGTH", "100000"))
+MAX_STREAMS = int(os.getenv("NILM_MAX_STREAMS", "256"))
+
+_bundle = None
+_bundle_path = None
+
+
+# ---------------------------------------------------------
+# MODEL LOADING
+# ---------------------------------------------------------
+def get_window_models() -> dict:
+    """{"window": int, "devices": {device_name: regressor}} for the active version."""
+    global _bundle, _bundle_path
+    model_path = resolve_model_path(MODEL_PATH.stem, MODEL_PATH)
+
+    if _bundle is None or model_path != _bundle_path:
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"Sliding-window NILM models not found at {model_path}. "
+                "Run 'python -m app.ml.train_window_nilm'"
+            )
+        _bundle = joblib.load(model_path)
+        _bundle_path = model_path
+        print(f"✅ Sliding-Window NILM loaded: {model_path} ({len(_bundle['devices'])} devices)")
+
+    return _bundle
+
+
+# ---------------------------------------------------------
+# WINDOWING
+# ---------------------------------------------------------
+def strided_windows(signal: np.ndarray, window: int, stride: int = 1) -> np.ndarray:
+    """(n_windows, window) view over `signal` - no data is copied."""
+    if len(signal) < window:
+        return np.empty((0, window), dtype=signal.dtype)
+    return sliding_window_view(signal, window)[::stride]
+
+
+def _score_windows(windows: np.ndarray, devices: dict) -> dict:
+    """One batched predict per device over every window."""
+    if len(windows) == 0:
+        return {device: np.empty(0, dtype=np.float64) for device in devices}
+    return {
+        device: np.clip(model.predict(windows), 0.0, None).astype(np.float64)
+        for device, model in devices.items()
+    }
+
+
+# ---------------------------------------------------------
+# BATCH MODE
+# ---------------------------------------------------------
+def disaggregate_signal(aggregate_watts, stride: int = 1) -> dict:
+    """
+    Per-device power traces for a whole-house signal.
+    Trace point i corresponds to input sample `centre_offset + i * stride`.
+    """
+    signal = np.asarray(aggregate_watts, dtype=np.float32)
+    if len(signal) > MAX_SIGNAL_LENGTH:
+        raise ValueError(f"Signal of {len(signal)} samples exceeds limit of {MAX_SIGNAL_LENGTH}")
+    if stride < 1:
+        raise ValueError("stride must be >= 1")
+
+    bundle = get_window_models()
+    window = bundle["window"]
+    traces = _score_windows(strided_windows(signal, window, stride), bundle["devices"])
+
+    return {
+        "window": window,
+        "stride": stride,
+        "centre_offset": window // 2,
+        "points": len(next(iter(traces.values()), [])),
+        "traces": {device: np.round(trace, 2).tolist() for device, trace in traces.items()},
+    }
+
+
+# ---------------------------------------------------------
+# STREAMING MODE
+# ---------------------------------------------------------
+class StreamingDisaggregator:
+    """
+    Keeps the last (window - 1) samples between pushes so each new reading
+    completes exactly one new window; older windows are never re-scored.
+    """
+
+    def __init__(self, stride: int = 1):
+        if stride < 1:
+            raise ValueError("stride must be >= 1")
+        self.stride = stride
+        self._tail = np.empty(0, dtype=np.float32)
+        self._windows_seen = 0
+        self._lock = threading.Lock()   # concurrent pushes to one stream apply in turn
+
+    def push(self, readings) -> dict:
+        bundle = get_window_models()
+        window = bundle["window"]
+        new = np.asarray(readings, dtype=np.float32)
+
+        with self._lock:
+            buffer = np.concatenate([self._tail, new])
+
+            # Keep the global stride phase across pushes
+            all_windows = strided_windows(buffer, window)
+            offset = (-self._windows_seen) % self.stride
+            first_window = self._windows_seen + offset
+            windows = all_windows[offset::self.stride]
+
+            traces = _score_windows(windows, bundle["devices"])
+
+            self._windows_seen += len(all_windows)
+            self._tail = buffer[-(window - 1):].copy() if window > 1 else np.empty(0, dtype=np.float32)
+
+        return {
+            "window": window,
+            "stride": self.stride,
+            "start_index": first_window + window // 2,   # sample index of the first new point
+            "points": len(windows),
+            "traces": {device: np.round(trace, 2).tolist() for device, trace in traces.items()},
+        }
+
+
+# Open streams, least recently used evicted first
+STREAMS = OrderedDict()
+_streams_lock = threading.Lock()    # endpoints run in the threadpool
+
+def push_stream_readings(stream_id: str, readings, stride: int = 1) -> dict:
+    if len(readings) > MAX_SIGNAL_LENGTH:
+        raise ValueError(f"Push of {len(readings)} samples exceeds limit of {MAX_SIGNAL_LENGTH}")
+
+    with _streams_lock:
+        stream = STREAMS.get(stream_id)
+        if stream is None or stream.stride != stride:
+            stream = StreamingDisaggregator(stride=stride)
+            STREAMS[stream_id] = stream
+        STREAMS.move_to_end(stream_id)
+
+        while len(STREAMS) > MAX_STREAMS:
+            STREAMS.popitem(last=False)
+
+    return {"stream_id": stream_id, **stream.push(readings)}
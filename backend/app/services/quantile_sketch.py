@@ -0,0 +1,137 @@
+"""
+KLL Quantile Sketch
+Fixed-size, mergeable summary of a stream of numbers (Karnin, Lang, Liberty 2016).
+
+Level h holds items that each stand for 2**h original values. When a level
+overflows it is sorted and every other item (random offset) is promoted to
+level h+1, so memory stays O(k log(n/k)) no matter how many readings are
+added. Two sketches built on different shards/workers merge into one with
+the same error guarantee (rank error ~ 1.65 / k for k=200 → ~1%).
+"""
+
+import math
+import numpy as np
+
+DEFAULT_K = 200
+_C = 2.0 / 3.0   # capacity decay between levels
+
+
+class KLLSketch:
+    def __init__(self, k: int = DEFAULT_K, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    # ---------------- Capacity ----------------
+    def _capacity(self, h: int) -> int:
+        depth = len(self._levels) - h - 1
+        return int(math.ceil(self.k * _C ** depth)) + 1
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self._levels)))
+
+    def _size(self) -> int:
+        return sum(len(level) for level in self._levels)
+
+    # ---------------- Updates ----------------
+    def update(self, values):
+        """Adds a batch of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """Folds `other` into this sketch (other is left unchanged)."""
+        if other.count == 0:
+            return
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for h, level in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], level])
+
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for h in range(len(self._levels)):
+                if len(self._levels[h]) < self._capacity(h):
+                    continue
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+
+                level = np.sort(self._levels[h])
+                keep = level[-1:] if len(level) % 2 else level[:0]   # odd item stays behind
+                pairs = level[:len(level) - len(keep)]
+                offset = int(self._rng.integers(2))
+                self._levels[h + 1] = np.concatenate([self._levels[h + 1], pairs[offset::2]])
+                self._levels[h] = keep
+                break
+
+    # ---------------- Queries ----------------
+    def _weighted(self):
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level), 2 ** h, dtype=np.float64) for h, level in enumerate(self._levels)
+        ])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 ≤ q ≤ 1); NaN while empty."""
+        if self.count == 0:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        values, cum_weights = self._weighted()
+        idx = int(np.searchsorted(cum_weights, q * cum_weights[-1], side="left"))
+        return float(values[min(idx, len(values) - 1)])
+
+    def quantiles(self, qs) -> list:
+        return [self.quantile(q) for q in qs]
+
+    def rank(self, value: float) -> float:
+        """Approximate fraction of values ≤ `value`."""
+        if self.count == 0:
+            return math.nan
+        values, cum_weights = self._weighted()
+        idx = int(np.searchsorted(values, value, side="right"))
+        return float(cum_weights[idx - 1] / cum_weights[-1]) if idx else 0.0
+
+    # ---------------- Serialization ----------------
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "levels": [level.tolist() for level in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KLLSketch":
+        sketch = cls(k=data.get("k", DEFAULT_K))
+        sketch.count = int(data.get("count", 0))
+        if sketch.count:
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        sketch._levels = [np.asarray(level, dtype=np.float64) for level in data.get("levels", [[]])] \
+            or [np.empty(0, dtype=np.float64)]
+        return sketch
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,192 @@
+"""
+Rate Limiting & Admission Control
+Token buckets per client IP, per user and per route, plus a cap on
+concurrent requests for the expensive routes. A request over its limit
+is answered immediately (429, or 503 when the route is saturated) with a
+Retry-After header, so one noisy client cannot queue up LLM calls,
+emails or pandas work and slow everybody else down.
+
+- Buckets live in one LRU-bounded dict (RATE_LIMIT_MAX_KEYS). A bucket
+  that is dropped would have refilled anyway, so eviction only forgets
+  idle clients.
+- Limits are per process (each uvicorn worker enforces its own share).
+- The client address is scope["client"]. Behind Render/Vercel that is the
+  proxy unless uvicorn runs with --proxy-headers (Dockerfile.backend does),
+  which takes it from X-Forwarded-For set by proxies in
+  FORWARDED_ALLOW_IPS; without it every user shares one "ip" bucket.
+- Implemented as plain ASGI middleware: no request body buffering, and
+  streaming responses hold their concurrency slot until they finish.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+
+
+def per_minute(count: float, burst: Optional[int] = None):
+    """(refill tokens/second, bucket size)"""
+    return (count / 60.0, burst or max(1, int(count)))
+
+
+# path → limits; scopes: "ip", "user", "route" (everyone together)
+RATE_LIMIT_RULES = {
+    "/auth/send-otp":       {"ip": per_minute(5), "route": per_minute(120, 30)},
+    "/auth/verify-otp":     {"ip": per_minute(10)},
+    "/chat":                {"ip": per_minute(20, 10), "user": per_minute(20, 10), "max_concurrent": 32},
+    "/chat/stream":         {"ip": per_minute(20, 10), "user": per_minute(20, 10), "max_concurrent": 32},
+    # Sync routes: 3 x 12 slots leave room in AnyIO's 40-thread pool for everything else
+    "/dashboard":           {"ip": per_minute(60, 20), "max_concurrent": 12},
+    "/energy/forecast":     {"ip": per_minute(60, 20), "max_concurrent": 12},
+    "/energy/ai-insights":  {"ip": per_minute(60, 20), "max_concurrent": 12},
+}
+
+# Per recipient, checked inside /auth/send-otp (the address is in the body)
+OTP_PER_EMAIL = (3 / 600.0, 3)     # 3 codes per 10 minutes
+
+
+# -------------------------------------------------
+# Token Buckets
+# -------------------------------------------------
+class TokenBuckets:
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()      # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def _refilled(self, key, rate: float, burst: int, now: float):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return [float(burst), now]
+        bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        return bucket
+
+    def acquire(self, limits) -> float:
+        """
+        limits: [(key, (rate, burst))]. Takes one token from every bucket
+        or from none; returns 0 when allowed, else seconds until allowed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            buckets = [(key, self._refilled(key, rate, burst, now), rate) for key, (rate, burst) in limits]
+            wait = max(((1 - b[0]) / rate for _, b, rate in buckets if b[0] < 1), default=0.0)
+            if wait > 0:
+                return wait
+            for key, bucket, _ in buckets:
+                bucket[0] -= 1
+                self._buckets[key] = bucket
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def refund(self, limits):
+        """Gives back the token acquire() took (the limited action did not happen)."""
+        with self._lock:
+            for key, (_, burst) in limits:
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket[0] = min(burst, bucket[0] + 1)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+buckets = TokenBuckets()
+_in_flight = defaultdict(int)
+_counters = defaultdict(lambda: {"allowed": 0, "rate_limited": 0, "shed": 0})
+
+
+def client_ip(scope) -> str:
+    # Already the forwarded client address under uvicorn --proxy-headers
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def check_otp_recipient(email: str) -> float:
+    """0 if another OTP may be sent to `email`, else seconds to wait."""
+    if not RATE_LIMIT_ENABLED:
+        return 0.0
+    return buckets.acquire([(("otp-email", email), OTP_PER_EMAIL)])
+
+
+def refund_otp_recipient(email: str):
+    """The OTP email was not sent after all (e.g. queue full): it does not count."""
+    if RATE_LIMIT_ENABLED:
+        buckets.refund([(("otp-email", email), OTP_PER_EMAIL)])
+
+
+# -------------------------------------------------
+# ASGI Middleware
+# -------------------------------------------------
+def _reject(status: int, retry_after: float, detail: str):
+    body = ('{"detail": "%s"}' % detail).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+    ]
+    return status, headers, body
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        rule = RATE_LIMIT_RULES.get(path) if scope["type"] == "http" and RATE_LIMIT_ENABLED else None
+        if rule is None or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        counters = _counters[path]
+        cap = rule.get("max_concurrent")
+        if cap is not None and _in_flight[path] >= cap:
+            counters["shed"] += 1
+            await self._send_error(send, *_reject(503, 1, "Server busy, please retry"))
+            return
+
+        limits = [(("route", path), rule["route"])] if "route" in rule else []
+        if "ip" in rule:
+            limits.append((("ip", path, client_ip(scope)), rule["ip"]))
+        user = scope.get("state", {}).get("user_id")
+        if "user" in rule and user is not None:
+            limits.append((("user", path, user), rule["user"]))
+
+        wait = buckets.acquire(limits)
+        if wait > 0:
+            counters["rate_limited"] += 1
+            await self._send_error(send, *_reject(429, wait, "Too many requests"))
+            return
+
+        counters["allowed"] += 1
+        if cap is None:
+            await self.app(scope, receive, send)
+            return
+
+        _in_flight[path] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _in_flight[path] -= 1
+
+    @staticmethod
+    async def _send_error(send, status, headers, body):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def get_rate_limit_stats() -> dict:
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "tracked_keys": len(buckets),
+        "in_flight": dict(_in_flight),
+        "routes": {path: dict(c) for path, c in _counters.items()},
+    }
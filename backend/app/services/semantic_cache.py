@@ -0,0 +1,285 @@
+"""
+Semantic Chat Response Cache
+Reuses an LLM answer when a new question means the same thing as one
+already answered for the SAME data version ("why is my bill high" ≈
+"why is my bill so high?").
+
+- Queries are normalized and embedded with sentence-transformers
+  (CHAT_CACHE_MODEL); each home's vectors live in one float32 matrix,
+  so a lookup is a single matrix-vector product.
+- A hit needs cosine similarity ≥ CHAT_CACHE_SIMILARITY AND the same
+  specifics: devices (intent_router), months / relative periods and
+  numbers. Embeddings alone rate "AC use in January" close to "fridge
+  use in February", whose answer quotes other numbers.
+- At most CHAT_CACHE_MAX_ENTRIES answers across all homes; the least
+  recently used one is dropped when full. Answers longer than
+  CHAT_CACHE_MAX_ANSWER_CHARS are not cached.
+- A change of a home's data version empties that home's index only
+  (answers quote live numbers).
+
+Without sentence-transformers installed the cache still serves exact
+repeats of the normalized question.
+"""
+
+import os
+import re
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Optional
+from app.services.intent_router import mentioned_devices
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "true").lower() == "true"
+CHAT_CACHE_MODEL = os.getenv("CHAT_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.92"))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "1000"))
+CHAT_CACHE_MAX_ANSWER_CHARS = int(os.getenv("CHAT_CACHE_MAX_ANSWER_CHARS", "4000"))
+
+_PUNCTUATION = re.compile(r"[^\w\s₹%.]", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    q = _PUNCTUATION.sub(" ", query.lower())
+    return " ".join(q.split()).strip(" .")
+
+
+_MONTHS = (
+    "jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    "|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+_PERIODS = (
+    "today|yesterday|tomorrow|tonight|day|days|daily|night|nights|week|weeks|weekly|weekend"
+    "|month|months|monthly|year|years|yearly|last|this|next|previous|past|current"
+)
+_SPECIFICS = re.compile(rf"\d+(?:\.\d+)?|\b(?:{_PERIODS})\b|\b(?P<month>{_MONTHS})\b", re.UNICODE)
+
+
+def query_signature(query: str) -> tuple:
+    """What a cached answer must share with the question: devices, periods, numbers."""
+    q = normalize_query(query)
+    # "jan" / "january" name the same month
+    specifics = {m.group()[:3] if m.group("month") else m.group() for m in _SPECIFICS.finditer(q)}
+    return (tuple(sorted(mentioned_devices(q))), tuple(sorted(specifics)))
+
+
+# -------------------------------------------------
+# Embedding Model (lazy, optional)
+# -------------------------------------------------
+_embedder = None
+_embedder_failed = SentenceTransformer is None
+_embedder_lock = threading.Lock()
+
+
+def _get_embedder():
+    global _embedder, _embedder_failed
+    if _embedder is not None or _embedder_failed:
+        return _embedder
+    with _embedder_lock:
+        if _embedder is None and not _embedder_failed:
+            try:
+                _embedder = SentenceTransformer(CHAT_CACHE_MODEL)
+                print(f"✅ Chat cache embedder loaded: {CHAT_CACHE_MODEL}")
+            except Exception as e:
+                _embedder_failed = True
+                print(f"⚠️ Chat cache embedder unavailable, exact matches only: {e}")
+    return _embedder
+
+
+def embed(text: str) -> Optional[np.ndarray]:
+    model = _get_embedder()
+    if model is None:
+        return None
+    return model.encode(text, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+# -------------------------------------------------
+# Vector Index
+# -------------------------------------------------
+def home_of(data_version: str) -> str:
+    """Data versions look like "<home>:<mtime>-<size>" (see data_loader.get_data_version)."""
+    return str(data_version).partition(":")[0]
+
+
+class _HomeIndex:
+    """One home's answers for its current data version. Rows grow on demand."""
+
+    def __init__(self, version):
+        self.version = version
+        self.vectors = None                       # (capacity, dim), allocated on first vector
+        self.has_vector = np.zeros(0, dtype=bool)
+        self.last_used = np.zeros(0, dtype=np.int64)
+        self.answers = []
+        self.keys = []
+        self.signatures = []
+        self.slot_by_key = {}
+        self.free = []
+
+    def __len__(self):
+        return len(self.slot_by_key)
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes if self.vectors is not None else 0
+
+    def new_slot(self) -> int:
+        if self.free:
+            return self.free.pop()
+        slot = len(self.answers)
+        self.answers.append(None)
+        self.keys.append(None)
+        self.signatures.append(None)
+        if slot >= len(self.last_used):
+            capacity = max(8, 2 * len(self.last_used))
+            self.has_vector = np.resize(self.has_vector, capacity)
+            self.has_vector[slot:] = False
+            self.last_used = np.resize(self.last_used, capacity)
+            if self.vectors is not None:
+                grown = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+                grown[:len(self.vectors)] = self.vectors
+                self.vectors = grown
+        return slot
+
+    def set_vector(self, slot: int, vector: Optional[np.ndarray]):
+        if vector is not None:
+            if self.vectors is None:
+                self.vectors = np.zeros((len(self.last_used), len(vector)), dtype=np.float32)
+            self.vectors[slot] = vector
+        self.has_vector[slot] = vector is not None
+
+    def search(self, vector: np.ndarray, signature: tuple, threshold: float) -> Optional[int]:
+        """Most similar answer with the same signature, if similar enough."""
+        if self.vectors is None or not self.has_vector.any():
+            return None
+        candidates = self.has_vector.copy()
+        candidates[:len(self.signatures)] &= np.fromiter(
+            (s == signature for s in self.signatures), dtype=bool, count=len(self.signatures)
+        )
+        if not candidates.any():
+            return None
+        scores = self.vectors @ vector
+        scores[~candidates] = -1.0
+        best = int(np.argmax(scores))
+        return best if scores[best] >= threshold else None
+
+    def evict_lru(self):
+        slot = min(self.slot_by_key.values(), key=lambda s: self.last_used[s])
+        del self.slot_by_key[self.keys[slot]]
+        self.answers[slot] = self.keys[slot] = self.signatures[slot] = None
+        self.has_vector[slot] = False
+        self.free.append(slot)
+
+
+class SemanticCache:
+    """
+    One index per home (answers quote that home's numbers), least recently
+    used homes first in `_homes`. All homes share max_entries: when full,
+    the least recently used answer of the least recently used home goes.
+    """
+
+    def __init__(self, max_entries: int = CHAT_CACHE_MAX_ENTRIES, threshold: float = CHAT_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._homes = OrderedDict()               # home -> _HomeIndex
+        self._size = 0
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _index(self, data_version: str, create: bool) -> Optional[_HomeIndex]:
+        """The home's index for `data_version`; an older version's index is dropped."""
+        home = home_of(data_version)
+        index = self._homes.get(home)
+        if index is not None and index.version != data_version:
+            self._size -= len(index)
+            del self._homes[home]
+            index = None
+        if index is None and create:
+            index = self._homes[home] = _HomeIndex(data_version)
+        if index is not None:
+            self._homes.move_to_end(home)
+        return index
+
+    def _make_room(self):
+        while self._size >= self.max_entries:
+            home, index = next((h, i) for h, i in self._homes.items() if len(i))
+            index.evict_lru()
+            self._size -= 1
+            if not len(index) and home != next(reversed(self._homes)):
+                del self._homes[home]
+
+    def _touch(self, index: _HomeIndex, slot: int):
+        self._clock += 1
+        index.last_used[slot] = self._clock
+
+    def lookup(self, query: str, data_version: str, vector: Optional[np.ndarray] = None) -> Optional[str]:
+        key = normalize_query(query)
+        with self._lock:
+            index = self._index(data_version, create=False)
+            slot = None
+            if index is not None:
+                slot = index.slot_by_key.get(key)
+                if slot is None and vector is not None:
+                    slot = index.search(vector, query_signature(query), self.threshold)
+
+            if slot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(index, slot)
+            return index.answers[slot]
+
+    def store(self, query: str, answer: str, data_version: str, vector: Optional[np.ndarray] = None):
+        if not answer or len(answer) > CHAT_CACHE_MAX_ANSWER_CHARS or self.max_entries <= 0:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            index = self._index(data_version, create=True)
+            slot = index.slot_by_key.get(key)
+            if slot is None:
+                self._make_room()
+                slot = index.new_slot()
+                self._size += 1
+
+            index.set_vector(slot, vector)
+            index.answers[slot] = answer
+            index.keys[slot] = key
+            index.signatures[slot] = query_signature(query)
+            index.slot_by_key[key] = slot
+            self._touch(index, slot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": CHAT_CACHE_ENABLED,
+                "semantic": _embedder is not None,
+                "homes": len(self._homes),
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "index_bytes": sum(i.nbytes for i in self._homes.values()),
+            }
+
+
+response_cache = SemanticCache()
+
+
+def get_cached_answer(query: str, data_version: str):
+    """(answer or None, query vector to reuse when storing)."""
+    if not CHAT_CACHE_ENABLED:
+        return None, None
+    vector = embed(normalize_query(query))
+    return response_cache.lookup(query, data_version, vector), vector
+
+
+def cache_answer(query: str, answer: str, data_version: str, vector=None):
+    if CHAT_CACHE_ENABLED:
+        response_cache.store(query, answer, data_version, vector)
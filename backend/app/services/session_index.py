@@ -0,0 +1,234 @@
+"""
+Device Session Index
+Turns raw readings into on/off sessions per device with a vectorized
+edge + run-length pass (no per-device Python loops over readings).
+
+A reading covers [timestamp, timestamp + duration_minutes]. Consecutive
+"on" readings of the same device belong to one session while the next
+reading starts within MAX_GAP of the current session's end.
+
+The index is built once and then extended incrementally with readings
+newer than the last indexed timestamp, so alerts, chat answers and the
+device drawer all read from the same precomputed sessions.
+"""
+
+import pandas as pd
+from datetime import timedelta
+from typing import Optional
+from app.services.data_loader import load_energy_data, cached_aggregate
+
+# -------------------------------------------------
+# Session Rules
+# -------------------------------------------------
+ON_THRESHOLD_WATTS = 0.0              # device is ON while drawing more than this
+MAX_GAP = timedelta(minutes=15)       # tolerated silence inside one session
+
+SESSION_COLUMNS = [
+    "device_name", "start", "end", "duration_hours",
+    "mean_power_watts", "energy_kwh", "readings",
+]
+
+
+# -------------------------------------------------
+# Vectorized Edge / Run-Length Detection
+# -------------------------------------------------
+def detect_sessions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Readings → one row per on/off session.
+    Columns: device_name, start, end, duration_hours, mean_power_watts,
+             energy_kwh, readings
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SESSION_COLUMNS)
+
+    on = df[df["power_watts"] > ON_THRESHOLD_WATTS]
+    if on.empty:
+        return pd.DataFrame(columns=SESSION_COLUMNS)
+
+    on = on.sort_values(["device_name", "timestamp"])
+    start = on["timestamp"]
+    end = start + pd.to_timedelta(on["duration_minutes"].clip(lower=0), unit="m")
+
+    # Running end of the current run (a long reading can cover later ones)
+    running_end = end.groupby(on["device_name"]).cummax()
+    prev_end = running_end.groupby(on["device_name"]).shift(1)
+
+    # Rising edge: first reading of a device, or a gap wider than MAX_GAP
+    new_session = prev_end.isna() | (start > prev_end + MAX_GAP)
+    session_id = new_session.cumsum()
+
+    grouped = pd.DataFrame({
+        "device_name": on["device_name"],
+        "start": start,
+        "end": end,
+        "power_watts": on["power_watts"],
+        "energy_kwh": on["energy_kwh"],
+        "session_id": session_id,
+    }).groupby("session_id")
+
+    sessions = grouped.agg(
+        device_name=("device_name", "first"),
+        start=("start", "min"),
+        end=("end", "max"),
+        power_sum=("power_watts", "sum"),
+        energy_kwh=("energy_kwh", "sum"),
+        readings=("power_watts", "size"),
+    )
+    return _finalize(sessions)
+
+
+def _finalize(sessions: pd.DataFrame) -> pd.DataFrame:
+    sessions = sessions.copy()
+    sessions["duration_hours"] = (sessions["end"] - sessions["start"]).dt.total_seconds() / 3600
+    sessions["mean_power_watts"] = sessions["power_sum"] / sessions["readings"]
+    return sessions[SESSION_COLUMNS].reset_index(drop=True)
+
+
+# -------------------------------------------------
+# Incremental Index
+# -------------------------------------------------
+class SessionIndex:
+    """Sessions for one readings stream, extended with newer readings only."""
+
+    def __init__(self):
+        self.sessions = pd.DataFrame(columns=SESSION_COLUMNS)
+        self.last_timestamp = None
+        self.rows_indexed = 0
+
+    def rebuild(self, df: pd.DataFrame):
+        self.sessions = detect_sessions(df)
+        self.last_timestamp = df["timestamp"].max() if not df.empty else None
+        self.rows_indexed = len(df)
+
+    def is_append_of(self, df: pd.DataFrame) -> bool:
+        """True if `df` is the indexed data plus newer readings only."""
+        if self.last_timestamp is None:
+            return False
+        return int((df["timestamp"] <= self.last_timestamp).sum()) == self.rows_indexed
+
+    def update(self, df: pd.DataFrame):
+        """Indexes readings newer than the last indexed timestamp."""
+        if self.last_timestamp is None:
+            self.rebuild(df)
+            return
+
+        new_rows = df[df["timestamp"] > self.last_timestamp]
+        if new_rows.empty:
+            return
+
+        new_sessions = detect_sessions(new_rows)
+        self.last_timestamp = new_rows["timestamp"].max()
+        self.rows_indexed += len(new_rows)
+        if new_sessions.empty:
+            return
+
+        # Only each device's latest session can continue into the new data
+        old = self.sessions
+        tail_idx = old.groupby("device_name")["end"].idxmax() if not old.empty else pd.Series(dtype=int)
+        first_new = new_sessions.groupby("device_name")["start"].idxmin()
+
+        merged_rows, drop_new = [], []
+        for device, new_i in first_new.items():
+            if device not in tail_idx.index:
+                continue
+            old_i = tail_idx[device]
+            if new_sessions.at[new_i, "start"] <= old.at[old_i, "end"] + MAX_GAP:
+                a, b = old.loc[old_i], new_sessions.loc[new_i]
+                merged_rows.append((old_i, {
+                    "start": a["start"],
+                    "end": max(a["end"], b["end"]),
+                    "power_sum": a["mean_power_watts"] * a["readings"] + b["mean_power_watts"] * b["readings"],
+                    "energy_kwh": a["energy_kwh"] + b["energy_kwh"],
+                    "readings": a["readings"] + b["readings"],
+                }))
+                drop_new.append(new_i)
+
+        sessions = old.copy()
+        for old_i, row in merged_rows:
+            sessions.at[old_i, "end"] = row["end"]
+            sessions.at[old_i, "energy_kwh"] = row["energy_kwh"]
+            sessions.at[old_i, "readings"] = row["readings"]
+            sessions.at[old_i, "mean_power_watts"] = row["power_sum"] / row["readings"]
+            sessions.at[old_i, "duration_hours"] = (row["end"] - row["start"]).total_seconds() / 3600
+
+        self.sessions = pd.concat(
+            [sessions, new_sessions.drop(index=drop_new)], ignore_index=True
+        ).sort_values(["device_name", "start"]).reset_index(drop=True)
+
+    # ---------------- Queries ----------------
+    def device_sessions(self, device_name: str, since=None) -> pd.DataFrame:
+        s = self.sessions[self.sessions["device_name"] == device_name]
+        if since is not None:
+            s = s[s["end"] >= since]
+        return s.sort_values("start")
+
+    def latest_sessions(self, since=None) -> pd.DataFrame:
+        """Most recent session of every device (optionally still active after `since`)."""
+        s = self.sessions
+        if since is not None:
+            s = s[s["end"] >= since]
+        if s.empty:
+            return s
+        return s.loc[s.groupby("device_name")["end"].idxmax()]
+
+    def runtime_summary(self, since=None) -> dict:
+        """{device: {"hours", "sessions", "energy_kwh", "last_start", "last_end"}}"""
+        s = self.sessions
+        if since is not None:
+            s = s[s["end"] >= since]
+        if s.empty:
+            return {}
+        agg = s.groupby("device_name").agg(
+            hours=("duration_hours", "sum"),
+            sessions=("start", "size"),
+            energy_kwh=("energy_kwh", "sum"),
+            last_start=("start", "max"),
+            last_end=("end", "max"),
+        )
+        return {
+            device: {
+                "hours": round(float(row["hours"]), 2),
+                "sessions": int(row["sessions"]),
+                "energy_kwh": round(float(row["energy_kwh"]), 2),
+                "last_start": row["last_start"].isoformat(),
+                "last_end": row["last_end"].isoformat(),
+            }
+            for device, row in agg.iterrows()
+        }
+
+
+# -------------------------------------------------
+# Shared Index per Home
+# -------------------------------------------------
+def get_session_index(home_id=None) -> SessionIndex:
+    """
+    Index over a home's energy_usage.csv, kept in the home cache. It is
+    only rebuilt when the CSV changes; appended readings are indexed
+    incrementally, anything else rebuilds.
+    """
+    def build(index):
+        index = index or SessionIndex()
+        df = load_energy_data(home_id)
+        if index.is_append_of(df):
+            index.update(df)
+        else:
+            index.rebuild(df)
+        return index
+
+    return cached_aggregate("session_index", build, home_id)
+
+
+def sessions_to_records(sessions: pd.DataFrame, limit: Optional[int] = None) -> list:
+    if limit:
+        sessions = sessions.tail(limit)
+    return [
+        {
+            "device_name": row.device_name,
+            "start": row.start.isoformat(),
+            "end": row.end.isoformat(),
+            "duration_hours": round(float(row.duration_hours), 2),
+            "mean_power_watts": round(float(row.mean_power_watts), 1),
+            "energy_kwh": round(float(row.energy_kwh), 3),
+        }
+        for row in sessions.itertuples(index=False)
+    ]
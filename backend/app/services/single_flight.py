@@ -0,0 +1,118 @@
+"""
+Single-Flight Request Coalescing
+Identical requests that arrive while one is already being computed wait
+for that computation and share its result instead of starting their own.
+Keys are (endpoint, parameters, data version), so a refresh storm on
+/dashboard after a data update is one unit of work, not N.
+
+Nothing is cached: once the computation finishes the key is released and
+the next request computes again (results stay as fresh as before).
+Errors are shared too - every waiter of a failed flight gets the error.
+"""
+
+import asyncio
+import functools
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from app.services.data_loader import get_data_version
+
+
+def current_data_version(home_id=None):
+    try:
+        return get_data_version(home_id)
+    except OSError:
+        return None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}          # key -> concurrent Future (threadpool endpoints)
+        self._async_calls = {}    # key -> asyncio Task (async endpoints)
+        self._stats = defaultdict(lambda: {"calls": 0, "executions": 0})
+
+    def _count(self, key, leader: bool):
+        stats = self._stats[key[0]]
+        stats["calls"] += 1
+        if leader:
+            stats["executions"] += 1
+
+    # ---------------- Threads ----------------
+    def do(self, key, fn):
+        """Runs fn() once per key at a time; concurrent callers get the same result."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            self._count(key, leader)
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    # ---------------- Event Loop ----------------
+    async def do_async(self, key, coro_fn):
+        """Async variant; a waiter that is cancelled does not cancel the shared work."""
+        with self._lock:
+            task = self._async_calls.get(key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(coro_fn())
+                self._async_calls[key] = task
+                task.add_done_callback(functools.partial(self._finish_async, key))
+            self._count(key, leader)
+        return await asyncio.shield(task)
+
+    def _finish_async(self, key, task):
+        with self._lock:
+            if self._async_calls.get(key) is task:
+                del self._async_calls[key]
+        if not task.cancelled():
+            task.exception()   # retrieved here in case every waiter went away
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, s in self._stats.items():
+                coalesced = s["calls"] - s["executions"]
+                endpoints[endpoint] = {
+                    **s,
+                    "coalesced": coalesced,
+                    "coalescing_ratio": round(coalesced / s["calls"], 3) if s["calls"] else 0.0,
+                }
+            return {
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "endpoints": endpoints,
+            }
+
+
+flights = SingleFlight()
+
+
+def coalesced(endpoint: str):
+    """
+    Decorator for (sync) endpoints: concurrent calls with the same arguments
+    and data version share one execution. A `home_id` keyword argument
+    selects whose data version is used.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (endpoint, args, tuple(sorted(kwargs.items())), current_data_version(kwargs.get("home_id")))
+            return flights.do(key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
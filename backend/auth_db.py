@@ -1,7 +1,10 @@
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Database path - configurable for local development and hosted environments
 db_path_override = os.getenv("AUTH_DB_PATH", "").strip()
@@ -18,149 +21,233 @@ else:
 # Ensure the parent directory exists for whichever path is active.
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Connection pool / maintenance settings
+AUTH_DB_POOL_SIZE = int(os.getenv("AUTH_DB_POOL_SIZE", "8"))
+AUTH_DB_BUSY_TIMEOUT_MS = int(os.getenv("AUTH_DB_BUSY_TIMEOUT_MS", "5000"))
+OTP_PURGE_INTERVAL_SECONDS = float(os.getenv("OTP_PURGE_INTERVAL_SECONDS", "600"))
+
+# Home (data partition) assigned to new users
+DEFAULT_HOME_ID = os.getenv("DEFAULT_HOME_ID", "default")
+
+# -------------------------------------------------
+# Connection Pool (WAL: readers never block the single writer)
+# -------------------------------------------------
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",        # durable at checkpoints; safe with WAL
+    f"PRAGMA busy_timeout={AUTH_DB_BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",          # 8 MB page cache per connection
+)
+
+
+class ConnectionPool:
+    """
+    Up to `size` long-lived connections shared by all threads. A request
+    borrows one for the duration of a `with pool.connection()` block;
+    callers beyond `size` wait for a free connection.
+    """
+
+    def __init__(self, path: Path, size: int = AUTH_DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()     # most recently used first (warm page cache)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=AUTH_DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._created -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=AUTH_DB_BUSY_TIMEOUT_MS / 1000)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"No auth DB connection free within {AUTH_DB_BUSY_TIMEOUT_MS} ms")
+
+    @contextmanager
+    def connection(self):
+        """Borrowed connection; commits on success, rolls back on error."""
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                    self._created -= 1
+                except queue.Empty:
+                    break
+
+
+_pool = ConnectionPool(DB_PATH)
+
+
 def init_db():
     """Initialize SQLite database with users and OTP tables"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            created_at TEXT NOT NULL
-        )
-    """)
-    
-    # OTP table (for temporary OTP storage)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS otps (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT NOT NULL,
-            otp TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            used INTEGER DEFAULT 0
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    with _pool.connection() as conn:
+        # Users table (UNIQUE email doubles as the lookup index)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+
+        # Databases created before homes existed
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+        if "home_id" not in columns:
+            conn.execute("ALTER TABLE users ADD COLUMN home_id TEXT")
+
+        # OTP table (for temporary OTP storage)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS otps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                otp TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                expires_at TEXT NOT NULL,
+                used INTEGER DEFAULT 0
+            )
+        """)
+
+        # Latest OTP per email without sorting the table; expiry scan for the purge
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_otps_email_created ON otps(email, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_otps_expires ON otps(expires_at)")
+
     print("✅ Auth Database Initialized")
 
 def get_or_create_user(email: str):
     """Get existing user or create new one"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Check if user exists
-    cursor.execute("SELECT id, email FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
-    
-    if user:
-        conn.close()
-        return {"id": user[0], "email": user[1]}
-    
-    # Create new user
-    cursor.execute(
-        "INSERT INTO users (email, created_at) VALUES (?, ?)",
-        (email, datetime.utcnow().isoformat())
-    )
-    user_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
-    return {"id": user_id, "email": email}
+    with _pool.connection() as conn:
+        # Concurrent first logins of the same email create one row
+        conn.execute(
+            "INSERT OR IGNORE INTO users (email, created_at, home_id) VALUES (?, ?, ?)",
+            (email, datetime.utcnow().isoformat(), DEFAULT_HOME_ID)
+        )
+        user = conn.execute("SELECT id, email, home_id FROM users WHERE email = ?", (email,)).fetchone()
+
+    return {"id": user[0], "email": user[1], "home_id": user[2] or DEFAULT_HOME_ID}
+
+def get_user_home(email: str) -> str:
+    """Home (data partition) of a user; DEFAULT_HOME_ID if unknown or unassigned"""
+    with _pool.connection() as conn:
+        row = conn.execute("SELECT home_id FROM users WHERE email = ?", (email,)).fetchone()
+    return (row[0] if row else None) or DEFAULT_HOME_ID
 
 def store_otp(email: str, otp: str, expires_in_minutes: int = 10):
     """Store OTP with expiration"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    from datetime import timedelta
     created_at = datetime.utcnow()
     expires_at = created_at + timedelta(minutes=expires_in_minutes)
-    
-    cursor.execute(
-        "INSERT INTO otps (email, otp, created_at, expires_at) VALUES (?, ?, ?, ?)",
-        (email, otp, created_at.isoformat(), expires_at.isoformat())
-    )
-    
-    conn.commit()
-    conn.close()
+
+    with _pool.connection() as conn:
+        conn.execute(
+            "INSERT INTO otps (email, otp, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (email, otp, created_at.isoformat(), expires_at.isoformat())
+        )
 
 def verify_otp(email: str, otp: str) -> bool:
     """Verify OTP is valid and not expired"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        """
-        SELECT id, expires_at, used FROM otps 
-        WHERE email = ? AND otp = ? 
-        ORDER BY created_at DESC LIMIT 1
-        """,
-        (email, otp)
-    )
-    
-    result = cursor.fetchone()
-    
-    if not result:
-        conn.close()
-        return False
-    
-    otp_id, expires_at, used = result
-    
-    # Check if already used
-    if used:
-        conn.close()
-        return False
-    
-    # Check expiration
-    if datetime.fromisoformat(expires_at) < datetime.utcnow():
-        conn.close()
-        return False
-    
-    # Mark as used
-    cursor.execute("UPDATE otps SET used = 1 WHERE id = ?", (otp_id,))
-    conn.commit()
-    conn.close()
-    
-    return True
+    # Check-and-mark in one statement: two concurrent verifications of the
+    # same code cannot both succeed
+    with _pool.connection() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE otps SET used = 1
+            WHERE id = (
+                SELECT id FROM otps
+                WHERE email = ? AND otp = ?
+                ORDER BY created_at DESC LIMIT 1
+            )
+            AND used = 0 AND expires_at >= ?
+            """,
+            (email, otp, datetime.utcnow().isoformat())
+        )
+        return cursor.rowcount == 1
 
 def get_last_otp(email: str):
     """Retrieve the most recent OTP for the given email that is not used and not expired.
     Returns the OTP string or None if not found.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT otp, expires_at, used FROM otps
-        WHERE email = ?
-        ORDER BY created_at DESC LIMIT 1
-        """,
-        (email,)
-    )
-
-    row = cursor.fetchone()
+    with _pool.connection() as conn:
+        row = conn.execute(
+            """
+            SELECT otp, expires_at, used FROM otps
+            WHERE email = ?
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (email,)
+        ).fetchone()
+
     if not row:
-        conn.close()
         return None
 
     otp, expires_at, used = row
 
     # Validate not used and not expired
     if used:
-        conn.close()
         return None
     if datetime.fromisoformat(expires_at) < datetime.utcnow():
-        conn.close()
         return None
 
-    conn.close()
     return otp
 
+def purge_otps() -> int:
+    """Deletes used and expired OTPs; returns how many rows were removed."""
+    with _pool.connection() as conn:
+        cursor = conn.execute(
+            "DELETE FROM otps WHERE used = 1 OR expires_at < ?",
+            (datetime.utcnow().isoformat(),)
+        )
+        return cursor.rowcount
+
+# -------------------------------------------------
+# Periodic OTP Purge
+# -------------------------------------------------
+_purge_thread = None
+_purge_stop = threading.Event()
+
+def _purge_loop():
+    while not _purge_stop.wait(OTP_PURGE_INTERVAL_SECONDS):
+        try:
+            removed = purge_otps()
+            if removed:
+                print(f"🧹 Purged {removed} used/expired OTPs")
+        except Exception as e:
+            print(f"⚠️ OTP purge failed: {e}")
+
+def start_otp_purge():
+    global _purge_thread
+    if _purge_thread and _purge_thread.is_alive():
+        return
+    _purge_stop.clear()
+    _purge_thread = threading.Thread(target=_purge_loop, name="otp-purge", daemon=True)
+    _purge_thread.start()
+
+def stop_otp_purge():
+    _purge_stop.set()
+    if _purge_thread:
+        _purge_thread.join(timeout=5)
+
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,133 @@
+"""
+Auth DB login-burst benchmark.
+Simulates many users logging in at once (store OTP → verify OTP → get or
+create user) from a thread pool, against a throwaway database, and
+reports logins/s and per-login latency. `--legacy` runs the same burst
+with one fresh sqlite3 connection per statement and no indexes (the
+previous access pattern) for comparison.
+
+    python benchmarks/auth_login_burst_bench.py [--users 2000] [--threads 32] [--history 20000] [--legacy]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BASE_DIR.parent
+
+TMP_DIR = tempfile.mkdtemp(prefix="auth_bench_")
+os.environ["AUTH_DB_PATH"] = os.path.join(TMP_DIR, "auth.db")
+
+sys.path.append(str(PROJECT_ROOT))
+import auth_db
+
+
+# -------------------------------------------------
+# Previous access pattern (connection per call, no indexes)
+# -------------------------------------------------
+def _legacy_connect():
+    return sqlite3.connect(auth_db.DB_PATH, timeout=30)
+
+
+def legacy_store_otp(email, otp):
+    conn = _legacy_connect()
+    now = datetime.utcnow()
+    conn.execute(
+        "INSERT INTO otps (email, otp, created_at, expires_at) VALUES (?, ?, ?, ?)",
+        (email, otp, now.isoformat(), (now + timedelta(minutes=10)).isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_verify_otp(email, otp):
+    conn = _legacy_connect()
+    row = conn.execute(
+        "SELECT id, expires_at, used FROM otps WHERE email = ? AND otp = ? ORDER BY created_at DESC LIMIT 1",
+        (email, otp),
+    ).fetchone()
+    ok = bool(row) and not row[2] and datetime.fromisoformat(row[1]) >= datetime.utcnow()
+    if ok:
+        conn.execute("UPDATE otps SET used = 1 WHERE id = ?", (row[0],))
+        conn.commit()
+    conn.close()
+    return ok
+
+
+def legacy_get_or_create_user(email):
+    conn = _legacy_connect()
+    user = conn.execute("SELECT id, email FROM users WHERE email = ?", (email,)).fetchone()
+    if not user:
+        conn.execute("INSERT OR IGNORE INTO users (email, created_at) VALUES (?, ?)", (email, datetime.utcnow().isoformat()))
+        conn.commit()
+    conn.close()
+
+
+def setup(legacy: bool, history: int):
+    if legacy:
+        conn = _legacy_connect()
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL, created_at TEXT NOT NULL)")
+        conn.execute("CREATE TABLE otps (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT NOT NULL, otp TEXT NOT NULL, created_at TEXT NOT NULL, expires_at TEXT NOT NULL, used INTEGER DEFAULT 0)")
+        conn.commit()
+        conn.close()
+    else:
+        auth_db.init_db()
+
+    # Old OTP rows from earlier logins (what the table looks like without purging)
+    if history:
+        past = datetime.utcnow() - timedelta(days=1)
+        rows = [(f"old{i}@example.com", f"{i % 1000000:06d}", past.isoformat(), past.isoformat(), 1) for i in range(history)]
+        conn = _legacy_connect()
+        conn.executemany("INSERT INTO otps (email, otp, created_at, expires_at, used) VALUES (?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+
+def run(users: int, threads: int, history: int, legacy: bool):
+    setup(legacy, history)
+    store, verify, user = (
+        (legacy_store_otp, legacy_verify_otp, legacy_get_or_create_user) if legacy
+        else (auth_db.store_otp, auth_db.verify_otp, auth_db.get_or_create_user)
+    )
+
+    def login(i):
+        email, otp = f"user{i}@example.com", f"{i % 1000000:06d}"
+        started = time.perf_counter()
+        store(email, otp)
+        if not verify(email, otp):
+            raise RuntimeError(f"verification failed for {email}")
+        user(email)
+        return time.perf_counter() - started
+
+    print(f"🚀 Login burst: {users} users, {threads} threads, {history} old OTP rows, "
+          f"{'legacy connection-per-call' if legacy else f'pool of {auth_db.AUTH_DB_POOL_SIZE} (WAL)'}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(login, range(users)))
+    elapsed = time.perf_counter() - started
+
+    n = len(latencies)
+    print(f"📊 {n / elapsed:.0f} logins/s | p50 {latencies[n // 2] * 1000:.1f} ms | "
+          f"p99 {latencies[min(n - 1, int(n * 0.99))] * 1000:.1f} ms | total {elapsed:.2f}s")
+
+    if not legacy:
+        started = time.perf_counter()
+        removed = auth_db.purge_otps()
+        print(f"🧹 Purge removed {removed} used/expired OTPs in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auth DB login-burst benchmark")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--history", type=int, default=20000)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+    run(args.users, args.threads, args.history, args.legacy)
@@ -0,0 +1,62 @@
+"""
+Auth middleware overhead benchmark.
+Measures the cost of authenticating one request: a full JWT verification
+(cache miss, what every request would pay without the cache) against a
+lookup in the verified-token cache (cache hit), in microseconds.
+
+    python benchmarks/auth_middleware_bench.py [--requests 20000] [--users 500]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BASE_DIR.parent
+
+os.environ.setdefault("AUTH_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="auth_bench_"), "auth.db"))
+
+sys.path.append(str(PROJECT_ROOT))
+from app.services.auth_service import create_jwt_token, verify_jwt_token
+from app.services.auth_middleware import authenticate, claims_cache
+
+
+def _percentiles(samples_ns):
+    samples = sorted(samples_ns)
+    n = len(samples)
+    return samples[n // 2] / 1000, samples[min(n - 1, int(n * 0.99))] / 1000
+
+
+def run(requests: int, users: int):
+    tokens = [create_jwt_token(f"user{i}@example.com", "default") for i in range(users)]
+    print(f"🚀 Auth overhead: {requests} requests from {users} users")
+
+    verify_ns = []
+    for i in range(requests):
+        started = time.perf_counter_ns()
+        verify_jwt_token(tokens[i % users])
+        verify_ns.append(time.perf_counter_ns() - started)
+
+    for token in tokens:
+        authenticate(token)     # first request of each user verifies and caches
+    cached_ns = []
+    for i in range(requests):
+        started = time.perf_counter_ns()
+        authenticate(tokens[i % users])
+        cached_ns.append(time.perf_counter_ns() - started)
+
+    for label, samples in (("jwt verify per request", verify_ns), ("verified-token cache", cached_ns)):
+        p50, p99 = _percentiles(samples)
+        print(f"📊 {label:<24} p50 {p50:6.1f} µs | p99 {p99:6.1f} µs")
+    print(f"📊 Cache: {claims_cache.counters}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auth middleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+    run(args.requests, args.users)
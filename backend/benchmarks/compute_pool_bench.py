@@ -0,0 +1,70 @@
+"""
+Compute pool throughput benchmark.
+Runs the /dashboard workload (compute_dashboard_metrics + detect_anomalies)
+from N concurrent request threads, first inline in the threadpool (what
+the endpoints did before) and then through the compute pool, and reports
+requests per second plus the latency of a trivial call made meanwhile
+(what /health or auth sees while the CPU-bound requests run).
+
+    python benchmarks/compute_pool_bench.py [--requests 64] [--concurrency 8] [--workers 4]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BASE_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+
+def _probe_latency(stop: threading.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        time.sleep(0.001)       # needs the GIL back to return, like any light request
+        samples.append((time.perf_counter() - started - 0.001) * 1000)
+
+
+def _measure(label: str, call, requests: int, concurrency: int):
+    stop, probe = threading.Event(), []
+    prober = threading.Thread(target=_probe_latency, args=(stop, probe), daemon=True)
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(lambda _: call(), range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    probe.sort()
+    p99 = probe[min(len(probe) - 1, int(len(probe) * 0.99))]
+    print(f"📊 {label:<8} {requests / elapsed:7.1f} req/s | light-request delay p99 {p99:7.1f} ms")
+
+
+def run(requests: int, concurrency: int, workers: int):
+    os.environ["COMPUTE_POOL_WORKERS"] = str(workers)
+    os.environ["COMPUTE_POOL_MAX_PENDING"] = str(max(requests, workers))
+    from app.services.compute_pool import compute_pool, offload, _resolve
+
+    metrics, anomalies = _resolve("compute_dashboard_metrics"), _resolve("detect_anomalies")
+    metrics(), anomalies()      # warm: models + data loaded in this process
+
+    print(f"🚀 Dashboard workload: {requests} requests, {concurrency} concurrent, {workers} pool workers")
+    _measure("inline", lambda: (metrics(), anomalies()), requests, concurrency)
+
+    compute_pool.start()
+    offload("compute_dashboard_metrics")        # wait for warm workers
+    _measure("pool", lambda: (offload("compute_dashboard_metrics"), offload("detect_anomalies")), requests, concurrency)
+    compute_pool.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute pool throughput benchmark")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency, args.workers)
@@ -0,0 +1,67 @@
+"""
+Intent router benchmark.
+Replays benchmarks/chat_queries.tsv through the compiled intent router and
+reports match latency, how many queries the local fast-path answers vs.
+the LLM, and any query whose intent differs from its label.
+
+    python benchmarks/intent_router_bench.py [repeats]
+"""
+
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BASE_DIR.parent
+QUERIES_PATH = BASE_DIR / "chat_queries.tsv"
+
+sys.path.append(str(PROJECT_ROOT))
+from app.services.intent_router import match_intent
+
+
+def load_queries():
+    rows = []
+    for line in QUERIES_PATH.read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        query, expected = line.rsplit("\t", 1)
+        rows.append((query, expected.strip()))
+    return rows
+
+
+def run(repeats: int = 2000):
+    rows = load_queries()
+    print(f"🚀 Intent router benchmark: {len(rows)} queries x {repeats} repeats")
+
+    # Latency (per query, averaged over repeats)
+    per_query_us = []
+    for query, _ in rows:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            match_intent(query)
+        per_query_us.append((time.perf_counter() - start) / repeats * 1e6)
+    per_query_us.sort()
+
+    # Routing quality
+    routed = Counter()
+    mismatches = []
+    for query, expected in rows:
+        match = match_intent(query)
+        intent = match.intent if match else "llm"
+        routed["local" if match else "llm"] += 1
+        if intent != expected:
+            mismatches.append((query, expected, intent))
+
+    n = len(per_query_us)
+    print(f"📊 Match latency: mean {sum(per_query_us) / n:.1f} µs | "
+          f"p50 {per_query_us[n // 2]:.1f} µs | p99 {per_query_us[min(n - 1, int(n * 0.99))]:.1f} µs")
+    print(f"📊 Local fast-path: {routed['local']}/{len(rows)} ({routed['local'] / len(rows):.0%}) | "
+          f"LLM: {routed['llm']}/{len(rows)}")
+    print(f"📊 Agreement with labels: {len(rows) - len(mismatches)}/{len(rows)}")
+    for query, expected, intent in mismatches:
+        print(f"   ⚠️ {query!r}: expected {expected}, routed {intent}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
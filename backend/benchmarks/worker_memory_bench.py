@@ -0,0 +1,117 @@
+"""
+Per-worker memory benchmark for the shared dataset snapshot.
+Starts N worker processes that each load one (synthetic, large) home the
+way the API does, then reports each worker's proportional (Pss) and
+private memory from /proc/self/smaps_rollup - with DATA_SNAPSHOT_ENABLED
+(workers map one shared snapshot) and without (each parses the CSV).
+
+    python benchmarks/worker_memory_bench.py [--workers 4] [--rows 2000000]
+
+Linux only (smaps_rollup).
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BASE_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+HOME_ID = "bench"
+DEVICES = ["Residential Cooling (AC)", "Refrigerator", "Washing Machine", "Lighting", "Electronics"]
+
+
+def _write_dataset(homes_dir: Path, rows: int):
+    rng = np.random.default_rng(0)
+    device = rng.integers(0, len(DEVICES), rows)
+    power = rng.uniform(5, 2500, rows).round(1)
+    duration = rng.integers(1, 120, rows)
+    df = pd.DataFrame({
+        "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, rows)), unit="s"),
+        "device_name": np.array(DEVICES)[device],
+        "device_type": np.array(["appliance", "always_on", "appliance", "lighting", "electronics"])[device],
+        "power_watts": power,
+        "duration_minutes": duration,
+        "energy_kwh": (power * duration / 60000).round(4),
+    })
+    path = homes_dir / HOME_ID / "energy_usage.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+
+
+def _memory_kb() -> dict:
+    fields = {}
+    for line in Path("/proc/self/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])
+    return {"pss": fields["Pss"], "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def _worker(ready, done, results):
+    from app.services.data_loader import home_cache, load_daily_rollup
+
+    before = _memory_kb()
+    home_cache.frame(HOME_ID)
+    load_daily_rollup(HOME_ID)
+    ready.wait()            # measure once every worker holds the data
+    after = _memory_kb()
+    results.put({k: after[k] - before[k] for k in after})
+    done.wait()
+
+
+def _measure(workers: int) -> list:
+    ctx = mp.get_context("spawn")
+    ready, done = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(ready, done, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    samples = [results.get() for _ in procs]
+    done.wait()
+    for p in procs:
+        p.join()
+    return samples
+
+
+def run(workers: int, rows: int, mode: str = None):
+    if mode is not None:
+        samples = _measure(workers)
+        pss = sum(s["pss"] for s in samples) / len(samples) / 1024
+        private = sum(s["private"] for s in samples) / len(samples) / 1024
+        print(f"📊 {mode:<10} dataset per worker: Pss {pss:7.1f} MB | private {private:7.1f} MB")
+        return
+
+    work_dir = Path(tempfile.mkdtemp(prefix="worker_mem_bench_"))
+    _write_dataset(work_dir / "homes", rows)
+    print(f"🚀 Worker memory: {workers} workers, {rows} rows")
+    for label, enabled in (("csv", "false"), ("snapshot", "true")):
+        env = {
+            **os.environ,
+            "HOMES_DATA_DIR": str(work_dir / "homes"),
+            "DATA_SNAPSHOT_DIR": str(work_dir / "snapshots"),
+            "DATA_SNAPSHOT_ENABLED": enabled,
+            "HOME_CACHE_MAX_MB": "4096",
+        }
+        # Separate interpreter per mode: the settings are read at import time
+        subprocess.run(
+            [sys.executable, __file__, "--workers", str(workers), "--rows", str(rows), "--mode", label],
+            env=env, cwd=PROJECT_ROOT, check=True,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-worker dataset memory benchmark")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--mode", choices=["csv", "snapshot"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    run(args.workers, args.rows, args.mode)
@@ -0,0 +1,32 @@
+"""
+Test settings. Configuration is read from the environment at import time,
+so it is set here before any app module is imported: no auth, no rate
+limits, no background schedulers, compute inline, and every database in a
+temporary directory.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp = Path(tempfile.mkdtemp(prefix="enverse-tests-"))
+
+os.environ.update({
+    "AUTH_REQUIRED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "COMPUTE_POOL_ENABLED": "false",
+    "ALERT_SCHEDULER_ENABLED": "false",
+    "CHAT_CACHE_ENABLED": "false",
+    "CHAT_SESSION_BACKEND": "memory",
+    "AUTH_DB_PATH": str(_tmp / "auth.db"),
+    "ALERT_DB_PATH": str(_tmp / "alerts.db"),
+    "CHAT_SESSION_DB_PATH": str(_tmp / "chat_sessions.db"),
+    "DATA_SNAPSHOT_DIR": str(_tmp / "snapshots"),
+    "DEVICE_PROFILE_PATH": str(_tmp / "device_profiles.json"),
+    "SENDGRID_API_KEY": "",
+})
@@ -0,0 +1,58 @@
+"""Token authentication in the ASGI middleware."""
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import auth_middleware
+from app.services.auth_service import JWT_SECRET, JWT_ALGORITHM, create_jwt_token
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def cached_identity(token: str):
+    return auth_middleware.claims_cache._entries.get(hashlib.sha256(token.encode()).digest())
+
+
+def legacy_token(email: str) -> str:
+    """A token issued before homes were assigned: no home_id claim."""
+    payload = {"email": email, "exp": datetime.utcnow() + timedelta(hours=1), "iat": datetime.utcnow()}
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def test_home_lookup_for_legacy_token_runs_off_the_event_loop(client, monkeypatch):
+    lookups = []
+
+    def stored_home(email):
+        try:
+            asyncio.get_running_loop()
+            lookups.append("event loop")
+        except RuntimeError:
+            lookups.append("thread")
+        return "home-b"
+
+    monkeypatch.setattr(auth_middleware, "_stored_home", stored_home)
+    token = legacy_token("legacy@example.com")
+    for _ in range(2):
+        response = client.get("/api/rate-limits", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+    assert lookups == ["thread"]         # once, then served from the claims cache
+    assert cached_identity(token)["home_id"] == "home-b"
+
+
+def test_token_with_home_needs_no_lookup(client, monkeypatch):
+    monkeypatch.setattr(auth_middleware, "_stored_home", lambda email: pytest.fail("unexpected DB lookup"))
+    token = create_jwt_token("current@example.com", "home-a")
+    response = client.get("/api/rate-limits", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert cached_identity(token)["home_id"] == "home-a"
@@ -0,0 +1,334 @@
+"""
+Async chat path against a local stub of the Groq chat-completions API
+(GROQ_BASE_URL points at it): hedging, circuit breakers, the turn
+deadline and single-flight coalescing, driven through /chat and
+/chat/stream.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+QUESTION = "Could you explain how solar panels would change things for me?"
+LOCAL_SUMMARY = "I'm currently answering using system data."
+
+
+# -------------------------------------------------
+# Groq Stub
+# -------------------------------------------------
+class GroqStub:
+    """POST */chat/completions; per-model delay and HTTP status, plain or streamed replies."""
+
+    def __init__(self):
+        self.behaviour = {}
+        self.calls = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.behaviour.clear()
+            self.calls.clear()
+
+    def configure(self, model: str, delay: float = 0.0, status: int = 200):
+        self.behaviour[model] = {"delay": delay, "status": status}
+
+    def calls_to(self, model: str) -> int:
+        with self._lock:
+            return sum(1 for name, _ in self.calls if name == model)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                model, stream = body["model"], bool(body.get("stream"))
+                with stub._lock:
+                    stub.calls.append((model, stream))
+                behaviour = stub.behaviour.get(model, {"delay": 0.0, "status": 200})
+                time.sleep(behaviour["delay"])
+                try:
+                    if behaviour["status"] != 200:
+                        self._json(behaviour["status"], {"error": {"message": "stub failure", "type": "server_error"}})
+                    elif stream:
+                        self._stream(model)
+                    else:
+                        self._json(200, completion(model))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass     # the client gave up on this call (hedge won / deadline)
+
+            def _json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for word in reply(model).split(" "):
+                    self.wfile.write(f"data: {json.dumps(chunk(model, word + ' '))}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+def reply(model: str) -> str:
+    return f"Answer from {model}"
+
+
+def completion(model: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply(model)}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def chunk(model: str, text: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+    }
+
+
+# -------------------------------------------------
+# Fixtures
+# -------------------------------------------------
+@pytest.fixture(scope="module")
+def groq_stub():
+    stub = GroqStub()
+    stub.start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def llm(groq_stub, monkeypatch):
+    """llm_service talking to the stub, with a fresh router (breakers, latency stats)."""
+    monkeypatch.setenv("GROQ_API_KEY", "stub-key")
+    monkeypatch.setenv("GROQ_BASE_URL", groq_stub.base_url)
+    from app.services import llm_service, llm_router
+    from app.services.knowledge_base import get_live_metrics_versioned
+
+    monkeypatch.setattr(llm_service, "API_KEY", "stub-key")
+    monkeypatch.setattr(llm_service, "GROQ_BASE_URL", groq_stub.base_url)
+    monkeypatch.setattr(llm_service, "_async_client", None)
+    monkeypatch.setattr(llm_service, "_router", llm_router.LLMRouter([llm_service.GROQ_MODEL, llm_service.GROQ_FALLBACK_MODEL]))
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_DEFAULT_SECONDS", 10.0)
+    get_live_metrics_versioned()       # warm: keep data loading out of the timings
+    groq_stub.reset()
+    return llm_service
+
+
+@pytest.fixture
+def client(llm):
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def ask(client, message=QUESTION, session_id="s1") -> str:
+    response = client.post("/chat", json={"message": message, "session_id": session_id})
+    assert response.status_code == 200
+    return response.json()["answer"]
+
+
+def ask_stream(client, message=QUESTION, session_id="s1"):
+    """(token texts, done payload) of one /chat/stream call."""
+    events = []
+    with client.stream("POST", "/chat/stream", json={"message": message, "session_id": session_id}) as response:
+        assert response.status_code == 200
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event = line.split(":", 1)[1].strip()
+            elif line.startswith("data:"):
+                events.append((event, json.loads(line.split(":", 1)[1])))
+    tokens = [payload["text"] for event, payload in events if event == "token"]
+    done = [payload for event, payload in events if event == "done"]
+    assert len(done) == 1
+    return tokens, done[0]
+
+
+def router_state(client, model: str) -> str:
+    return client.get("/api/chat/router").json()["models"][model]["state"]
+
+
+# -------------------------------------------------
+# Hedging
+# -------------------------------------------------
+def test_slow_primary_is_hedged_to_fallback(client, llm, groq_stub, monkeypatch):
+    from app.services import llm_router
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_DEFAULT_SECONDS", 0.3)
+    groq_stub.configure(llm.GROQ_MODEL, delay=3.0)
+
+    started = time.monotonic()
+    answer = ask(client)
+    elapsed = time.monotonic() - started
+
+    assert answer == reply(llm.GROQ_FALLBACK_MODEL)
+    assert elapsed < 2.0
+    assert groq_stub.calls_to(llm.GROQ_MODEL) == 1
+    stats = client.get("/api/chat/router").json()
+    assert stats["hedges_fired"] == 1
+    assert stats["hedges_won"] == 1
+
+
+def test_fast_primary_is_not_hedged(client, llm, groq_stub):
+    assert ask(client) == reply(llm.GROQ_MODEL)
+    assert groq_stub.calls_to(llm.GROQ_FALLBACK_MODEL) == 0
+    assert client.get("/api/chat/router").json()["hedges_fired"] == 0
+
+
+# -------------------------------------------------
+# Circuit Breakers
+# -------------------------------------------------
+def test_breaker_opens_and_half_open_probe_closes_it(client, llm, groq_stub, monkeypatch):
+    from app.services import llm_router
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_MIN_CALLS", 2)
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_COOLDOWN_SECONDS", 0.5)
+    primary, fallback = llm.GROQ_MODEL, llm.GROQ_FALLBACK_MODEL
+    groq_stub.configure(primary, status=500)
+
+    # Failures move on to the fallback at once; the second one opens the circuit
+    for i in range(2):
+        assert ask(client, session_id=f"fail-{i}") == reply(fallback)
+    assert router_state(client, primary) == "open"
+
+    # Open: the primary is not called at all
+    assert ask(client, session_id="open") == reply(fallback)
+    assert groq_stub.calls_to(primary) == 2
+
+    # After the cooldown exactly one request probes the primary (half-open)
+    time.sleep(0.6)
+    groq_stub.configure(primary, delay=1.0)
+    with ThreadPoolExecutor(1) as executor:
+        probe = executor.submit(ask, client, QUESTION, "probe")
+        deadline = time.monotonic() + 3
+        while router_state(client, primary) != "half_open" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert router_state(client, primary) == "half_open"
+        assert ask(client, "Give me three tips to cut waste", "during-probe") == reply(fallback)
+        assert probe.result() == reply(primary)
+
+    assert router_state(client, primary) == "closed"
+    assert groq_stub.calls_to(primary) == 3
+
+
+def test_failed_half_open_probe_reopens_the_circuit(client, llm, groq_stub, monkeypatch):
+    from app.services import llm_router
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_MIN_CALLS", 2)
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_COOLDOWN_SECONDS", 0.5)
+    primary = llm.GROQ_MODEL
+    groq_stub.configure(primary, status=500)
+    for i in range(2):
+        ask(client, session_id=f"fail-{i}")
+
+    time.sleep(0.6)
+    ask(client, session_id="probe")
+    assert groq_stub.calls_to(primary) == 3
+    assert router_state(client, primary) == "open"
+
+
+def test_stream_falls_back_and_respects_open_circuit(client, llm, groq_stub, monkeypatch):
+    from app.services import llm_router
+    monkeypatch.setattr(llm_router, "LLM_BREAKER_MIN_CALLS", 2)
+    primary, fallback = llm.GROQ_MODEL, llm.GROQ_FALLBACK_MODEL
+    groq_stub.configure(primary, status=500)
+
+    for i in range(3):
+        tokens, done = ask_stream(client, session_id=f"stream-{i}")
+        assert done["source"] == fallback
+        assert "".join(tokens) == done["answer"] == reply(fallback) + " "
+        assert len(tokens) > 1       # streamed token by token, not one chunk
+    assert groq_stub.calls_to(primary) == 2
+    assert router_state(client, primary) == "open"
+
+
+# -------------------------------------------------
+# Turn Deadline
+# -------------------------------------------------
+def test_chat_deadline_answers_locally(client, llm, groq_stub, monkeypatch):
+    monkeypatch.setattr(llm, "CHAT_DEADLINE_SECONDS", 0.5)
+    groq_stub.configure(llm.GROQ_MODEL, delay=3.0)
+    groq_stub.configure(llm.GROQ_FALLBACK_MODEL, delay=3.0)
+
+    started = time.monotonic()
+    answer = ask(client)
+    assert time.monotonic() - started < 2.0
+    assert answer.startswith(LOCAL_SUMMARY)
+
+
+def test_stream_deadline_answers_locally(client, llm, groq_stub, monkeypatch):
+    monkeypatch.setattr(llm, "CHAT_DEADLINE_SECONDS", 0.5)
+    groq_stub.configure(llm.GROQ_MODEL, delay=3.0)
+    groq_stub.configure(llm.GROQ_FALLBACK_MODEL, delay=3.0)
+
+    started = time.monotonic()
+    tokens, done = ask_stream(client)
+    assert time.monotonic() - started < 2.0
+    assert done["source"] == "local"
+    assert done["answer"].startswith(LOCAL_SUMMARY)
+
+
+# -------------------------------------------------
+# Single-Flight
+# -------------------------------------------------
+def test_identical_concurrent_questions_share_one_call(client, llm, groq_stub):
+    from app.services.single_flight import flights
+    groq_stub.configure(llm.GROQ_MODEL, delay=1.0)
+    before = flights.stats()["endpoints"].get("chat", {"calls": 0, "executions": 0})
+
+    with ThreadPoolExecutor(5) as executor:
+        answers = list(executor.map(lambda i: ask(client, session_id=f"user-{i}"), range(5)))
+
+    assert answers == [reply(llm.GROQ_MODEL)] * 5
+    assert groq_stub.calls_to(llm.GROQ_MODEL) == 1
+    after = flights.stats()["endpoints"]["chat"]
+    assert after["calls"] - before["calls"] == 5
+    assert after["executions"] - before["executions"] == 1
+
+
+def test_different_questions_are_not_coalesced(client, llm, groq_stub):
+    groq_stub.configure(llm.GROQ_MODEL, delay=0.5)
+    questions = [QUESTION, "Give me three tips to cut waste"]
+    with ThreadPoolExecutor(2) as executor:
+        list(executor.map(lambda q: ask(client, q, session_id=q), questions))
+    assert groq_stub.calls_to(llm.GROQ_MODEL) == 2
@@ -0,0 +1,44 @@
+"""Per-home device profile sketches."""
+
+import json
+import shutil
+
+import pytest
+
+from app.services import data_loader
+from app.services.device_profiles import (
+    DeviceProfiles, get_device_profiles, merge_profiles, profile_path, save_profiles,
+)
+
+
+@pytest.fixture
+def home_b(tmp_path, monkeypatch):
+    """A second home with a copy of the default dataset."""
+    monkeypatch.setattr(data_loader, "HOMES_DIR", tmp_path / "homes")
+    (tmp_path / "homes" / "home_b").mkdir(parents=True)
+    shutil.copy(data_loader.DATA_PATH, tmp_path / "homes" / "home_b" / "energy_usage.csv")
+    return "home_b"
+
+
+def test_sketches_are_keyed_by_their_own_home(home_b):
+    profiles = get_device_profiles(home_b)
+    assert profiles.home == home_b
+    assert list(profiles.summary()) == [home_b]
+
+    device = next(iter(profiles.summary()[home_b]))
+    assert profiles.percentile(device, "power_watts", 0.5) is not None    # looked up under home_b
+
+
+def test_merged_profiles_keep_each_home(home_b):
+    merged = merge_profiles(get_device_profiles(), get_device_profiles(home_b))
+    assert sorted(merged.summary()) == sorted([data_loader.DEFAULT_HOME_ID, home_b])
+
+
+def test_profiles_saved_under_the_wrong_home_are_rebuilt(home_b):
+    stale = DeviceProfiles()                        # the default home's key
+    stale.add_readings(data_loader.load_energy_data(home_b))
+    save_profiles(stale, profile_path(home_b))
+
+    profiles = get_device_profiles(home_b)
+    assert list(profiles.summary()) == [home_b]
+    assert json.loads(profile_path(home_b).read_text())["home"] == home_b
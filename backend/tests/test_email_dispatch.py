@@ -0,0 +1,312 @@
+"""
+OTP email dispatch against a local SMTP stub (SMTP_FALLBACK_ENABLED=true,
+SMTP_STARTTLS=false, SMTP_AUTH=false): delivery before the OTP is stored,
+retries with jitter on transient 4xx replies, /auth/otp-status polling
+and the bounded queue.
+"""
+
+import email
+import re
+import socketserver
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+RECIPIENT = "user@example.com"
+OTP_IN_HTML = re.compile(r">(\d{6})<")
+
+
+# -------------------------------------------------
+# SMTP Stub
+# -------------------------------------------------
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """
+    Just enough SMTP for smtplib.sendmail. `transient_failures` MAIL
+    commands are answered 451 (try again later); `permanent_failure`
+    answers every MAIL with 550. Sessions wait for `gate` before the
+    greeting, so a test can hold a delivery in flight.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPSession)
+        self.messages = []            # (recipient, raw message)
+        self.mail_commands = 0
+        self.transient_failures = 0
+        self.permanent_failure = False
+        self.gate = threading.Event()
+        self.gate.set()
+        self.lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def mail_reply(self) -> bytes:
+        with self.lock:
+            self.mail_commands += 1
+            if self.permanent_failure:
+                return b"550 5.7.1 Rejected\r\n"
+            if self.transient_failures > 0:
+                self.transient_failures -= 1
+                return b"451 4.3.0 Try again later\r\n"
+        return b"250 OK\r\n"
+
+    def otp_sent_to(self, recipient: str):
+        """The code in the last message delivered to `recipient`, else None."""
+        with self.lock:
+            raw = [m for to, m in self.messages if to == recipient]
+        if not raw:
+            return None
+        for part in email.message_from_bytes(raw[-1]).walk():
+            if part.get_content_type() == "text/html":
+                match = OTP_IN_HTML.search(part.get_payload(decode=True).decode())
+                return match.group(1) if match else None
+        return None
+
+
+class SMTPSession(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.gate.wait(10)
+        self.wfile.write(b"220 stub ESMTP\r\n")
+        recipient = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250 stub\r\n")
+            elif command.startswith("MAIL FROM"):
+                self.wfile.write(self.server.mail_reply())
+            elif command.startswith("RCPT TO"):
+                recipient = line.decode().split(":", 1)[1].strip().strip("<>").lower()
+                self.wfile.write(b"250 OK\r\n")
+            elif command == "DATA":
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                body = []
+                for data_line in iter(self.rfile.readline, b""):
+                    if data_line == b".\r\n":
+                        break
+                    body.append(data_line)
+                with self.server.lock:
+                    self.server.messages.append((recipient, b"".join(body)))
+                self.wfile.write(b"250 Queued\r\n")
+            elif command == "QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:   # RSET, NOOP
+                self.wfile.write(b"250 OK\r\n")
+
+
+# -------------------------------------------------
+# Fixtures
+# -------------------------------------------------
+@pytest.fixture
+def smtp_stub(monkeypatch):
+    stub = SMTPStub()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("SMTP_FALLBACK_ENABLED", "true")
+    monkeypatch.setenv("SMTP_STARTTLS", "false")
+    monkeypatch.setenv("SMTP_AUTH", "false")
+    monkeypatch.setenv("SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(stub.port))
+    monkeypatch.setenv("SMTP_SENDER", "noreply@enverse.local")
+    monkeypatch.delenv("SENDGRID_API_KEY", raising=False)
+    yield stub
+    stub.gate.set()
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture
+def dispatch(monkeypatch):
+    """email_dispatch with fast retries."""
+    from app.services import email_dispatch
+    monkeypatch.setattr(email_dispatch, "EMAIL_RETRY_BASE_SECONDS", 0.05)
+    monkeypatch.setattr(email_dispatch, "EMAIL_RETRY_MAX_SECONDS", 0.2)
+    monkeypatch.setattr(email_dispatch, "EMAIL_MAX_ATTEMPTS", 3)
+    return email_dispatch
+
+
+@pytest.fixture
+def retry_delays(dispatch, monkeypatch):
+    """(attempt, delay) of every backoff the dispatcher picks."""
+    delays = []
+    original = dispatch.retry_delay
+
+    def recording_delay(attempt):
+        delay = original(attempt)
+        delays.append((attempt, delay))
+        return delay
+
+    monkeypatch.setattr(dispatch, "retry_delay", recording_delay)
+    return delays
+
+
+@pytest.fixture
+def client(smtp_stub, dispatch, monkeypatch):
+    from app import main
+    # A dispatcher per test: counters, statuses and queue start empty. One
+    # worker, so a second job stays queued while the first is being sent.
+    monkeypatch.setattr(main, "email_dispatcher", dispatch.EmailDispatcher(workers=1, max_queue=10))
+    with TestClient(main.app) as test_client:
+        yield test_client
+    main.email_dispatcher.stop()
+
+
+def send_otp(client, recipient=RECIPIENT) -> dict:
+    response = client.post("/auth/send-otp", json={"email": recipient})
+    assert response.status_code == 200
+    return response.json()
+
+
+def wait_for_status(client, job_id: str, wanted, timeout: float = 10.0) -> list:
+    """Statuses seen while polling /auth/otp-status until one of `wanted`."""
+    seen = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/auth/otp-status/{job_id}").json()["status"]
+        if not seen or seen[-1] != status:
+            seen.append(status)
+        if status in wanted:
+            return seen
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {wanted}: {seen}")
+
+
+def stored_otp(recipient=RECIPIENT):
+    from auth_db import get_last_otp
+    return get_last_otp(recipient)
+
+
+# -------------------------------------------------
+# Delivery
+# -------------------------------------------------
+def test_otp_is_stored_only_after_delivery(client, smtp_stub):
+    recipient = "first-login@example.com"
+    smtp_stub.gate.clear()                   # hold the SMTP session
+    body = send_otp(client, recipient)
+    assert body["success"] is True
+    assert body["status"] == "queued"
+
+    wait_for_status(client, body["job_id"], {"sending"})
+    assert stored_otp(recipient) is None     # not delivered yet: nothing to verify against
+
+    smtp_stub.gate.set()
+    wait_for_status(client, body["job_id"], {"sent"})
+    otp = smtp_stub.otp_sent_to(recipient)
+    assert otp is not None
+    assert stored_otp(recipient) == otp
+
+    verified = client.post("/auth/verify-otp", json={"email": recipient, "otp": otp}).json()
+    assert verified["success"] is True
+
+
+def test_status_goes_from_queued_to_sent(client, smtp_stub):
+    smtp_stub.gate.clear()
+    first = send_otp(client, "busy@example.com")
+    wait_for_status(client, first["job_id"], {"sending"})
+
+    # The only worker is busy: the second job waits in the queue
+    second = send_otp(client, "waiting@example.com")
+    assert client.get(f"/auth/otp-status/{second['job_id']}").json()["status"] == "queued"
+
+    smtp_stub.gate.set()
+    seen = wait_for_status(client, second["job_id"], {"sent", "failed"})
+    assert seen[0] == "queued"
+    assert seen[-1] == "sent"
+    status = client.get(f"/auth/otp-status/{second['job_id']}").json()
+    assert status["attempts"] == 1
+    assert status["provider"] == "smtp"
+
+
+def test_unknown_job_id_is_404(client):
+    assert client.get("/auth/otp-status/not-a-job").status_code == 404
+
+
+# -------------------------------------------------
+# Retries
+# -------------------------------------------------
+def test_transient_4xx_is_retried_with_jitter(client, smtp_stub, dispatch, retry_delays):
+    recipient = "retry@example.com"
+    smtp_stub.transient_failures = 2
+    body = send_otp(client, recipient)
+
+    seen = wait_for_status(client, body["job_id"], {"sent", "failed"})
+    assert "retrying" in seen
+    assert seen[-1] == "sent"
+    assert smtp_stub.mail_commands == 3
+    assert client.get(f"/auth/otp-status/{body['job_id']}").json()["attempts"] == 3
+    assert stored_otp(recipient) == smtp_stub.otp_sent_to(recipient)
+
+    # Full jitter: each backoff is drawn from [0, base * 2^(attempt-1)]
+    assert [attempt for attempt, _ in retry_delays] == [1, 2]
+    for attempt, delay in retry_delays:
+        assert 0 <= delay <= dispatch.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+
+
+def test_retry_delay_is_jittered_and_capped(dispatch):
+    samples = [dispatch.retry_delay(10) for _ in range(200)]
+    assert all(0 <= s <= dispatch.EMAIL_RETRY_MAX_SECONDS for s in samples)
+    assert len(set(samples)) > 100          # spread out, not one fixed backoff
+
+
+def test_delivery_fails_after_max_attempts_without_storing_otp(client, smtp_stub, dispatch):
+    recipient = "rejected@example.com"
+    smtp_stub.permanent_failure = True
+    body = send_otp(client, recipient)
+
+    seen = wait_for_status(client, body["job_id"], {"sent", "failed"})
+    assert seen[-1] == "failed"
+    assert smtp_stub.mail_commands == dispatch.EMAIL_MAX_ATTEMPTS
+    assert stored_otp(recipient) is None
+
+
+# -------------------------------------------------
+# Bounded Queue
+# -------------------------------------------------
+def test_full_queue_raises_email_queue_full(smtp_stub, dispatch):
+    dispatcher = dispatch.EmailDispatcher(workers=0, max_queue=2)   # nothing drains the queue
+    try:
+        dispatcher.enqueue_otp("a@example.com", "111111")
+        dispatcher.enqueue_otp("b@example.com", "222222")
+        with pytest.raises(dispatch.EmailQueueFull):
+            dispatcher.enqueue_otp("c@example.com", "333333")
+        assert dispatcher.stats()["rejected"] == 1
+        assert dispatcher.stats()["queued"] == 2
+    finally:
+        dispatcher.stop()
+
+
+def test_full_queue_is_reported_by_send_otp(client, dispatch, monkeypatch):
+    from app import main
+    monkeypatch.setattr(main, "email_dispatcher", dispatch.EmailDispatcher(workers=0, max_queue=1))
+    assert send_otp(client, "one@example.com")["success"] is True
+
+    body = send_otp(client, "two@example.com")
+    assert body["success"] is False
+    assert "job_id" not in body
+
+
+def test_full_queue_does_not_use_up_recipient_allowance(client, dispatch, monkeypatch):
+    from app import main
+    from app.services import rate_limiter
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limiter, "buckets", rate_limiter.TokenBuckets())
+    working = main.email_dispatcher
+    full = dispatch.EmailDispatcher(workers=0, max_queue=1)
+    full.enqueue_otp("someone-else@example.com", "000000")
+    monkeypatch.setattr(main, "email_dispatcher", full)
+
+    recipient = "unlucky@example.com"
+    for _ in range(3):          # the per-recipient allowance is 3 codes
+        assert send_otp(client, recipient)["success"] is False
+
+    monkeypatch.setattr(main, "email_dispatcher", working)
+    assert send_otp(client, recipient)["success"] is True
+    full.stop()
@@ -0,0 +1,45 @@
+"""Training-run history queries."""
+
+import json
+
+import pytest
+
+from app.ml import metrics
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    path = tmp_path / "metrics_history.jsonl"
+    runs = [
+        {"model": "XGBoost Forecast", "timestamp": "2026-10-17 23:59:59"},
+        {"model": "XGBoost Forecast", "timestamp": "2026-10-18 09:00:00"},
+        {"model": "Isolation Forest", "timestamp": "2026-10-18 18:30:00"},
+        {"model": "XGBoost Forecast", "timestamp": "2026-10-19 00:00:00"},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in runs))
+    monkeypatch.setattr(metrics, "METRICS_HISTORY_FILE", path)
+    return runs
+
+
+def stamps(runs):
+    return [r["timestamp"] for r in runs]
+
+
+def test_date_only_until_includes_that_whole_day(history):
+    runs = metrics.query_metrics_history(since="2026-10-18", until="2026-10-18")
+    assert stamps(runs) == ["2026-10-18 18:30:00", "2026-10-18 09:00:00"]
+
+
+def test_datetime_bounds_are_compared_as_times(history):
+    runs = metrics.query_metrics_history(since="2026-10-18T09:00:00", until="2026-10-18 12:00")
+    assert stamps(runs) == ["2026-10-18 09:00:00"]
+
+
+def test_model_filter_and_limit(history):
+    runs = metrics.query_metrics_history(model_name="xgboost", until="2026-10-19", limit=2)
+    assert stamps(runs) == ["2026-10-19 00:00:00", "2026-10-18 09:00:00"]
+
+
+def test_invalid_bound_is_rejected(history):
+    with pytest.raises(ValueError):
+        metrics.query_metrics_history(until="yesterday")
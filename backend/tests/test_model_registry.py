@@ -0,0 +1,66 @@
+"""Promotion history and rollback in the versioned model registry."""
+
+import json
+
+import pytest
+
+from app.ml import model_registry
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "REGISTRY_DIR", tmp_path / "registry")
+    return model_registry
+
+
+def publish(registry, value) -> str:
+    return registry.publish_model({"weights": value}, "demo_model", metrics={"value": value})
+
+
+def test_rollback_returns_to_the_previously_promoted_version(registry):
+    v1 = publish(registry, 1)
+    registry.promote_model("demo_model", v1)
+    publish(registry, 2)                       # published, never promoted
+    v3 = publish(registry, 3)
+    registry.promote_model("demo_model", v3)
+
+    assert registry.rollback_model("demo_model") == v1
+    assert registry.get_active_version("demo_model") == v1
+
+
+def test_repeated_rollbacks_undo_promotions_in_turn(registry):
+    v1, v2, v3 = publish(registry, 1), publish(registry, 2), publish(registry, 3)
+    for version in (v1, v3, v2):
+        registry.promote_model("demo_model", version)
+
+    assert registry.rollback_model("demo_model") == v3
+    assert registry.rollback_model("demo_model") == v1
+    with pytest.raises(ValueError):
+        registry.rollback_model("demo_model")
+    assert registry.get_active_version("demo_model") == v1
+
+
+def test_rollback_needs_an_earlier_promotion(registry):
+    v1 = publish(registry, 1)
+    publish(registry, 2)
+    registry.promote_model("demo_model", v1)
+    with pytest.raises(ValueError):
+        registry.rollback_model("demo_model")
+
+
+def test_history_is_append_only_and_in_the_summary(registry):
+    v1, v2 = publish(registry, 1), publish(registry, 2)
+    registry.promote_model("demo_model", v1)
+    registry.promote_model("demo_model", v2)
+    registry.rollback_model("demo_model")
+
+    history_file = registry.REGISTRY_DIR / "demo_model" / registry.HISTORY_FILE
+    lines = [json.loads(line) for line in history_file.read_text().splitlines()]
+    assert [(e["action"], e["version"], e["previous"]) for e in lines] == [
+        ("promote", v1, None),
+        ("promote", v2, v1),
+        ("rollback", v1, v2),
+    ]
+    summary = registry.get_registry_summary()["demo_model"]
+    assert summary["active_version"] == v1
+    assert summary["promotion_history"] == lines
@@ -14,7 +14,7 @@ import {
 } from "lucide-react"
 import { motion, AnimatePresence } from "framer-motion"
 import type { DashboardResponse } from "./types/dashboard"
-import { getApiUrl, API_ENDPOINTS } from "./config/api"
+import { getApiUrl, API_ENDPOINTS, authHeaders } from "./config/api"
 
 import KpiCards from "./components/dashboard/KpiCards"
 import DeviceEnergyCharts from "./components/dashboard/DeviceEnergyCharts"
@@ -70,7 +70,7 @@ function App() {
   useEffect(() => {
     if (!isAuthenticated) return
     
-    fetch(getApiUrl(API_ENDPOINTS.DASHBOARD)).then(res => res.json()).then(setRaw).catch(console.error)
+    fetch(getApiUrl(API_ENDPOINTS.DASHBOARD), { headers: authHeaders() }).then(res => res.json()).then(setRaw).catch(console.error)
     fetch(getApiUrl(API_ENDPOINTS.HEALTH)).then(res => res.json()).then(data => {
         setSystemStatus(data.status === "ok" ? "Online" : "Error")
         setAiStatus(data.ai_models === "active" ? "Active" : "Loading")
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react"
 import { TrendingUp, TrendingDown, History } from "lucide-react"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
 
 type TimelineResponse = {
   delta_kwh: number
@@ -13,7 +13,7 @@ export default function AiEnergyTimeline() {
   const [data, setData] = useState<TimelineResponse | null>(null)
 
   useEffect(() => {
-    fetch(getApiUrl(API_ENDPOINTS.AI_TIMELINE))
+    fetch(getApiUrl(API_ENDPOINTS.AI_TIMELINE), { headers: authHeaders() })
       .then(res => res.json())
       .then(setData)
       .catch(console.error)
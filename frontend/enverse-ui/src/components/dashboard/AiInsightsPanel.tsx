@@ -1,13 +1,13 @@
 import { useEffect, useState } from "react"
 import { Brain } from "lucide-react"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
 
 export default function AiInsightsPanel() {
   const [insights, setInsights] = useState<string[]>([])
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetch(getApiUrl(API_ENDPOINTS.AI_INSIGHTS))
+    fetch(getApiUrl(API_ENDPOINTS.AI_INSIGHTS), { headers: authHeaders() })
       .then(res => res.json())
       .then(data => {
         setInsights(Array.isArray(data.ai_insights) ? data.ai_insights : [])
@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react"
 import { Brain, CheckCircle2, AlertTriangle, Moon, Zap } from "lucide-react"
 import { getDeviceDisplayName } from "../../utils/deviceAliases"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
 
 type InsightData = 
   | { type: 'dominant_load'; device: string; value: number; percentage: number }
@@ -17,7 +17,7 @@ export default function AiReasoningPanel() {
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetch(getApiUrl(API_ENDPOINTS.AI_INSIGHTS))
+    fetch(getApiUrl(API_ENDPOINTS.AI_INSIGHTS), { headers: authHeaders() })
       .then(res => res.json())
       .then((data: InsightResponse) => {
         setInsights(data.ai_insights || [])
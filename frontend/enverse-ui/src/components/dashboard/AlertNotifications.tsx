@@ -1,7 +1,8 @@
 import { useEffect, useState, useRef, useCallback } from "react"
 import { AlertTriangle, X, Zap } from "lucide-react"
 import { motion, AnimatePresence } from "framer-motion"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
+import { subscribeLiveEvent } from '../../liveEvents'
 
 interface Alert {
   id: string
@@ -26,6 +27,8 @@ export default function AlertNotifications() {
   const [alerts, setAlerts] = useState<Alert[]>([])
   const [error, setError] = useState<string | null>(null)
   const audioContextRef = useRef<AudioContext | null>(null)
+  const seenIdsRef = useRef<Set<string>>(new Set())
+  const dismissedIdsRef = useRef<Set<string>>(new Set())
 
   // Initialize AudioContext on component mount with resume attempt
   useEffect(() => {
@@ -107,7 +110,7 @@ export default function AlertNotifications() {
     const fetchAlerts = async () => {
       try {
         console.log("🔍 Fetching alerts from /api/alerts...")
-        const response = await fetch(getApiUrl(API_ENDPOINTS.ALERTS))
+        const response = await fetch(getApiUrl(API_ENDPOINTS.ALERTS), { headers: authHeaders() })
         
         if (!response.ok) {
           throw new Error(`API returned ${response.status}`)
@@ -120,6 +123,7 @@ export default function AlertNotifications() {
           // Show all alerts + play sound
           console.log("🔊 Playing sound for", data.alerts.length, "alert(s)")
           playAlertSound()
+          data.alerts.forEach((a) => seenIdsRef.current.add(a.id))
           setAlerts(data.alerts)
           setError(null)
         } else {
@@ -142,8 +146,25 @@ export default function AlertNotifications() {
     }
   }, [playAlertSound])
 
+  // Live updates: the server pushes the open alerts whenever they change
+  useEffect(() => {
+    return subscribeLiveEvent("alerts", (data: AlertResponse) => {
+      const incoming = (data.alerts || []).filter((a) => !dismissedIdsRef.current.has(a.id))
+      const fresh = incoming.filter((a) => !seenIdsRef.current.has(a.id))
+      incoming.forEach((a) => seenIdsRef.current.add(a.id))
+
+      if (fresh.length > 0) {
+        console.log("🔊 Playing sound for", fresh.length, "new alert(s)")
+        playAlertSound()
+      }
+      setAlerts(incoming)
+      setError(null)
+    })
+  }, [playAlertSound])
+
   // Dismiss alert - simple removal from display
   const handleDismiss = (alertId: string) => {
+    dismissedIdsRef.current.add(alertId)
     setAlerts((prev) => prev.filter((a) => a.id !== alertId))
   }
 
@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { MessageSquare, Send, X, Bot, Mic, Volume2 } from 'lucide-react';
-import { getApiUrl, API_ENDPOINTS } from '../../config/api';
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api';
 
 const ChatBot = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -76,7 +76,7 @@ const ChatBot = () => {
     try {
       const res = await fetch(getApiUrl(API_ENDPOINTS.CHAT), {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: authHeaders({ "Content-Type": "application/json" }),
         body: JSON.stringify({ 
             message: userMsg,
             session_id: sessionId 
@@ -1,7 +1,8 @@
 import { useEffect, useState } from "react"
 import { Zap, Cpu, ShieldCheck, TrendingUp } from "lucide-react"
 import { motion } from "framer-motion"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
+import { subscribeLiveEvent } from '../../liveEvents'
 
 // 🌟 VFX: Number Counter Hook (UI Only)
 const useCounter = (end: number, duration = 2000) => {
@@ -73,12 +74,26 @@ export default function KpiCards() {
   const [data, setData] = useState<any>(null)
 
   useEffect(() => {
-    fetch(getApiUrl(API_ENDPOINTS.DASHBOARD))
+    fetch(getApiUrl(API_ENDPOINTS.DASHBOARD), { headers: authHeaders() })
       .then(res => res.json())
       .then(setData)
       .catch(console.error)
   }, [])
 
+  // Live updates: KPIs and anomaly flags are pushed when the data changes
+  useEffect(() => {
+    const offKpis = subscribeLiveEvent("kpis", (kpis) => {
+      setData((prev: any) => ({ ...prev, ...kpis }))
+    })
+    const offAnomalies = subscribeLiveEvent("anomalies", (update) => {
+      setData((prev: any) => (prev ? { ...prev, ...update } : prev))
+    })
+    return () => {
+      offKpis()
+      offAnomalies()
+    }
+  }, [])
+
   // 🟢 SAFEGUARD: Prevent blank screen, show skeletons if loading
   if (!data) {
     return (
@@ -92,7 +107,9 @@ export default function KpiCards() {
 
   // 🟢 SAFEGUARD: Restore robust fallback logic for Night Ratio
   let nightRatio = 0
-  if (Array.isArray(data.raw_records) && data.raw_records.length > 0) {
+  if (typeof data.night_record_percent === "number") {
+    nightRatio = data.night_record_percent
+  } else if (Array.isArray(data.raw_records) && data.raw_records.length > 0) {
     const night = data.raw_records.filter((r: any) => r.is_night === 1).length
     nightRatio = Math.round((night / data.raw_records.length) * 100)
   } else if (data.night_usage_percent) {
@@ -11,7 +11,7 @@ import {
   Server
 } from "lucide-react"
 import { motion } from "framer-motion"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
 
 // --- TYPES ---
 type Metrics = {
@@ -133,7 +133,7 @@ export default function ModelHealthPanel() {
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetch(getApiUrl(API_ENDPOINTS.MODEL_HEALTH))
+    fetch(getApiUrl(API_ENDPOINTS.MODEL_HEALTH), { headers: authHeaders() })
       .then(res => res.json())
       .then(setData)
       .catch(console.error)
@@ -9,7 +9,7 @@ import {
   Sparkles,
   Calendar
 } from "lucide-react"
-import { getApiUrl, API_ENDPOINTS } from '../../config/api'
+import { getApiUrl, API_ENDPOINTS, authHeaders } from '../../config/api'
 import { 
   AreaChart, 
   Area, 
@@ -51,7 +51,7 @@ export default function PredictionSection() {
 
   /* ------------------ AUTO LOAD (ON MOUNT) ------------------ */
   useEffect(() => {
-    fetch(getApiUrl(API_ENDPOINTS.FORECAST))
+    fetch(getApiUrl(API_ENDPOINTS.FORECAST), { headers: authHeaders() })
       .then(res => res.json())
       .then(data => {
         const f = data.forecast
@@ -83,7 +83,7 @@ export default function PredictionSection() {
     try {
       const res = await fetch(getApiUrl(API_ENDPOINTS.ESTIMATE_ENERGY), {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: authHeaders({ "Content-Type": "application/json" }),
         body: JSON.stringify({
           appliance: device,
           usage_duration_minutes: duration,
@@ -22,6 +22,16 @@ export const getApiUrl = (path: string): string => {
   return `${API_BASE_URL}${path}`;
 };
 
+/**
+ * Authorization header for the logged-in user (empty when logged out).
+ * Every endpoint except /health and /auth/* requires it.
+ * @param headers - extra headers to send along (e.g. Content-Type)
+ */
+export const authHeaders = (headers: Record<string, string> = {}): Record<string, string> => {
+  const token = localStorage.getItem('enverse_token');
+  return token ? { ...headers, Authorization: `Bearer ${token}` } : headers;
+};
+
 /**
  * API Endpoints
  */
@@ -30,6 +40,7 @@ export const API_ENDPOINTS = {
   VERIFY_TOKEN: '/auth/verify-token',
   SEND_OTP: '/auth/send-otp',
   VERIFY_OTP: '/auth/verify-otp',
+  OTP_STATUS: '/auth/otp-status',
   
   // Dashboard
   DASHBOARD: '/dashboard',
@@ -45,6 +56,7 @@ export const API_ENDPOINTS = {
   ESTIMATE_ENERGY: '/api/estimate-energy',
   MODEL_HEALTH: '/api/model-health',
   ALERTS: '/api/alerts',
+  EVENTS: '/api/events',
   
   // Chat
   CHAT: '/chat',
@@ -0,0 +1,55 @@
+import { getApiUrl, API_ENDPOINTS } from './config/api';
+
+/**
+ * Live push channel (Server-Sent Events from /api/events).
+ * All components share ONE EventSource per tab; it is opened by the first
+ * subscriber and closed when the last one unsubscribes. EventSource
+ * reconnects on its own and the server re-sends the current state on connect.
+ * Without EventSource subscribing is a no-op and callers show their REST fetch.
+ */
+
+export type LiveEventName = "alerts" | "kpis" | "anomalies"
+
+type Handler = (data: any) => void
+
+let source: EventSource | null = null
+const handlers: Record<string, Set<Handler>> = {}
+
+function dispatch(event: string, raw: string) {
+  let data: any
+  try {
+    data = JSON.parse(raw)
+  } catch {
+    return
+  }
+  handlers[event]?.forEach(handler => handler(data))
+}
+
+function open() {
+  if (source || typeof EventSource === "undefined") return
+  // EventSource cannot set headers; the token goes in the query string
+  const token = localStorage.getItem('enverse_token')
+  const query = token ? `?access_token=${encodeURIComponent(token)}` : ''
+  source = new EventSource(getApiUrl(API_ENDPOINTS.EVENTS) + query)
+  ;(["alerts", "kpis", "anomalies"] as LiveEventName[]).forEach(event => {
+    source!.addEventListener(event, e => dispatch(event, (e as MessageEvent).data))
+  })
+}
+
+function closeIfUnused() {
+  const active = Object.values(handlers).some(set => set.size > 0)
+  if (!active && source) {
+    source.close()
+    source = null
+  }
+}
+
+/** Subscribe to one event type; returns the unsubscribe function. */
+export function subscribeLiveEvent(event: LiveEventName, handler: Handler): () => void {
+  ;(handlers[event] ??= new Set()).add(handler)
+  open()
+  return () => {
+    handlers[event]?.delete(handler)
+    closeIfUnused()
+  }
+}
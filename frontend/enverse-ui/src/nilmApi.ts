@@ -1,7 +1,7 @@
-import { getApiUrl, API_ENDPOINTS } from './config/api';
+import { getApiUrl, API_ENDPOINTS, authHeaders } from './config/api';
 
 export async function fetchNilmExplanation() {
-  const res = await fetch(getApiUrl(API_ENDPOINTS.EXPLAIN))
+  const res = await fetch(getApiUrl(API_ENDPOINTS.EXPLAIN), { headers: authHeaders() })
 
   if (!res.ok) {
     throw new Error("Failed to fetch NILM explanation")
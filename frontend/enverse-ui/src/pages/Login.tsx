@@ -13,6 +13,26 @@ const Login: React.FC<LoginProps> = ({ onLoginSuccess }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
+  // The code is emailed in the background; watch for a delivery failure
+  const watchDelivery = async (jobId: string) => {
+    for (let i = 0; i < 20; i++) {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      try {
+        const res = await fetch(getApiUrl(`${API_ENDPOINTS.OTP_STATUS}/${jobId}`));
+        if (!res.ok) return;
+        const { status } = await res.json();
+        if (status === 'sent') return;
+        if (status === 'failed') {
+          setStep('email');
+          setError('We could not send the login code right now. Please try again in a moment.');
+          return;
+        }
+      } catch {
+        return;
+      }
+    }
+  };
+
   const handleSendOTP = async () => {
     if (!email || !email.includes('@')) {
       setError('Please enter a valid email');
@@ -33,6 +53,7 @@ const Login: React.FC<LoginProps> = ({ onLoginSuccess }) => {
 
       if (data.success) {
         setStep('otp');
+        if (data.job_id) watchDelivery(data.job_id);
       } else {
         setError(data.message || 'Failed to send OTP');
       }